@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,11 +42,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mentor.middleware.MetricsMiddleware',  # first, so its timing covers the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'mentor.middleware.ProfilingMiddleware',  # needs request.user
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,10 +80,30 @@ WSGI_APPLICATION = 'careermentor.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get("MENTOR_SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# "shared" lives on disk, so every worker on the host sees the same entries and deletes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get("MENTOR_SHARED_CACHE_DIR", BASE_DIR / 'var' / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Opt-in SQLite production profile: WAL + tuned pragmas on every connection
+# (see mentor/db.py) and persistent per-thread connections.
+MENTOR_SQLITE_PRODUCTION = os.environ.get("MENTOR_SQLITE_PRODUCTION", "0") == "1"
+MENTOR_SQLITE_PRAGMAS = {}  # overrides for mentor.db.DEFAULT_PRAGMAS
+if MENTOR_SQLITE_PRODUCTION:
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,3 +151,73 @@ STATICFILES_DIRS = [BASE_DIR / 'mentor' / 'static']
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Career model: load once per worker at startup, re-check the artifact every N seconds.
+# Set MENTOR_PRELOAD_MODEL=0 for workers that never predict (numpy then loads on first use).
+MENTOR_PRELOAD_MODEL = os.environ.get("MENTOR_PRELOAD_MODEL", "1") == "1"
+MENTOR_MODEL_CHECK_INTERVAL = 2.0
+# Serve the weights as read-only memory-mapped .npy files (model.mmap.json) instead of
+# model.npz: every worker on the host then shares one copy in the page cache. Combine
+# with preloading before the fork (gunicorn --preload) for copy-on-write sharing too.
+MENTOR_MODEL_MMAP = os.environ.get("MENTOR_MODEL_MMAP", "0") == "1"
+
+# Largest JSON array accepted by /api/predict/batch/
+MENTOR_BATCH_MAX_PROFILES = 1000
+
+# Memoize predictions on scores + matched interest keywords. STEP > 0 rounds scores
+# before keying (more hits, approximate results).
+# Point BACKEND at an alias in CACHES (e.g. a FileBasedCache) to share entries across workers.
+MENTOR_PREDICTION_CACHE = {
+    "ENABLED": True,
+    "STEP": 0.0,
+    "MAXSIZE": 4096,
+    "BACKEND": None,
+    "TIMEOUT": 3600,
+}
+
+# Serve the chat page against the async endpoint (use with careermentor.asgi)
+MENTOR_CHAT_ASYNC = os.environ.get("MENTOR_CHAT_ASYNC", "0") == "1"
+
+# Latest-assessment context for chat, invalidated when Assessment writes commit.
+# Must be an alias every worker shares; with a per-process cache ("default") keep TIMEOUT
+# to a few seconds, since other workers only see a new assessment once their entry expires.
+MENTOR_CHAT_CONTEXT_CACHE = {"BACKEND": "shared", "TIMEOUT": 300}
+
+# Assessments per history page (keyset pagination)
+MENTOR_HISTORY_PAGE_SIZE = 25
+
+# PDF reports: rendered by a pool of WORKERS processes, cached under DIR
+MENTOR_REPORTS = {
+    "DIR": BASE_DIR / "var" / "reports",
+    "WORKERS": int(os.environ.get("MENTOR_PDF_WORKERS", "2")),
+}
+
+# How a valid form POST reaches the result page:
+#   "redirect": stash the inputs in the session and 302 to /predict/ (original flow)
+#   "prg":      predict and save in the POST, then 302 to /result/<pk>/ (no session write)
+#   "direct":   predict, save and render the result in the POST response itself
+MENTOR_PREDICT_MODE = os.environ.get("MENTOR_PREDICT_MODE", "redirect")
+
+# "django.contrib.sessions.backends.cached_db" serves session reads from the cache,
+# "django.contrib.sessions.backends.signed_cookies" keeps sessions out of the database.
+SESSION_ENGINE = os.environ.get("MENTOR_SESSION_ENGINE", "django.contrib.sessions.backends.db")
+
+# Buffer new assessments and write them in batches from a background thread
+# (mentor/write_behind.py). Helps when the SQLite write lock limits predictions/s.
+MENTOR_WRITE_BEHIND = {
+    "ENABLED": os.environ.get("MENTOR_WRITE_BEHIND", "0") == "1",
+    "BATCH_SIZE": 100,
+    "INTERVAL": 0.5,
+}
+
+# Request/span/cache metrics served to staff at /metrics (Prometheus text format)
+MENTOR_METRICS_ENABLED = os.environ.get("MENTOR_METRICS_ENABLED", "1") == "1"
+
+# Sampling profiler: staff add ?__profile=1 (or header X-Mentor-Profile: 1) to a request;
+# collapsed stacks are kept in a ring buffer of MAX_FILES under DIR, listed at /stats/profiles/.
+MENTOR_PROFILER = {
+    "DIR": BASE_DIR / "var" / "profiles",
+    "MAX_FILES": 50,
+    "INTERVAL": 0.005,
+    "SAMPLE_PERCENT": float(os.environ.get("MENTOR_PROFILE_SAMPLE_PERCENT", "0")),
+}
@@ -0,0 +1 @@
+pytest_plugins = ["mentor.benchmarks.plugin"]
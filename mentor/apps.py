@@ -1,6 +1,38 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class MentorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mentor'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects Assessment receivers)
+        from django.db.backends.signals import connection_created
+        from .db import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="mentor.db.sqlite_pragmas")
+
+        from . import metrics
+        metrics.enabled = getattr(settings, "MENTOR_METRICS_ENABLED", True)
+
+        # registry.py is stdlib-only; numpy and the model stay unimported unless preloading
+        from .ml import registry
+
+        registry.DEFAULT_CHECK_INTERVAL = getattr(settings, "MENTOR_MODEL_CHECK_INTERVAL", 2.0)
+        if getattr(settings, "MENTOR_MODEL_MMAP", False):
+            from .ml.model import use_mmap
+            use_mmap()
+        if getattr(settings, "MENTOR_PRELOAD_MODEL", True):
+            # Warm the model once per worker so the first /predict/ doesn't pay for it.
+            from .ml.model import load_model
+            try:
+                load_model()
+            except (FileNotFoundError, ValueError) as e:  # missing or stale export
+                logger.warning("Model preload failed: %s", e)
+            except Exception:
+                logger.exception("Model preload failed; it will be retried on first prediction")
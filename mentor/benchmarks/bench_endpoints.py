@@ -0,0 +1,123 @@
+import random
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from mentor.models import Assessment
+from mentor.reports import REPORTS, engine_available
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+HISTORY_SIZES = [10, 1_000, 10_000]
+FEATURES = ["math", "science", "english", "arts", "coding", "design", "leadership", "communication"]
+CAREERS = ["Data Scientist", "Software Engineer", "Designer / UI-UX", "Doctor / Healthcare"]
+CHAT_MESSAGES = [
+    "salary for data scientist",
+    "roadmap for ui/ux designer",
+    "courses for machine learning",
+    "compare data scientist vs software engineer",
+    "jobs for strong math",
+    "government jobs",
+]
+
+
+def _assessment(user, rng, created_at):
+    top = rng.sample(CAREERS, 3)
+    return Assessment(
+        user=user, created_at=created_at, interests="data, ai",
+        top3=[{"career": c, "prob": p} for c, p in zip(top, (0.6, 0.3, 0.1))], top_career=top[0],
+        **{f: rng.uniform(0, 100) for f in FEATURES},
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded(django_db_setup, django_db_blocker):
+    """One user per history size, each with that many assessments, committed for the module."""
+    rng = random.Random(0)
+    now = timezone.now()
+    users = {}
+    with django_db_blocker.unblock():
+        for n in HISTORY_SIZES:
+            user = User.objects.create_user(f"bench_{n}", password="pw")
+            Assessment.objects.bulk_create(
+                (_assessment(user, rng, now - timedelta(minutes=i)) for i in range(n)), batch_size=1000
+            )
+            users[n] = user
+    return users
+
+
+def _client(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def test_predict_view(bench, seeded):
+    client = _client(seeded[10])
+    url = reverse("mentor:predict")
+    rng = random.Random(1)
+
+    def stash_form():
+        session = client.session
+        session["form_data"] = dict({f: rng.randint(0, 100) for f in FEATURES}, interests="data, ai")
+        session.save()
+
+    def run():
+        assert client.get(url).status_code == 200
+    bench("GET /predict/", run, iterations=200, setup=stash_form)
+
+
+def test_chat_api(bench, seeded):
+    client = _client(seeded[10])
+    url = reverse("mentor:chat_api")
+    state = {"i": 0}
+
+    def run():
+        msg = CHAT_MESSAGES[state["i"] % len(CHAT_MESSAGES)]
+        state["i"] += 1
+        assert client.post(url, {"message": msg}).status_code == 200
+    bench("POST /chat/api/", run, iterations=300)
+
+
+@pytest.mark.parametrize("rows", HISTORY_SIZES)
+def test_history(bench, seeded, rows):
+    client = _client(seeded[rows])
+    url = reverse("mentor:history")
+
+    def run():
+        assert client.get(url).status_code == 200
+    bench(f"GET /history/ [{rows} rows]", run, iterations=200)
+
+
+@pytest.fixture
+def report_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(REPORTS, "dir", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.skipif(not engine_available(), reason="xhtml2pdf is not installed")
+def test_pdf_render(bench, seeded, report_dir):
+    assessment = Assessment.objects.filter(user=seeded[10]).first()
+
+    def run():
+        REPORTS.submit(assessment).result(timeout=120)
+    bench("report render (pool)", run, iterations=5, warmup=1, setup=lambda: REPORTS.discard(assessment.pk))
+
+
+@pytest.mark.skipif(not engine_available(), reason="xhtml2pdf is not installed")
+def test_pdf_cached(bench, seeded, report_dir):
+    assessment = Assessment.objects.filter(user=seeded[10]).first()
+    REPORTS.submit(assessment).result(timeout=120)
+    client = _client(seeded[10])
+    url = reverse("mentor:export_pdf", args=[assessment.pk])
+
+    def run():
+        response = client.get(url)
+        assert response.status_code == 200
+        b"".join(response.streaming_content)
+        response.close()
+    bench("GET /pdf/<pk>/ (cached)", run, iterations=200)
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from mentor.career_data import get_career_info
+from mentor.ml import model as ml
+
+pytestmark = pytest.mark.benchmark
+
+INTERESTS = ["data, ai, statistics", "design, art, ux", "coding, cloud, security", "teaching",
+             "business, startup, leadership", "health, biology, medicine", "law, debate", ""]
+
+
+def _profiles(n, seed=0):
+    rng = random.Random(seed)
+    return [([rng.uniform(0, 100) for _ in ml.FEATURES], rng.choice(INTERESTS)) for _ in range(n)]
+
+
+def _cycle(items):
+    state = {"i": 0}
+
+    def nxt():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+    return nxt
+
+
+def test_predict_top3(bench):
+    ml.load_model()
+    nxt = _cycle(_profiles(256))
+
+    def run():
+        scores, interests = nxt()
+        ml.predict_top3(*scores, interests)
+    bench("ml.predict_top3", run, iterations=1000, warmup=50)
+
+
+def test_predict_topk_batch_1000(bench):
+    ml.load_model()
+    profiles = _profiles(1000)
+    X = [p for p, _i in profiles]
+    interests = [i for _p, i in profiles]
+    bench("ml.predict_topk_batch[1000]", lambda: ml.predict_topk_batch(X, interests, 3), iterations=30, warmup=3)
+
+
+def test_interest_scores_by_career(bench):
+    nxt = _cycle(INTERESTS)
+    bench("ml.interest_scores_by_career", lambda: ml.interest_scores_by_career(nxt()), iterations=2000, warmup=50)
+
+
+def test_get_career_info(bench):
+    names = ["Data Scientist", "Software Engineer", "Doctor / Healthcare"]
+    bench("career_data.get_career_info", lambda: get_career_info(names), iterations=2000, warmup=50)
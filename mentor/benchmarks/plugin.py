@@ -0,0 +1,152 @@
+"""
+pytest plugin behind the mentor/benchmarks suite (loaded from conftest.py).
+
+Benchmarks are marked `benchmark` and skipped unless pytest runs with
+--benchmark:
+
+    pytest mentor/benchmarks --benchmark                   # run, compare with baseline.json
+    pytest mentor/benchmarks --benchmark --benchmark-save  # run, write a new baseline.json
+
+Each benchmark records p50/p95/p99 latency (ms) and throughput (ops/s); all
+results are written to --benchmark-json. A benchmark fails when its p95 is
+above baseline p95 × --benchmark-threshold, plus SLACK_MS so that
+microsecond-scale timings don't flap.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+SLACK_MS = 0.05
+
+_results = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("mentor benchmarks")
+    group.addoption("--benchmark", action="store_true", help="Run tests marked 'benchmark'.")
+    group.addoption("--benchmark-json", default="bench_results.json", help="Where to write the results.")
+    group.addoption("--benchmark-save", action="store_true",
+                    help=f"Write the results to {BASELINE_PATH.name} instead of comparing with it.")
+    group.addoption("--benchmark-threshold", type=float, default=1.5,
+                    help="Allowed p95 ratio against the baseline (default 1.5).")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: latency benchmark, only run with --benchmark")
+    config.stash[_results] = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def summarize(samples_ms):
+    samples = sorted(samples_ms)
+
+    def pct(q):
+        return samples[min(len(samples) - 1, max(0, round(q * len(samples)) - 1))]
+
+    total_s = sum(samples) / 1000.0
+    return {
+        "n": len(samples),
+        "mean": round(statistics.fmean(samples), 4),
+        "p50": round(pct(0.50), 4),
+        "p95": round(pct(0.95), 4),
+        "p99": round(pct(0.99), 4),
+        "ops_per_s": round(len(samples) / total_s, 1) if total_s else None,
+    }
+
+
+class Bench:
+    """The `bench` fixture: `bench(name, fn, iterations=..., setup=...)` times fn()."""
+
+    def __init__(self, config):
+        self.config = config
+        self.results = config.stash[_results]
+        self._baseline = None
+
+    @property
+    def baseline(self):
+        if self._baseline is None:
+            try:
+                self._baseline = json.loads(BASELINE_PATH.read_text())["results"]
+            except (OSError, ValueError, KeyError):
+                self._baseline = {}
+        return self._baseline
+
+    def __call__(self, name, fn, iterations=200, warmup=10, setup=None):
+        for _ in range(warmup):
+            if setup is not None:
+                setup()
+            fn()
+        samples = []
+        for _ in range(iterations):
+            if setup is not None:
+                setup()  # not timed
+            t0 = time.perf_counter_ns()
+            fn()
+            samples.append((time.perf_counter_ns() - t0) / 1e6)
+        stats = summarize(samples)
+        self.results[name] = stats
+        self._check(name, stats)
+        return stats
+
+    def _check(self, name, stats):
+        if self.config.getoption("--benchmark-save"):
+            return
+        base = self.baseline.get(name)
+        if base is None:
+            return
+        limit = base["p95"] * self.config.getoption("--benchmark-threshold") + SLACK_MS
+        if stats["p95"] > limit:
+            pytest.fail(f"{name}: p95 {stats['p95']:.3f} ms is over {limit:.3f} ms "
+                        f"(baseline {base['p95']:.3f} ms)", pytrace=False)
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.config)
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    results = config.stash.get(_results, {})
+    if not results:
+        return
+    import django
+
+    payload = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "django": django.get_version(),
+            "platform": platform.platform(),
+        },
+        "results": dict(sorted(results.items())),
+    }
+    text = json.dumps(payload, indent=2) + "\n"
+    Path(config.getoption("--benchmark-json")).write_text(text)
+    if config.getoption("--benchmark-save"):
+        BASELINE_PATH.write_text(text)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(_results, {})
+    if not results:
+        return
+    terminalreporter.section("benchmarks (ms)")
+    terminalreporter.write_line(f"{'name':<32} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>10}")
+    for name, r in sorted(results.items()):
+        terminalreporter.write_line(f"{name:<32} {r['p50']:>9.3f} {r['p95']:>9.3f} {r['p99']:>9.3f} "
+                                    f"{r['ops_per_s'] or 0:>10.1f}")
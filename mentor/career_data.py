@@ -1,21 +1,208 @@
+import hashlib
 import json
+import logging
+import os
+import re
+import threading
+import time
 from pathlib import Path
 
-DATA_PATH = Path(__file__).resolve().parent / "data" / "careers.json"
+from .content_pack import ContentPack, career_id
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+DATA_PATH = DATA_DIR / "careers.json"
+PACK_PATH = DATA_DIR / "content.pack"  # built by `manage.py build_content_pack`
+
+DEFAULT_ROADMAP = [
+    "📘 Strengthen fundamentals",
+    "💡 Build small projects and ship",
+    "🤝 Network & seek mentors",
+]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text):
+    return _TOKEN.findall((text or "").lower())
+
+
+def _placeholder(name):
+    return {"name": name, "salary": "—", "demand": "—", "courses": []}
+
+
+class _Snapshot:
+    """
+    Keys and search index for one version of the catalog; never mutated
+    after build. Records themselves come from `fetch(career_id)`, which reads
+    the shared content pack when there is one.
+    """
+
+    def __init__(self, records, fetch, version=None):
+        self.fetch = fetch
+        self.version = version
+        self.names = []    # position -> canonical name
+        self.by_key = {}   # lower-cased name or alias -> canonical name
+        self.index = {}    # token -> set of positions in `names`
+        for pos, item in enumerate(records):
+            name = item["name"]
+            self.names.append(name)
+            for key in [name] + list(item.get("aliases", [])):
+                self.by_key.setdefault(key.strip().lower(), name)
+
+            fields = [name, item.get("demand", "")] + list(item.get("aliases", []))
+            for course in item.get("courses") or []:
+                fields.append(course.get("title", ""))
+                fields.append(course.get("platform", ""))
+            for field in fields:
+                for tok in _tokens(field):
+                    self.index.setdefault(tok, set()).add(pos)
+
+    def item(self, name):
+        return self.fetch(career_id(name))
+
+
+class CareerCatalog:
+    """
+    Career metadata loaded once per process and reloaded only when its source
+    file changes (checked at most every `check_interval` seconds).
+
+    The source is the compiled content pack (memory-mapped and shared by
+    every worker on the host), or careers.json when there is no pack or the
+    JSON was edited after the pack was built. A source that fails to load is
+    logged and the previous snapshot kept. Lookups by name or alias are dict
+    hits; `search()` uses an inverted index over names, aliases, demand
+    levels, course titles and platforms.
+    """
+
+    def __init__(self, path=DATA_PATH, pack_path=PACK_PATH, check_interval=1.0):
+        self.path = Path(path)
+        self.pack_path = Path(pack_path) if pack_path else None
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._source = None
+        self._checked_at = 0.0
+
+    def _stat(self):
+        """(path, inode, mtime) of the source to serve: the newer of the pack and careers.json."""
+        found = []
+        for path in (self.pack_path, self.path):
+            if path is None:
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found.append((str(path), st.st_ino, st.st_mtime_ns))
+        if not found:
+            return None
+        # the pack wins ties; an edited careers.json is served until the pack is rebuilt
+        return max(found, key=lambda s: s[2])
+
+    def _build(self, source):
+        if source is None:
+            return _Snapshot([], lambda _id: None)
+        if self.pack_path is not None and source[0] == str(self.pack_path):
+            pack = ContentPack(self.pack_path)
+            return _Snapshot(pack.records(), pack.get, version=pack.version)
+        raw = self.path.read_bytes()
+        records = json.loads(raw.decode("utf-8"))
+        by_id = {career_id(item["name"]): item for item in records}
+        return _Snapshot(records, by_id.get, version="json-" + hashlib.sha256(raw).hexdigest()[:27])
+
+    def _current(self):
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snap
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+            source = self._stat()
+            if self._snapshot is None or source != self._source:
+                try:
+                    self._snapshot = self._build(source)
+                    self._source = source
+                    self._log_source(source)
+                except Exception:
+                    # e.g. a careers.json caught half-written: keep serving the previous
+                    # snapshot (or an empty one) and retry on the next check
+                    logger.exception("Loading career data from %s failed; keeping the previous catalog",
+                                     source[0] if source else None)
+                    if self._snapshot is None:
+                        self._snapshot = _Snapshot([], lambda _id: None)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _log_source(self, source):
+        if source is None or self.pack_path is None or source[0] != str(self.path) or not self.pack_path.exists():
+            return
+        logger.warning("%s is newer than %s; serving the JSON until `manage.py build_content_pack` is run",
+                       self.path.name, self.pack_path.name)
+
+    def reload(self):
+        with self._lock:
+            self._snapshot = None
+        return self._current()
+
+    def is_fresh(self):
+        """True when lookups will be served from memory without touching the disk."""
+        return self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval
+
+    def refresh(self):
+        """Stat (and if needed re-read) the source now; safe to run in a worker thread."""
+        self._current()
+
+    @property
+    def version(self):
+        """
+        Version of the data being served: the content pack version, or
+        "json-<sha256 prefix>" of careers.json. None when there is no data.
+        """
+        return self._current().version
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def all(self):
+        snap = self._current()
+        return [snap.item(n) for n in snap.names]
+
+    def get(self, name):
+        """Item for a career name or alias (case-insensitive), or None."""
+        snap = self._current()
+        canon = snap.by_key.get((name or "").strip().lower())
+        return snap.item(canon) if canon else None
+
+    def resolve(self, name):
+        """Canonical career name for a name or alias, or None."""
+        return self._current().by_key.get((name or "").strip().lower())
+
+    def lookup(self, names):
+        return [self.get(n) or _placeholder(n) for n in names]
+
+    def roadmap(self, name):
+        item = self.get(name)
+        return list(item.get("roadmap") or DEFAULT_ROADMAP) if item else list(DEFAULT_ROADMAP)
+
+    def search(self, query, limit=10):
+        """Items matching any query token, most matched tokens first."""
+        snap = self._current()
+        scores = {}
+        for tok in set(_tokens(query)):
+            for pos in snap.index.get(tok, ()):
+                scores[pos] = scores.get(pos, 0) + 1
+        ranked = sorted(scores, key=lambda pos: (-scores[pos], snap.names[pos]))
+        return [snap.item(snap.names[pos]) for pos in ranked[:limit]]
+
+
+CATALOG = CareerCatalog()
 
-def _load():
-    if DATA_PATH.exists():
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
 
 def get_career_info(names):
-    data = _load()
-    idx = {item["name"]: item for item in data}
-    out = []
-    for n in names:
-        if n in idx:
-            out.append(idx[n])
-        else:
-            out.append({"name": n, "salary": "—", "demand": "—", "courses": []})
-    return out
+    return CATALOG.lookup(names)
+
+
+def get_roadmap(career):
+    return CATALOG.roadmap(career)
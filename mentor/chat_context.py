@@ -0,0 +1,93 @@
+"""
+Per-user chat context: the latest assessment's scores and the derived skill
+hint, cached so chat messages don't query Assessment every time.
+
+Entries are dropped by the Assessment post_save/post_delete receivers in
+mentor.signals once the write commits. The project settings keep them in the
+file-based "shared" cache, so the drop reaches every worker on the host and
+entries can live for minutes; a hit there costs a small file read instead of
+an Assessment query. Without a shared BACKEND only the writing worker sees
+the drop, which is why the fallback TIMEOUT is a few seconds.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .chatbot import skill_hint
+from .models import Assessment
+
+DEFAULTS = {"BACKEND": "default", "TIMEOUT": 5}
+SCORE_FIELDS = ["math", "science", "english", "arts", "coding", "design", "leadership", "communication"]
+
+_NO_ASSESSMENT = {"scores": None}
+
+
+class ChatContext:
+    """Stand-in for an Assessment with just what the chatbot reads."""
+
+    def __init__(self, scores, hint=""):
+        self.scores = scores
+        self.skill_hint = hint
+        for field, value in scores.items():
+            setattr(self, field, value)
+
+    @classmethod
+    def from_assessment(cls, a):
+        return cls({f: getattr(a, f) for f in SCORE_FIELDS}, skill_hint(a))
+
+
+def _conf():
+    return dict(DEFAULTS, **getattr(settings, "MENTOR_CHAT_CONTEXT_CACHE", {}))
+
+
+def _cache():
+    return caches[_conf()["BACKEND"]]
+
+
+def _key(user_id):
+    return f"mentor:chatctx:{user_id}"
+
+
+def _pack(a):
+    if a is None:
+        return _NO_ASSESSMENT
+    ctx = ChatContext.from_assessment(a)
+    return {"scores": ctx.scores, "hint": ctx.skill_hint}
+
+
+def _unpack(entry):
+    if entry["scores"] is None:
+        return None
+    return ChatContext(entry["scores"], entry["hint"])
+
+
+def _latest(user_id):
+    return Assessment.objects.filter(user_id=user_id).only(*SCORE_FIELDS).order_by("-created_at").first()
+
+
+def get_context(user):
+    """ChatContext for the user's latest assessment, or None if they have none."""
+    entry = _cache().get(_key(user.pk))
+    if entry is None:
+        metrics.cache_miss("chat_context")
+        entry = _pack(_latest(user.pk))
+        _cache().set(_key(user.pk), entry, _conf()["TIMEOUT"])
+    else:
+        metrics.cache_hit("chat_context")
+    return _unpack(entry)
+
+
+async def aget_context(user):
+    entry = await _cache().aget(_key(user.pk))
+    if entry is None:
+        metrics.cache_miss("chat_context")
+        a = await Assessment.objects.filter(user_id=user.pk).only(*SCORE_FIELDS).order_by("-created_at").afirst()
+        entry = _pack(a)
+        await _cache().aset(_key(user.pk), entry, _conf()["TIMEOUT"])
+    else:
+        metrics.cache_hit("chat_context")
+    return _unpack(entry)
+
+
+def invalidate(user_id):
+    _cache().delete(_key(user_id))
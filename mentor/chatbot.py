@@ -0,0 +1,292 @@
+"""
+Rule-based chat replies.
+
+Each message is classified against a declarative intent table. All trigger
+phrases of all intents (plus the career aliases) are compiled once into a
+single KeywordMatcher, so a message is scanned once regardless of how many
+intents or aliases exist, and the first intent in table order whose clauses
+are all satisfied wins. Triggers follow the matcher's word rules: phrases of
+up to 3 characters ("hi", "pay", "vs") must be whole words, longer ones match
+at the start of a word ("course" also matches "courses").
+"""
+from .career_data import get_career_info, get_roadmap
+from .ml.keywords import KeywordMatcher
+
+# map common user phrases → canonical career keys used by careers.json / the content pack
+ALIAS = {
+    "software engineer": "Software Engineer",
+    "developer": "Software Engineer",
+    "programmer": "Software Engineer",
+    "data scientist": "Data Scientist",
+    "ai engineer": "AI / ML Engineer",
+    "ml engineer": "AI / ML Engineer",
+    "machine learning engineer": "AI / ML Engineer",
+    "cybersecurity": "Cybersecurity Specialist",
+    "security engineer": "Cybersecurity Specialist",
+    "cloud engineer": "Cloud Engineer",
+    "devops": "Cloud Engineer",
+    "ui/ux": "Designer / UI-UX",
+    "ux designer": "Designer / UI-UX",
+    "ui designer": "Designer / UI-UX",
+    "designer": "Designer / UI-UX",
+    "doctor": "Doctor / Healthcare",
+    "healthcare": "Doctor / Healthcare",
+    "lawyer": "Lawyer / Legal",
+    "legal": "Lawyer / Legal",
+    "entrepreneur": "Entrepreneur / Manager",
+    "manager": "Entrepreneur / Manager",
+    "teacher": "Teacher / Academic",
+    "academic": "Teacher / Academic",
+    "content creator": "Content Creator / Media",
+    "media": "Content Creator / Media",
+}
+
+# Priority is table order. An intent fires when every clause in "all" has at
+# least one phrase in the message ("any" is shorthand for a single clause).
+INTENTS = [
+    {"name": "roadmap", "any": ["roadmap", "how to become", "steps for", "path to", "career path for", "plan for"]},
+    {"name": "salary", "any": ["salary", "salaries", "pay", "package"]},
+    {"name": "trending", "any": ["trending", "high demand", "popular", "in demand"]},
+    {"name": "short_courses", "any": ["short course", "quick course", "certificate"]},
+    {"name": "courses", "any": ["course", "learn", "study", "syllabus"]},
+    {"name": "government", "any": ["government", "civil services", "upsc", "psc"]},
+    {"name": "future_ai", "any": ["future of ai", "ai jobs", "scope of ai"]},
+    {"name": "compare", "any": ["compare", "comparison"]},
+    {"name": "compare", "all": [["vs", "versus"], ["data scientist", "software engineer", "ui/ux", "lawyer",
+                                                   "doctor", "cloud", "cybersecurity"]]},
+    {"name": "skill_math", "all": [["job", "career"], ["math", "statistics"]]},
+    {"name": "skill_design", "all": [["job", "career"], ["design", "ui", "ux", "creative"]]},
+    {"name": "skill_coding", "all": [["job", "career"], ["coding", "programming", "software", "developer"]]},
+    {"name": "skill_communication", "all": [["job", "career"], ["communication", "english", "writing",
+                                                                "public speaking"]]},
+    {"name": "skill_leadership", "all": [["job", "career"], ["leadership", "management"]]},
+    {"name": "greeting", "any": ["hi", "hai", "hello"]},
+]
+
+# Topic hints for "courses" when no career is named; first matching topic wins.
+COURSE_TOPICS = [
+    (["ui", "ux", "design"], ["Designer / UI-UX"]),
+    (["data", "ml", "machine learning"], ["Data Scientist"]),
+    (["software", "coding", "programming", "developer"], ["Software Engineer"]),
+]
+DEFAULT_COURSE_TARGETS = ["Software Engineer", "Designer / UI-UX"]
+DEFAULT_SALARY_TARGETS = ["Software Engineer", "Data Scientist", "Doctor / Healthcare"]
+
+
+class IntentRouter:
+    """
+    Compiles an intent table, an alias map and topic hints into one matcher.
+
+    `analyze(msg)` scans the message once and returns (intent name or None,
+    careers mentioned in order of appearance, topic targets or None).
+    """
+
+    def __init__(self, intents, aliases, topics=()):
+        self.intents = []
+        self._by_group = {}  # clause key -> intent position, to only check intents that were hit
+        groups = {}
+        for i, intent in enumerate(intents):
+            clauses = intent.get("all") or [intent["any"]]
+            keys = []
+            for c, phrases in enumerate(clauses):
+                key = f"intent:{i}:{c}"
+                groups[key] = phrases
+                keys.append(key)
+                self._by_group[key] = i
+            self.intents.append((intent["name"], keys))
+        self.aliases = {k.lower(): v for k, v in aliases.items()}
+        for alias in self.aliases:
+            groups.setdefault(f"alias:{alias}", [alias])
+        self.topics = []
+        for t, (phrases, targets) in enumerate(topics):
+            groups[f"topic:{t}"] = phrases
+            self.topics.append((f"topic:{t}", list(targets)))
+        self.matcher = KeywordMatcher(groups)
+
+    def analyze(self, msg):
+        found, hit = self.matcher.find_groups(msg)
+
+        intent = None
+        for i in sorted({self._by_group[g] for g in hit if g in self._by_group}):
+            name, keys = self.intents[i]
+            if all(k in hit for k in keys):
+                intent = name
+                break
+
+        careers = []
+        for phrase in found:
+            canon = self.aliases.get(phrase)
+            if canon and canon not in careers:
+                careers.append(canon)
+
+        topic = next((targets for key, targets in self.topics if key in hit), None)
+        return intent, careers, topic
+
+    def classify(self, msg):
+        return self.analyze(msg)[0]
+
+
+ROUTER = IntentRouter(INTENTS, ALIAS, COURSE_TOPICS)
+
+
+def extract_careers(text):
+    """Return list of canonical career names found in text, in order of mention."""
+    return ROUTER.analyze(text)[1]
+
+
+def skill_hint(a):
+    if not a:
+        return ""
+    cached = getattr(a, "skill_hint", None)
+    if isinstance(cached, str):
+        return cached  # precomputed by chat_context.ChatContext
+    scores = {
+        "Math": a.math, "Science": a.science, "English": a.english, "Arts": a.arts,
+        "Coding": a.coding, "Design": a.design, "Leadership": a.leadership, "Communication": a.communication,
+    }
+    top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:2]
+    strong = ", ".join([f"{name} ({val:.0f})" for name, val in top])
+    return f""
+
+
+# -------------------------
+# Intent handlers
+# -------------------------
+def _roadmap(msg, a, targets, topic):
+    if not targets:
+        return (
+            "Tell me which role you want a roadmap for (e.g., "
+            "'roadmap for data scientist' or 'steps for ui/ux designer')."
+        )
+    # If multiple mentioned, show the first; list others as suggestions
+    primary = targets[0]
+    steps = get_roadmap(primary)
+    roadmap_txt = "\n".join([f"{i+1}. {s}" for i, s in enumerate(steps)])
+    extra = ""
+    if len(targets) > 1:
+        extra = "\n\nAlso detected: " + ", ".join(targets[1:]) + \
+                ". Ask 'roadmap for <role>' to see those."
+    return f"📍 Roadmap for **{primary}**:\n{roadmap_txt}{extra}{skill_hint(a)}"
+
+
+def _salary(msg, a, targets, topic):
+    info = get_career_info(targets or DEFAULT_SALARY_TARGETS)
+    lines = [f"{ci['name']}: {ci.get('salary','—')}" for ci in info]
+    return "Here are salary insights:\n" + "\n".join(lines) + skill_hint(a)
+
+
+def _trending(msg, a, targets, topic):
+    return (
+        "🚀 Careers in high demand right now:\n"
+        "• Data Scientist / AI Engineer\n"
+        "• Cybersecurity Specialist\n"
+        "• Cloud Engineer\n"
+        "• Doctor / Healthcare\n"
+        "• UI/UX Designer"
+        + skill_hint(a)
+    )
+
+
+def _courses(msg, a, targets, topic):
+    info = get_career_info(targets or topic or DEFAULT_COURSE_TARGETS)
+    parts = []
+    for ci in info:
+        crs = ci.get("courses") or []
+        if crs:
+            titles = ", ".join([c.get("title","") for c in crs])
+            parts.append(f"{ci['name']}: {titles}")
+    return ("You can explore:\n" + ("\n".join(parts) if parts else "No courses found.")) + skill_hint(a)
+
+
+def _greeting(msg, a, targets, topic):
+    return "🌿 Welcome — I’m here to support your journey\n"
+
+
+def _government(msg, a, targets, topic):
+    return (
+        "🏛 Government job paths:\n"
+        "• Civil Services (IAS, IPS, IFS)\n"
+        "• PSU roles (engineers, management)\n"
+        "• Teaching (UGC NET, schools)\n"
+        "• Healthcare (doctors in govt hospitals)\n"
+        "📚 Path: competitive exams like UPSC, SSC, state PSC, etc."
+    )
+
+
+def _short_courses(msg, a, targets, topic):
+    return (
+        "⏱ Short career-boosting courses:\n"
+        "• Google Data Analytics (Coursera, ~6 months)\n"
+        "• AWS Cloud Practitioner (Udemy, ~1 month)\n"
+        "• Google UX Design (Coursera, ~4–6 months)\n"
+        "• Digital Marketing Basics (edX, ~2 months)"
+        + skill_hint(a)
+    )
+
+
+def _future_ai(msg, a, targets, topic):
+    return (
+        "🤖 Future AI career tracks:\n"
+        "• AI Researcher (labs, academia)\n"
+        "• ML Engineer (applied AI)\n"
+        "• Robotics Engineer\n"
+        "• AI Ethics & Policy roles\n"
+        "Outlook: Very High demand in the next 5–10 years."
+        + skill_hint(a)
+    )
+
+
+def _compare(msg, a, targets, topic):
+    return (
+        "📊 Data Scientist vs Software Engineer:\n\n"
+        "• Data Scientist → Focus on ML/AI, statistics, data storytelling.\n"
+        "  Typical salary: ₹8L–₹30L (India), $100k–$200k (US)\n"
+        "• Software Engineer → Build scalable apps, systems, tools.\n"
+        "  Typical salary: ₹6L–₹24L (India), $80k–$180k (US)\n\n"
+        "👉 Enjoy math/data/ML? Choose Data Scientist.\n"
+        "👉 Enjoy building products/systems? Choose Software Engineer."
+        + skill_hint(a)
+    )
+
+
+SKILL_REPLIES = {
+    "skill_math": "Careers for strong math: Data Scientist, Quant Analyst, Engineer, Actuary.",
+    "skill_design": "Design paths: UI/UX Designer, Product Designer, Motion Designer, Architect.",
+    "skill_coding": "Coding-heavy roles: Software Engineer, Backend/Frontend Dev, DevOps, Cloud Engineer.",
+    "skill_communication": "Strong communication fits: Product Manager, Marketing, PR, Teaching, Content Creator.",
+    "skill_leadership": "Leadership paths: Product Manager, Project Manager, Entrepreneur/Manager, Team Lead.",
+}
+
+
+def _fallback(msg, a, targets, topic):
+    return (
+        "Asking about:\n"
+        "• Roadmap (e.g., 'roadmap for data scientist', 'how to become a cloud engineer')\n"
+        "• salary (e.g., 'Salary for Software Engineer')\n"
+        "• Courses (e.g., 'Courses for UI/UX')\n"
+        "• Trending careers (e.g., 'Which careers are in demand?')\n"
+        "• Compare roles (e.g., 'Compare Data Scientist vs Software Engineer')\n"
+        "• Careers for a skill (e.g., 'Jobs for strong math')."
+        + skill_hint(a)
+    )
+
+
+HANDLERS = {
+    "roadmap": _roadmap,
+    "salary": _salary,
+    "trending": _trending,
+    "short_courses": _short_courses,
+    "courses": _courses,
+    "government": _government,
+    "future_ai": _future_ai,
+    "compare": _compare,
+    "greeting": _greeting,
+}
+
+
+def chat_reply(msg, a):
+    """Reply text for a message, given the user's latest assessment (or None)."""
+    intent, targets, topic = ROUTER.analyze(msg)
+    if intent in SKILL_REPLIES:
+        return SKILL_REPLIES[intent] + skill_hint(a)
+    return HANDLERS.get(intent, _fallback)(msg, a, targets, topic)
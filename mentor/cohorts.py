@@ -0,0 +1,117 @@
+"""
+Cohort analytics: top-career distribution, mean scores per top career and
+daily assessment volume, served from CohortDailyStats.
+
+The summary is maintained incrementally: the Assessment save/delete receivers
+in mentor.signals (and signals.assessments_created for write-behind batches)
+call apply(), which adds or subtracts each row's count and score sums with
+UPDATE ... SET count = count + n, so concurrent writers never lose updates.
+rebuild() recomputes everything from the table in chunks.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Assessment, CohortDailyStats
+
+SCORES = ("math", "science", "english", "arts", "coding", "design", "leadership", "communication")
+SUM_FIELDS = tuple(f"sum_{s}" for s in SCORES)
+ROW_FIELDS = ("created_at", "top_career") + SCORES  # values_list() shape of a row
+
+
+def _day(created_at):
+    return timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+
+
+def row_of(assessment):
+    return tuple(getattr(assessment, f) for f in ROW_FIELDS)
+
+
+def stored_row(pk):
+    """The row as currently in the database (before an update), or None."""
+    return Assessment.objects.filter(pk=pk).values_list(*ROW_FIELDS).first()
+
+
+def _accumulate(totals, rows, sign=1):
+    """Add rows into {(day, career): [count, score sums...]}."""
+    for created_at, career, *scores in rows:
+        key = (_day(created_at), career)
+        t = totals.get(key)
+        if t is None:
+            t = totals[key] = [0] + [0.0] * len(SCORES)
+        t[0] += sign
+        for i, v in enumerate(scores, 1):
+            t[i] += sign * v
+    return totals
+
+
+def apply(added=(), removed=()):
+    """Fold added/removed rows (see row_of) into the summary."""
+    totals = _accumulate(_accumulate({}, added), removed, sign=-1)
+    for (day, career), (n, *sums) in totals.items():
+        if n == 0 and not any(sums):
+            continue  # e.g. an update that changed nothing we track
+        changes = {"count": F("count") + n, **{f: F(f) + s for f, s in zip(SUM_FIELDS, sums)}}
+        if CohortDailyStats.objects.filter(day=day, career=career).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                CohortDailyStats.objects.create(day=day, career=career, count=n, **dict(zip(SUM_FIELDS, sums)))
+        except IntegrityError:  # another writer created the row first
+            CohortDailyStats.objects.filter(day=day, career=career).update(**changes)
+
+
+def rebuild(chunk_size=5000):
+    """
+    Recompute the summary from Assessment, reading chunk_size rows at a time
+    in pk order (memory holds only the days × careers totals). Rows written
+    while it runs are folded in before the swap. Returns the rows counted.
+    """
+    until_pk = Assessment.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    rows = (Assessment.objects.filter(pk__lte=until_pk).order_by("pk")
+            .values_list(*ROW_FIELDS).iterator(chunk_size=chunk_size))
+    totals = _accumulate({}, rows)
+    with transaction.atomic():
+        CohortDailyStats.objects.all().delete()
+        CohortDailyStats.objects.bulk_create(
+            [CohortDailyStats(day=day, career=career, count=n, **dict(zip(SUM_FIELDS, sums)))
+             for (day, career), (n, *sums) in totals.items()],
+            batch_size=chunk_size,
+        )
+        # these already updated the rows just replaced
+        apply(added=Assessment.objects.filter(pk__gt=until_pk).values_list(*ROW_FIELDS))
+    return sum(n for n, *_sums in totals.values())
+
+
+def dashboard(days=30, today=None):
+    """Dashboard context for the last `days` local days; reads only CohortDailyStats."""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    qs = CohortDailyStats.objects.filter(day__gte=start, day__lte=today)
+
+    per_day = {r["day"]: r["n"] for r in qs.values("day").annotate(n=Sum("count"))}
+    volume = [(start + timedelta(days=i), per_day.get(start + timedelta(days=i)) or 0) for i in range(days)]
+    peak = max((n for _d, n in volume), default=0)
+
+    totals = {f"total_{s}": Sum(f) for s, f in zip(SCORES, SUM_FIELDS)}
+    careers = []
+    for r in qs.values("career").annotate(n=Sum("count"), **totals).order_by("-n", "career"):
+        n = r["n"]
+        if n > 0:
+            careers.append({"career": r["career"], "count": n,
+                            "means": [r[f"total_{s}"] / n for s in SCORES]})
+    total = sum(c["count"] for c in careers)
+    for c in careers:
+        c["share"] = 100.0 * c["count"] / total
+
+    return {
+        "days": days,
+        "start": start,
+        "today": today,
+        "total": total,
+        "careers": careers,
+        "scores": SCORES,
+        "volume": [{"day": d, "count": n, "pct": 100.0 * n / peak if peak else 0.0} for d, n in volume],
+    }
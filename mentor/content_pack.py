@@ -0,0 +1,127 @@
+"""
+Compiled, read-only content pack for career metadata and roadmaps.
+
+`manage.py build_content_pack` compiles careers.json into a single binary
+file. Every worker maps the same file read-only, so the page cache holds one
+copy for the whole host, and a lookup by career id is a binary search over a
+fixed-width index inside the mapping: nothing is parsed up front and only
+the requested record is decoded.
+
+Layout (little-endian):
+
+    header   magic "CMPK" | format u16 | reserved u16 | count u32
+             | version 32 ascii bytes | built_at u64 | index_offset u64
+    records  UTF-8 JSON objects, back to back
+    index    `count` entries of (key_hash u64, offset u64, length u32, pad 4),
+             sorted by key_hash
+
+`version` is the first 32 hex chars of the sha256 of the encoded records, so
+the same source always yields the same version.
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from pathlib import Path
+
+MAGIC = b"CMPK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI32sQQ")
+ENTRY = struct.Struct("<QQI4x")
+
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def career_id(name):
+    """Stable id for a career name: "Designer / UI-UX" -> "designer-ui-ux"."""
+    return _SLUG.sub("-", (name or "").lower()).strip("-")
+
+
+def _key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def build_pack(records, path):
+    """
+    Write `records` (dicts with at least "name") to `path` atomically.
+    Returns the pack version.
+    """
+    path = Path(path)
+    payloads = []
+    seen = {}
+    for rec in records:
+        rec = dict(rec, id=career_id(rec["name"]))
+        h = _key_hash(rec["id"])
+        if h in seen:
+            raise ValueError(f"duplicate career id {rec['id']!r} (from {seen[h]!r} and {rec['name']!r})")
+        seen[h] = rec["name"]
+        payloads.append((h, json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")))
+
+    version = hashlib.sha256(b"".join(p for _h, p in payloads)).hexdigest()[:32]
+
+    entries = []
+    offset = HEADER.size
+    for h, payload in payloads:
+        entries.append((h, offset, len(payload)))
+        offset += len(payload)
+    entries.sort()
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")  # concurrent builds never share a tmp file
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payloads), version.encode("ascii"),
+                            int(time.time()), offset))
+        for _h, payload in payloads:
+            f.write(payload)
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+    os.replace(tmp, path)
+    return version
+
+
+class ContentPack:
+    """A read-only memory mapping of a built pack."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _reserved, self.count, version, self.built_at, self._index_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a format-{FORMAT_VERSION} content pack")
+        self.version = version.decode("ascii")
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._mm, self._index_offset + i * ENTRY.size)
+
+    def raw(self, key):
+        """Zero-copy view of the JSON bytes for career id `key`, or None."""
+        h = _key_hash(key)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_h, offset, length = self._entry(mid)
+            if mid_h < h:
+                lo = mid + 1
+            elif mid_h > h:
+                hi = mid
+            else:
+                return memoryview(self._mm)[offset:offset + length]
+        return None
+
+    def get(self, key):
+        """Decoded record for career id `key`, or None."""
+        view = self.raw(key)
+        if view is None:
+            return None
+        rec = json.loads(bytes(view))
+        return rec if rec.get("id") == key else None
+
+    def records(self):
+        """Every record, in build order."""
+        entries = sorted((self._entry(i) for i in range(self.count)), key=lambda e: e[1])
+        return [json.loads(self._mm[offset:offset + length]) for _h, offset, length in entries]
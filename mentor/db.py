@@ -0,0 +1,36 @@
+"""
+SQLite production profile.
+
+With MENTOR_SQLITE_PRODUCTION on, every new SQLite connection gets the
+pragmas in MENTOR_SQLITE_PRAGMAS (WAL journal, synchronous=NORMAL, a busy
+timeout, mmap and a larger page cache), and settings.py turns on
+CONN_MAX_AGE so a worker thread reuses its connection across requests.
+
+WAL lets readers (history, sessions) run while one writer commits, and the
+busy timeout makes a second writer wait for the lock instead of failing with
+"database is locked". journal_mode is stored in the database file, the other
+pragmas are per connection.
+"""
+from django.conf import settings
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",   # durable across app crashes; an OS crash may lose the last commits
+    "busy_timeout": 5000,      # ms
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,      # negative = KiB, so ~20 MB
+    "temp_store": "memory",
+}
+
+
+def sqlite_pragmas():
+    return dict(DEFAULT_PRAGMAS, **getattr(settings, "MENTOR_SQLITE_PRAGMAS", {}))
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created receiver."""
+    if connection.vendor != "sqlite" or not getattr(settings, "MENTOR_SQLITE_PRODUCTION", False):
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
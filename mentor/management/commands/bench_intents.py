@@ -0,0 +1,80 @@
+import random
+import statistics
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from mentor.chatbot import ALIAS, COURSE_TOPICS, INTENTS, IntentRouter
+
+SAMPLE_MESSAGES = [
+    "salary for data scientist",
+    "roadmap for ui/ux designer",
+    "which courses should i take to learn machine learning?",
+    "compare data scientist vs software engineer",
+    "jobs for strong math and statistics",
+    "hi, what government jobs are there after upsc?",
+    "how to become a cloud engineer in two years with no experience",
+    "tell me something",
+]
+
+
+def _word(rng, n):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(n))
+
+
+def synthetic_tables(n_intents, n_aliases, seed=0):
+    """The real tables padded with random intents/aliases (low priority, so lookups walk them all)."""
+    rng = random.Random(seed)
+    intents = list(INTENTS)
+    for i in range(n_intents):
+        phrases = [f"{_word(rng, 6)} {_word(rng, 5)}" for _ in range(4)]
+        intents.append({"name": f"synthetic_{i}", "any": phrases})
+    aliases = dict(ALIAS)
+    for i in range(n_aliases):
+        aliases[f"{_word(rng, 7)} {_word(rng, 6)}"] = f"Synthetic Career {i}"
+    return intents, aliases
+
+
+def naive_classify(intents, aliases, msg):
+    """The old style: one substring test per phrase in priority order, plus a sorted alias scan."""
+    intent = None
+    for it in intents:
+        clauses = it.get("all") or [it["any"]]
+        if all(any(p in msg for p in clause) for clause in clauses):
+            intent = it["name"]
+            break
+    hits = []
+    for k in sorted(aliases, key=len, reverse=True):
+        if k in msg and aliases[k] not in hits:
+            hits.append(aliases[k])
+    return intent, hits
+
+
+def _timeit(fn, messages, repeat):
+    samples = []
+    for _ in range(repeat):
+        for msg in messages:
+            t0 = time.perf_counter_ns()
+            fn(msg)
+            samples.append((time.perf_counter_ns() - t0) / 1000.0)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+class Command(BaseCommand):
+    help = "Per-message chat classification latency as the intent and alias tables grow."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="*", default=[0, 100, 300, 1000],
+                            help="Extra intents (and as many extra aliases) to add.")
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{'extra':>6} {'router p50':>11} {'p95':>8} {'naive p50':>10} {'p95':>8}  (µs/message)")
+        for n in opts["sizes"]:
+            intents, aliases = synthetic_tables(n, n)
+            router = IntentRouter(intents, aliases, COURSE_TOPICS)
+            r50, r95 = _timeit(router.analyze, SAMPLE_MESSAGES, opts["repeat"])
+            n50, n95 = _timeit(lambda m: naive_classify(intents, aliases, m), SAMPLE_MESSAGES, opts["repeat"])
+            self.stdout.write(f"{n:>6} {r50:>11.1f} {r95:>8.1f} {n50:>10.1f} {n95:>8.1f}")
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from mentor.ml.engine import LinearModel
+
+SMAPS = "/proc/self/smaps_rollup"
+CASES = [
+    ("no model (baseline)", None, False),
+    ("npz, loaded per worker", "npz", False),
+    ("npz, preloaded before fork", "npz", True),
+    ("mmap, loaded per worker", "mmap", False),
+    ("mmap, preloaded before fork", "mmap", True),
+]
+
+
+def _smaps():
+    """Rss, Pss and private (USS) bytes of this process."""
+    fields = {}
+    with open(SMAPS) as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if len(parts) == 2 and parts[1] == "kB":
+                fields[key] = int(parts[0]) * 1024
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)}
+
+
+def _read_lines(fd, n):
+    buf = b""
+    while buf.count(b"\n") < n:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        buf += chunk
+    return [json.loads(line) for line in buf.splitlines()[:n]]
+
+
+def _run_case(load, preload, workers, X):
+    """
+    Fork `workers` processes that each hold the model and predict once, then
+    measure all of them while they are alive together (Pss splits shared
+    pages between the processes mapping them). Runs in its own forked
+    process so a preloaded model never leaks into the next case.
+    """
+    model = load() if (load and preload) else None
+    ready_r, ready_w = os.pipe()
+    go_r, go_w = os.pipe()
+    out_r, out_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(go_w)
+            if load is not None:
+                m = model if model is not None else load()
+                m.predict_proba(X)  # touches every weight page
+            os.write(ready_w, b"r")
+            os.read(go_r, 1)  # EOF once every worker is ready
+            os.write(out_w, (json.dumps(_smaps()) + "\n").encode())
+            os._exit(0)
+        pids.append(pid)
+    got = 0
+    while got < workers:
+        got += len(os.read(ready_r, workers))
+    os.close(go_w)
+    results = _read_lines(out_r, workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return results
+
+
+class Command(BaseCommand):
+    help = ("Per-worker RSS/PSS of forked workers serving a synthetic model from model.npz "
+            "versus memory-mapped .npy files, loaded per worker or preloaded before the fork.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--classes", type=int, default=4000)
+        parser.add_argument("--features", type=int, default=4096)
+
+    def handle(self, *args, **opts):
+        if not hasattr(os, "fork") or not os.path.exists(SMAPS):
+            raise CommandError(f"needs os.fork and {SMAPS} (Linux)")
+        workers, k, d = opts["workers"], opts["classes"], opts["features"]
+        rng = np.random.default_rng(0)
+        model = LinearModel(rng.normal(size=d), rng.uniform(0.5, 2.0, size=d), rng.normal(size=(k, d)),
+                            rng.normal(size=k), np.arange(k))
+        X = rng.normal(size=(16, d))
+        weights_mib = model.coef.nbytes / 2**20
+
+        with tempfile.TemporaryDirectory() as tmp:
+            npz, mmap = Path(tmp) / "model.npz", Path(tmp) / "model.mmap.json"
+            model.save(npz)
+            model.save_mmap(mmap)
+            del model
+            os.sync()  # freshly written page-cache pages would otherwise show up as dirty
+            loaders = {"npz": lambda: LinearModel.load(npz), "mmap": lambda: LinearModel.load_mmap(mmap)}
+
+            self.stdout.write(f"{k} classes × {d} features ({weights_mib:.1f} MiB of weights), "
+                              f"{workers} workers per case")
+            self.stdout.write(f"{'case':<30} {'RSS/worker':>11} {'PSS/worker':>11} {'private/worker':>15} "
+                              f"{'total PSS':>10}  (MiB)")
+            for label, fmt, preload in CASES:
+                r, w = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    os.close(r)
+                    code = 0
+                    try:
+                        rows = _run_case(loaders.get(fmt), preload, workers, X)
+                        os.write(w, (json.dumps(rows) + "\n").encode())
+                    except BaseException:
+                        code = 1
+                    finally:
+                        os._exit(code)
+                os.close(w)
+                data = b""
+                while chunk := os.read(r, 65536):
+                    data += chunk
+                os.close(r)
+                _, status = os.waitpid(pid, 0)
+                if status != 0 or not data:
+                    raise CommandError(f"{label}: benchmark process failed")
+                rows = json.loads(data)
+                mean = {key: sum(row[key] for row in rows) / len(rows) / 2**20 for key in rows[0]}
+                self.stdout.write(
+                    f"{label:<30} {mean['rss']:>11.1f} {mean['pss']:>11.1f} {mean['private']:>15.1f} "
+                    f"{mean['pss'] * len(rows):>10.1f}"
+                )
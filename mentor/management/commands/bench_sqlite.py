@@ -0,0 +1,128 @@
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ["default", "production"]
+FEATURES = ["math", "science", "english", "arts", "coding", "design", "leadership", "communication"]
+INTERESTS = ["data, ai", "design, art", "coding, cloud", "teaching", "business, startup", "health, biology"]
+
+
+def _pct(samples, q):
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * q) - 1)] if samples else 0.0
+
+
+def _worker_loop(client, rng, iterations, urls, results, lock):
+    from django.db import connection
+
+    latencies = {"form": [], "predict": [], "history": []}
+    errors = 0
+    for _ in range(iterations):
+        data = {f: rng.randint(0, 100) for f in FEATURES}
+        data["interests"] = rng.choice(INTERESTS)
+        for name, call in (
+            ("form", lambda: client.post(urls["form"], data)),          # session write
+            ("predict", lambda: client.get(urls["predict"])),           # Assessment insert
+            ("history", lambda: client.get(urls["history"])),           # read
+        ):
+            t0 = time.perf_counter()
+            try:
+                ok = call().status_code < 500
+            except Exception:
+                ok = False
+            latencies[name].append((time.perf_counter() - t0) * 1000.0)
+            errors += not ok
+    connection.close()
+    with lock:
+        for name, values in latencies.items():
+            results["latency"][name].extend(values)
+        results["errors"] += errors
+
+
+class Command(BaseCommand):
+    help = ("Multi-threaded form → predict → history throughput on a scratch SQLite file, "
+            "with the default config and with MENTOR_SQLITE_PRODUCTION.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--iterations", type=int, default=40, help="Form/predict/history rounds per thread.")
+        parser.add_argument("--profile", choices=PROFILES + ["both"], default="both")
+        parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **opts):
+        if opts["worker"]:
+            return self._run_worker(opts)
+
+        profiles = PROFILES if opts["profile"] == "both" else [opts["profile"]]
+        self.stdout.write(f"{opts['threads']} threads × {opts['iterations']} rounds, scratch database per profile")
+        self.stdout.write(f"{'profile':<11} {'rounds/s':>9} {'predict p50':>12} {'p95':>8} "
+                          f"{'history p50':>12} {'p95':>8} {'errors':>7}  (ms)")
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in profiles:
+                env = dict(os.environ,
+                           MENTOR_SQLITE_PATH=str(Path(tmp) / f"{profile}.sqlite3"),
+                           MENTOR_SQLITE_PRODUCTION="1" if profile == "production" else "0")
+                cmd = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py"), "bench_sqlite", "--worker",
+                       "--threads", str(opts["threads"]), "--iterations", str(opts["iterations"])]
+                proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+                if proc.returncode != 0:
+                    raise CommandError(f"{profile} run failed:\n{proc.stderr}")
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                lat = r["latency"]
+                self.stdout.write(
+                    f"{profile:<11} {r['rounds'] / r['seconds']:>9.1f} "
+                    f"{statistics.median(lat['predict']):>12.1f} {_pct(lat['predict'], 0.95):>8.1f} "
+                    f"{statistics.median(lat['history']):>12.1f} {_pct(lat['history'], 0.95):>8.1f} "
+                    f"{r['errors']:>7}"
+                )
+
+    def _run_worker(self, opts):
+        from django.contrib.auth.models import User
+        from django.db import connection
+        from django.test import Client
+        from django.test.utils import setup_test_environment
+        from django.urls import reverse
+
+        if "MENTOR_SQLITE_PATH" not in os.environ:
+            raise CommandError("--worker only runs against a scratch MENTOR_SQLITE_PATH")
+        setup_test_environment()  # allow the test client's host
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)  # errors are counted instead
+        call_command("migrate", verbosity=0)
+
+        urls = {"form": reverse("mentor:career_form"), "predict": reverse("mentor:predict"),
+                "history": reverse("mentor:history")}
+        clients = []
+        for i in range(opts["threads"]):
+            client = Client(raise_request_exception=False)
+            client.force_login(User.objects.create_user(f"bench{i}", password="pw"))
+            clients.append(client)
+        connection.close()
+
+        results = {"latency": {"form": [], "predict": [], "history": []}, "errors": 0}
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(target=_worker_loop,
+                             args=(c, random.Random(i), opts["iterations"], urls, results, lock))
+            for i, c in enumerate(clients)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        results["seconds"] = time.perf_counter() - started
+        results["rounds"] = opts["threads"] * opts["iterations"]
+        self.stdout.write(json.dumps(results))
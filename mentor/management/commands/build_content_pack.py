@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mentor.career_data import DATA_PATH, PACK_PATH
+from mentor.content_pack import ContentPack, build_pack
+
+
+class Command(BaseCommand):
+    help = "Compile careers.json (metadata + roadmaps) into the memory-mapped content pack."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=str(DATA_PATH))
+        parser.add_argument("--output", default=str(PACK_PATH))
+
+    def handle(self, *args, **opts):
+        source = Path(opts["source"])
+        try:
+            with open(source, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {source}: {e}")
+        missing = [i for i, rec in enumerate(records) if not rec.get("name")]
+        if missing:
+            raise CommandError(f"Records without a name at positions {missing}")
+        try:
+            version = build_pack(records, opts["output"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        pack = ContentPack(opts["output"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {opts['output']}: {pack.count} careers, {pack.stat.st_size} bytes, version {version}"
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mentor.ml.model import MODEL_PATH, NPZ_PATH, export_model
+
+
+class Command(BaseCommand):
+    help = "Export model.joblib to the NumPy-only model.npz used for serving."
+
+    def handle(self, *args, **options):
+        if not MODEL_PATH.exists():
+            raise CommandError(f"{MODEL_PATH} not found; train the model first.")
+        try:
+            engine = export_model()
+        except ValueError as e:
+            raise CommandError(str(e))
+        size = NPZ_PATH.stat().st_size
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {NPZ_PATH.name} ({size} bytes, {len(engine.classes_)} classes × "
+            f"{engine.n_features_in_} features, {engine.kind})"
+        ))
@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Never needed to boot a web worker; importing any of them at startup is a regression.
+DEFAULT_FORBIDDEN = ["sklearn", "joblib", "scipy", "xhtml2pdf", "reportlab"]
+
+
+def parse_importtime(stderr: str):
+    """Parse `python -X importtime` output into [(module, self_us, cumulative_us, depth)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            name = name.rstrip()
+            depth = (len(name) - len(name.lstrip(" "))) // 2
+            rows.append((name.strip(), int(self_us), int(cum_us), depth))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Measure cold import time of careermentor.wsgi with `python -X importtime`."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="careermentor.wsgi")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs to take the fastest of.")
+        parser.add_argument("--top", type=int, default=15, help="Slowest modules to print.")
+        parser.add_argument("--no-preload", action="store_true", help="Boot with MENTOR_PRELOAD_MODEL=0.")
+        parser.add_argument("--output", help="Write the report as JSON to this path.")
+        parser.add_argument("--baseline", help="JSON report to compare the total against.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed slowdown vs. --baseline (0.25 = 25%%).")
+        parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                            help="Top-level packages that must not be imported at startup.")
+
+    def _run_once(self, module, env):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000.0
+        if proc.returncode != 0:
+            raise CommandError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        return wall_ms, parse_importtime(proc.stderr)
+
+    def handle(self, *args, **opts):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "careermentor.settings")
+        if opts["no_preload"]:
+            env["MENTOR_PRELOAD_MODEL"] = "0"
+
+        best = None
+        for _ in range(max(1, opts["repeat"])):
+            wall_ms, rows = self._run_once(opts["module"], env)
+            total_us = sum(cum for _name, _self, cum, depth in rows if depth == 0)
+            if best is None or total_us < best[1]:
+                best = (wall_ms, total_us, rows)
+        wall_ms, total_us, rows = best
+
+        packages = {}
+        for name, _self_us, cum_us, _depth in rows:
+            top = name.split(".", 1)[0]
+            packages[top] = max(packages.get(top, 0), cum_us)
+        slowest = sorted(rows, key=lambda r: r[2], reverse=True)[:opts["top"]]
+
+        report = {
+            "module": opts["module"],
+            "preload": not opts["no_preload"],
+            "python": sys.version.split()[0],
+            "wall_ms": round(wall_ms, 1),
+            "import_ms": round(total_us / 1000.0, 1),
+            "modules": len(rows),
+            "packages_ms": {k: round(v / 1000.0, 1) for k, v in
+                            sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:opts["top"]]},
+            "slowest": [{"module": n, "self_ms": round(s / 1000.0, 1), "cumulative_ms": round(c / 1000.0, 1)}
+                        for n, s, c, _d in slowest],
+        }
+
+        self.stdout.write(f"{report['module']}: {report['import_ms']} ms in imports, "
+                          f"{report['wall_ms']} ms wall, {report['modules']} modules")
+        for row in report["slowest"]:
+            self.stdout.write(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+        if opts["output"]:
+            Path(opts["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+        problems = []
+        loaded = [m for m in opts["forbid"] if m in packages]
+        if loaded:
+            problems.append(f"imported at startup: {', '.join(loaded)}")
+        if opts["baseline"]:
+            base = json.loads(Path(opts["baseline"]).read_text(encoding="utf-8"))
+            limit = base["import_ms"] * (1.0 + opts["tolerance"])
+            if report["import_ms"] > limit:
+                problems.append(f"import time {report['import_ms']} ms exceeds baseline "
+                                f"{base['import_ms']} ms + {opts['tolerance']:.0%}")
+        if problems:
+            raise CommandError("; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("OK"))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mentor.cohorts import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the cohort analytics summary (CohortDailyStats) from all assessments, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Assessment rows read per chunk.")
+
+    def handle(self, *args, **opts):
+        if opts["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        started = time.perf_counter()
+        n = rebuild(chunk_size=opts["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Summarized {n} assessments in {time.perf_counter() - started:.2f}s"
+        ))
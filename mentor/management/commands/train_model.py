@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mentor.ml.model import MODEL_PATH, NPZ_PATH, export_model
+from mentor.ml.registry import file_digest
+from mentor.ml.training import (
+    CHECKPOINT_META_PATH, CHECKPOINT_PATH, META_PATH, SOLVERS, holdout_accuracy, load_meta, save_artifact,
+    train, update_from_assessments,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the career model on synthetic data, write model.joblib atomically with "
+        "model.meta.json, and export model.npz for serving. With --incremental, continue "
+        "training the current SGD model on assessments stored since the last run instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples-per-class", type=int, default=140)
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--solver", choices=SOLVERS, default="lbfgs",
+                            help="LogisticRegression solver, or 'sgd' to stream chunks through SGDClassifier.")
+        parser.add_argument("--n-jobs", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=None,
+                            help="Rows per chunk (default 200000 generated, or 5000 read with --incremental).")
+        parser.add_argument("--max-iter", type=int, default=250)
+        parser.add_argument("--epochs", type=int, default=5, help="Passes over the data for --solver sgd.")
+        parser.add_argument("--no-export", action="store_true",
+                            help="Skip writing model.npz. With --incremental, leave model.joblib alone too and "
+                                 "keep the result in the checkpoint for the next run to publish.")
+        parser.add_argument("--incremental", action="store_true",
+                            help="partial_fit the current model on assessments newer than its checkpoint.")
+        parser.add_argument("--from-start", action="store_true",
+                            help="With --incremental, ignore the checkpoint and read every assessment.")
+
+    def handle(self, *args, **o):
+        if o["samples_per_class"] < 1 or (o["chunk_size"] is not None and o["chunk_size"] < 1):
+            raise CommandError("--samples-per-class and --chunk-size must be positive.")
+        if o["incremental"]:
+            if not self._update(o):
+                return
+        else:
+            self._train(o)
+
+        if o["no_export"]:
+            return
+        try:
+            engine = export_model()
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {NPZ_PATH.name} ({len(engine.classes_)} classes × {engine.n_features_in_} features, {engine.kind})"
+        ))
+
+    def _train(self, o):
+        model, info = train(
+            n_per_class=o["samples_per_class"], seed=o["seed"], solver=o["solver"], n_jobs=o["n_jobs"],
+            chunk_size=o["chunk_size"] or 200_000, max_iter=o["max_iter"], epochs=o["epochs"],
+        )
+        info["holdout_accuracy"] = round(holdout_accuracy(model, seed=o["seed"]), 4)
+        meta = save_artifact(model, info, MODEL_PATH, META_PATH)
+        self.stdout.write(
+            f"Trained {o['solver']} on {info['n_samples']} samples in {info['total_s']}s "
+            f"(holdout accuracy {info['holdout_accuracy']:.2%})"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {MODEL_PATH.name} and {META_PATH.name} ({meta['sha256'][:12]})"))
+
+    def _update(self, o):
+        """
+        Returns True when model.joblib was replaced and needs exporting. Checkpoints
+        go to CHECKPOINT_PATH, so the served export keeps matching model.joblib
+        while the run is in progress; a checkpoint left by an interrupted (or
+        --no-export) run on top of the current model.joblib is resumed.
+        """
+        from joblib import load
+
+        if not MODEL_PATH.exists():
+            raise CommandError(f"{MODEL_PATH} not found; run `manage.py train_model --solver sgd` first.")
+        base = file_digest(MODEL_PATH)
+        resumed = not o["from_start"] and self._checkpoint_of(base)
+        model = load(CHECKPOINT_PATH if resumed else MODEL_PATH)
+        meta = load_meta(CHECKPOINT_META_PATH if resumed else META_PATH)
+        meta = {k: v for k, v in meta.items() if k not in ("sha256", "created")}
+        meta["base_sha256"] = base
+        done = {} if o["from_start"] else meta.get("incremental", {})
+        after_pk = int(done.get("last_pk", 0))
+
+        def checkpoint(model, info):
+            # the checkpoint travels with the weights it describes: a full retrain rewrites
+            # the metadata without it, so the next incremental run starts from the beginning
+            meta["incremental"] = {
+                "last_pk": info["last_pk"],
+                "rows": int(done.get("rows", 0)) + info["rows"],
+                "runs": int(done.get("runs", 0)) + (0 if resumed else 1),
+            }
+            save_artifact(model, meta, CHECKPOINT_PATH, CHECKPOINT_META_PATH)
+
+        try:
+            info = update_from_assessments(model, after_pk, chunk_size=o["chunk_size"] or 5_000,
+                                           on_checkpoint=checkpoint)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if info["last_pk"] == after_pk and not resumed:
+            self.stdout.write(f"No assessments after pk {after_pk}; model unchanged.")
+            return False
+        if info["last_pk"] != after_pk:
+            self.stdout.write(
+                f"Trained on {info['rows']} assessments (pk {after_pk + 1}..{info['last_pk']}) in {info['update_s']}s"
+            )
+        if o["no_export"]:
+            self.stdout.write(f"Kept the update in {CHECKPOINT_PATH.name}; {MODEL_PATH.name} is unchanged.")
+            return False
+
+        del meta["base_sha256"]
+        save_artifact(model, meta, MODEL_PATH, META_PATH)
+        CHECKPOINT_PATH.unlink(missing_ok=True)
+        CHECKPOINT_META_PATH.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {MODEL_PATH.name} (assessments up to pk {meta['incremental']['last_pk']})"
+        ))
+        return True
+
+    @staticmethod
+    def _checkpoint_of(base):
+        """Whether CHECKPOINT_PATH holds a complete checkpoint taken on top of the model with digest `base`."""
+        meta = load_meta(CHECKPOINT_META_PATH)
+        return (CHECKPOINT_PATH.exists() and meta.get("base_sha256") == base
+                and meta.get("sha256") == file_digest(CHECKPOINT_PATH))
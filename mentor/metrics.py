@@ -0,0 +1,211 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Every thread records into its own shard (a thread-local set of dicts), so the
+hot path takes no lock: incrementing a counter or observing a histogram is a
+dict lookup and a few additions. A scrape sums all shards. When a thread has
+exited, its shard is folded into one retired shard at the next scrape or
+thread registration, so counters never go backwards and memory is bounded by
+the live threads. Reading another thread's shard relies on dict/list copies
+being atomic under the GIL.
+
+Numbers are per process: with several workers, each exposes its own series.
+
+Usage:
+
+    from mentor import metrics
+
+    with metrics.span("model_inference"):
+        ...
+    metrics.cache_hit("prediction")
+    metrics.observe("mentor_request_seconds", 0.012, view="mentor:predict")
+
+Stdlib only, so mentor.ml can use it without importing Django.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "mentor_request_seconds": ("histogram", "Request latency by view.", LATENCY_BUCKETS),
+    "mentor_requests_total": ("counter", "Requests by view, method and status.", None),
+    "mentor_request_db_queries": ("histogram", "DB queries per request by view.", COUNT_BUCKETS),
+    "mentor_db_query_seconds_total": ("counter", "Time spent in DB queries by view.", None),
+    "mentor_span_seconds": ("histogram", "Duration of named spans inside requests.", LATENCY_BUCKETS),
+    "mentor_cache_requests_total": ("counter", "Cache lookups by cache and result (hit/miss).", None),
+}
+
+_GAUGES = {}  # name -> (help, fn returning a number or [(labels dict, number)])
+
+_shards = {}  # shard -> the thread recording into it
+_shards_lock = threading.Lock()  # taken when a thread records for the first time and by scrapes
+_local = threading.local()
+
+enabled = True
+
+
+class _Shard:
+    __slots__ = ("counters", "hists")
+
+    def __init__(self):
+        self.counters = {}
+        self.hists = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def merge(self, other):
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0.0) + value
+        for key, h in list(other.hists.items()):
+            acc = self.hists.get(key)
+            self.hists[key] = list(h) if acc is None else [a + b for a, b in zip(acc, h)]
+
+
+_retired = _Shard()  # totals of threads that have exited
+
+
+def _reap():
+    """Fold the shards of exited threads into _retired. Caller holds _shards_lock."""
+    for shard, thread in list(_shards.items()):
+        if not thread.is_alive():
+            del _shards[shard]
+            _retired.merge(shard)
+
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _reap()
+            _shards[shard] = threading.current_thread()
+    return shard
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+def inc(name, value=1.0, **labels):
+    if not enabled:
+        return
+    counters = _shard().counters
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0.0) + value
+
+
+def observe(name, value, **labels):
+    if not enabled:
+        return
+    buckets = METRICS[name][2]
+    hists = _shard().hists
+    key = _key(name, labels)
+    h = hists.get(key)
+    if h is None:
+        h = hists[key] = [0] * (len(buckets) + 1) + [0.0]
+    h[bisect.bisect_left(buckets, value)] += 1
+    h[-1] += value
+
+
+@contextmanager
+def span(name):
+    """Time a block into mentor_span_seconds{span=name}."""
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("mentor_span_seconds", time.perf_counter() - started, span=name)
+
+
+def cache_hit(cache):
+    inc("mentor_cache_requests_total", cache=cache, result="hit")
+
+
+def cache_miss(cache):
+    inc("mentor_cache_requests_total", cache=cache, result="miss")
+
+
+def register_gauge(name, help_text, fn):
+    """`fn()` is called at scrape time and returns a number or [(labels, number), ...]."""
+    _GAUGES[name] = (help_text, fn)
+
+
+# -------------------------
+# Exposition
+# -------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v):
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+def snapshot():
+    """(counters, histograms) summed over all shards."""
+    total = _Shard()
+    with _shards_lock:
+        _reap()
+        shards = list(_shards)
+        total.merge(_retired)
+    for shard in shards:
+        total.merge(shard)
+    return total.counters, total.hists
+
+
+def render():
+    """All metrics in Prometheus text format (version 0.0.4)."""
+    counters, hists = snapshot()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        else:
+            for (n, labels), h in sorted(hists.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for le, count in zip(list(buckets) + ["+Inf"], h[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(h[-1])}")
+                lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+    for name, (help_text, fn) in _GAUGES.items():
+        try:
+            value = fn()
+        except Exception:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        series = value if isinstance(value, list) else [({}, value)]
+        for labels, v in series:
+            if v is not None:
+                lines.append(f"{name}{_fmt_labels(sorted(labels.items()))} {_fmt_value(float(v))}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drop everything recorded so far (for tests and benchmarks)."""
+    with _shards_lock:
+        for shard in [_retired, *_shards]:
+            shard.counters.clear()
+            shard.hists.clear()
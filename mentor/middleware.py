@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connection
+
+from . import metrics, profiling
+
+
+class _QueryTimer:
+    """connection.execute_wrapper that counts queries and their time for one request."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "<unresolved>"
+
+
+def _record(request, response, seconds, queries=None):
+    view = _view_name(request)
+    status = getattr(response, "status_code", 500)
+    metrics.observe("mentor_request_seconds", seconds, view=view)
+    metrics.inc("mentor_requests_total", view=view, method=request.method, status=f"{status // 100}xx")
+    if queries is not None:
+        metrics.observe("mentor_request_db_queries", queries.count, view=view)
+        metrics.inc("mentor_db_query_seconds_total", queries.seconds, view=view)
+
+
+class MetricsMiddleware:
+    """
+    Per-view latency histograms, request counts and DB query counts/time,
+    recorded into mentor.metrics. Put it first in MIDDLEWARE so the timing
+    covers the rest of the stack. For streaming responses only the time to
+    the first byte is measured.
+
+    Async views are timed too, but their queries run in executor threads
+    with their own connections, so DB numbers are only recorded for sync
+    requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not metrics.enabled:
+            return self.get_response(request)
+        queries = _QueryTimer()
+        started = time.perf_counter()
+        response = None
+        try:
+            with connection.execute_wrapper(queries):
+                response = self.get_response(request)
+            return response
+        finally:
+            _record(request, response, time.perf_counter() - started, queries)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            _record(request, response, time.perf_counter() - started)
+
+
+class ProfilingMiddleware:
+    """
+    Runs a request under profiling.StackSampler when a staff user asks for it
+    with ?__profile=1 or an "X-Mentor-Profile: 1" header, or for a random
+    MENTOR_PROFILER["SAMPLE_PERCENT"] share of requests. The stored profile's
+    name is returned in the X-Mentor-Profile response header. Must come after
+    AuthenticationMiddleware. Async requests pass through unprofiled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        conf = profiling.conf()
+        self.sample_rate = float(conf["SAMPLE_PERCENT"]) / 100.0
+        self.interval = float(conf["INTERVAL"])
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _wanted(self, request):
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        # raw META checks: no query-string parsing or user lookup on ordinary requests
+        if "__profile=1" not in request.META.get("QUERY_STRING", "") and \
+                request.META.get("HTTP_X_MENTOR_PROFILE") != "1":
+            return False
+        user = getattr(request, "user", None)
+        return bool(user is not None and user.is_staff)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)  # a coroutine; awaited by the caller
+        if not self._wanted(request):
+            return self.get_response(request)
+
+        sampler = profiling.StackSampler(threading.get_ident(), self.interval).start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            counts = sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        name = profiling.save(counts, request.method, request.path, response.status_code, elapsed_ms)
+        response["X-Mentor-Profile"] = name
+        return response
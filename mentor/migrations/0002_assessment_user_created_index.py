@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='assessment_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+import json
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_top3(apps, schema_editor):
+    """
+    Normalize the hand-serialized top3 text and fill top_career, in pk-ordered
+    batches so large tables are never loaded at once. Rows whose text does not
+    parse become an empty list.
+    """
+    Assessment = apps.get_model("mentor", "Assessment")
+    db = schema_editor.connection.alias
+    last_pk = 0
+    while True:
+        rows = list(
+            Assessment.objects.using(db)
+            .filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "top3")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        for row in rows:
+            try:
+                parsed = json.loads(row.top3) if row.top3 else []
+            except ValueError:
+                parsed = []
+            if not isinstance(parsed, list):
+                parsed = []
+            try:
+                row.top_career = str(parsed[0]["career"])[:100]
+            except (IndexError, KeyError, TypeError):
+                row.top_career = ""
+            row.top3 = json.dumps(parsed)
+        Assessment.objects.using(db).bulk_update(rows, ["top3", "top_career"])
+        last_pk = rows[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor', '0002_assessment_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='top_career',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(backfill_top3, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='assessment',
+            name='top3',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['top_career', 'created_at'], name='assessment_top_created_idx'),
+        ),
+    ]
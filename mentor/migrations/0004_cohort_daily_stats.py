@@ -0,0 +1,60 @@
+# Generated by Django 4.2.16 on 2026-10-17 02:49
+
+from django.db import migrations, models
+from django.utils import timezone
+
+SCORES = ("math", "science", "english", "arts", "coding", "design", "leadership", "communication")
+CHUNK_SIZE = 2000
+
+
+def fill_cohorts(apps, schema_editor):
+    """Summarize existing assessments, streamed in chunks (see mentor.cohorts.rebuild)."""
+    Assessment = apps.get_model("mentor", "Assessment")
+    CohortDailyStats = apps.get_model("mentor", "CohortDailyStats")
+    db = schema_editor.connection.alias
+    totals = {}
+    rows = (Assessment.objects.using(db).order_by("pk")
+            .values_list("created_at", "top_career", *SCORES).iterator(chunk_size=CHUNK_SIZE))
+    for created_at, career, *scores in rows:
+        key = (timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date(), career)
+        t = totals.setdefault(key, [0] + [0.0] * len(SCORES))
+        t[0] += 1
+        for i, v in enumerate(scores, 1):
+            t[i] += v
+    CohortDailyStats.objects.using(db).bulk_create(
+        [CohortDailyStats(day=day, career=career, count=n, **{f"sum_{s}": v for s, v in zip(SCORES, sums)})
+         for (day, career), (n, *sums) in totals.items()],
+        batch_size=CHUNK_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor', '0003_assessment_top3_json'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('career', models.CharField(blank=True, max_length=100)),
+                ('count', models.BigIntegerField(default=0)),
+                ('sum_math', models.FloatField(default=0.0)),
+                ('sum_science', models.FloatField(default=0.0)),
+                ('sum_english', models.FloatField(default=0.0)),
+                ('sum_arts', models.FloatField(default=0.0)),
+                ('sum_coding', models.FloatField(default=0.0)),
+                ('sum_design', models.FloatField(default=0.0)),
+                ('sum_leadership', models.FloatField(default=0.0)),
+                ('sum_communication', models.FloatField(default=0.0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='cohortdailystats',
+            constraint=models.UniqueConstraint(fields=('day', 'career'), name='cohort_daily_day_career_uniq'),
+        ),
+        migrations.RunPython(fill_cohorts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor', '0004_cohort_daily_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessment_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['user', '-created_at', '-id', 'top_career'], name='assessment_user_created_idx'),
+        ),
+    ]
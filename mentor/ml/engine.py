@@ -0,0 +1,189 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# -------------------------
+# NumPy-only inference
+# -------------------------
+# The served model is StandardScaler + a linear classifier, so prediction is
+# (x - mean) / scale, one matmul and a softmax. Exporting those arrays lets the
+# web workers serve predictions without importing scikit-learn at all.
+
+FORMAT_VERSION = 1
+MMAP_ARRAYS = ("mean", "scale", "coef", "intercept")
+
+
+class LinearModel:
+    """
+    Standardize → linear scores → probabilities, with the same output as
+    the sklearn pipeline's `predict_proba`.
+
+    `kind` is "multinomial" (softmax over all classes) or "ovr" (per-class
+    sigmoid, normalized to sum to 1), mirroring sklearn's two modes.
+    """
+
+    def __init__(self, mean, scale, coef, intercept, classes, kind: str = "multinomial", source: str = ""):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = np.asarray(intercept, dtype=float)
+        self.classes_ = np.asarray(classes)
+        if kind not in ("multinomial", "ovr"):
+            raise ValueError(f"unknown kind {kind!r}")
+        self.kind = kind
+        self.source = source  # sha256 of the artifact this was exported from
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.coef.shape[1]
+
+    def decision_function(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        return ((X - self.mean) / self.scale) @ self.coef.T + self.intercept
+
+    def predict_proba(self, X) -> np.ndarray:
+        z = self.decision_function(X)
+        if self.kind == "multinomial":
+            z = z - z.max(axis=1, keepdims=True)
+            np.exp(z, out=z)
+        else:
+            z = 1.0 / (1.0 + np.exp(-z))
+        z /= z.sum(axis=1, keepdims=True)
+        return z
+
+    # -------------------------
+    # Conversion / persistence
+    # -------------------------
+    @classmethod
+    def from_pipeline(cls, model) -> "LinearModel":
+        """Pull the arrays out of a fitted Pipeline([("scaler", ...), ("clf", ...)])."""
+        scaler = model.named_steps["scaler"]
+        clf = model.named_steps["clf"]
+        n = clf.coef_.shape[1]
+        mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n)
+        scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n)
+        multi = getattr(clf, "multi_class", "auto")
+        if multi == "auto":
+            solver = getattr(clf, "solver", "lbfgs")
+            multi = "ovr" if (len(clf.classes_) <= 2 or solver == "liblinear") else "multinomial"
+        if type(clf).__name__ != "LogisticRegression":
+            multi = "ovr"  # e.g. SGDClassifier(loss="log_loss") is one-vs-rest
+        return cls(mean, scale, clf.coef_, clf.intercept_, clf.classes_, kind=multi)
+
+    def save(self, path: Path) -> None:
+        """Write a compact .npz atomically (tmp file + rename)."""
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                format_version=np.array(FORMAT_VERSION),
+                kind=np.array(self.kind),
+                mean=self.mean, scale=self.scale,
+                coef=self.coef, intercept=self.intercept,
+                classes=self.classes_,
+                source=np.array(self.source),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LinearModel":
+        with np.load(path, allow_pickle=False) as z:
+            version = int(z["format_version"])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported format version {version}")
+            return cls(
+                z["mean"], z["scale"], z["coef"], z["intercept"], z["classes"],
+                kind=str(z["kind"]), source=str(z["source"]),
+            )
+
+
+    # -------------------------
+    # Memory-mapped format
+    # -------------------------
+    # A JSON manifest plus one raw .npy per array in the directory next to it
+    # (model.mmap.json -> model.mmap/). The arrays are opened with
+    # np.load(mmap_mode="r"), so they live in the OS page cache and every
+    # worker process on the host shares one read-only copy. Array files are
+    # named after their content hash and never rewritten in place; a new
+    # export writes new files and then swaps the manifest.
+
+    def save_mmap(self, manifest_path: Path) -> None:
+        manifest_path = Path(manifest_path)
+        directory = manifest_path.with_suffix("")
+        directory.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for name in MMAP_ARRAYS:
+            array = np.ascontiguousarray(getattr(self, name), dtype=float)
+            fname = f"{name}-{hashlib.sha256(array.tobytes()).hexdigest()[:16]}.npy"
+            if not (directory / fname).exists():
+                tmp = directory / f"{fname}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, array, allow_pickle=False)
+                os.replace(tmp, directory / fname)
+            files[name] = fname
+
+        try:
+            keep = set(json.loads(manifest_path.read_text())["arrays"].values())  # still mapped by workers
+        except (OSError, ValueError, KeyError):
+            keep = set()
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "kind": self.kind,
+            "classes": self.classes_.tolist(),
+            "source": self.source,
+            "arrays": files,
+        }
+        tmp = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2) + "\n")
+        os.replace(tmp, manifest_path)
+
+        keep.update(files.values())
+        for old in directory.glob("*.npy"):
+            if old.name not in keep:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # e.g. still mapped on Windows; removed by a later export
+
+    @classmethod
+    def load_mmap(cls, manifest_path: Path) -> "LinearModel":
+        manifest_path = Path(manifest_path)
+        manifest = json.loads(manifest_path.read_text())
+        version = int(manifest["format_version"])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{manifest_path}: unsupported format version {version}")
+        directory = manifest_path.with_suffix("")
+        arrays = {
+            name: np.load(directory / manifest["arrays"][name], mmap_mode="r", allow_pickle=False)
+            for name in MMAP_ARRAYS
+        }
+        # float64 memmaps pass through np.asarray(dtype=float) in __init__ uncopied
+        return cls(
+            arrays["mean"], arrays["scale"], arrays["coef"], arrays["intercept"], manifest["classes"],
+            kind=manifest["kind"], source=manifest["source"],
+        )
+
+
+def parity_error(engine: LinearModel, model, X: Optional[np.ndarray] = None) -> float:
+    """Max absolute difference between the engine's and sklearn's predict_proba."""
+    if X is None:
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 100, size=(256, engine.n_features_in_))
+    return float(np.max(np.abs(engine.predict_proba(X) - model.predict_proba(X))))
+
+
+def export_npz(model, path: Path, source: str = "", atol: float = 1e-9) -> LinearModel:
+    """Export a fitted sklearn pipeline to .npz, refusing if outputs diverge."""
+    engine = LinearModel.from_pipeline(model)
+    engine.source = source
+    err = parity_error(engine, model)
+    if err > atol:
+        raise ValueError(f"NumPy engine differs from sklearn by {err:.3g} (> {atol:g}); not exporting")
+    engine.save(path)
+    return engine
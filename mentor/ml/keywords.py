@@ -0,0 +1,160 @@
+from __future__ import annotations
+import re
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# -------------------------
+# Compiled keyword matcher
+# -------------------------
+# All keywords are folded into one regex whose alternation is a character
+# trie, so each text position is tried against at most one branch per
+# character. A text is scanned once no matter how many keywords there are.
+#
+# Matching rules (text is lower-cased first):
+#   * keywords of up to SHORT_LEN chars ("ai", "ui", "ml", "law") must be a
+#     whole word, so "ai" no longer fires inside "said" or "email"; only the
+#     3-character ones take a plural "s" ("arts", "laws"), so "hi" is not "his";
+#   * longer keywords match at the start of a word, so "teach" still finds
+#     "teacher"/"teaching" but not "reteach";
+#   * a space inside a keyword matches any run of whitespace or hyphens.
+#
+# Unlike the old substring test, a short keyword is not a stem: "bio" is not
+# credited for "biology", nor "art" for "artist" (or "article", "artificial"),
+# nor "law" for "lawyer". The chat router shares this matcher, where a stem
+# rule would turn "hai" into "haircut". List the longer form as a keyword of
+# its own where it should count. Prefix crediting ("healthcare" also counts
+# "health") only happens between longer keywords.
+
+SHORT_LEN = 3
+
+
+def _trie_regex(words: Sequence[str]) -> str:
+    """Regex matching exactly `words`, longest alternative first."""
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: Dict) -> str:
+        end = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            piece = r"[\s\-]+" if ch == " " else re.escape(ch)
+            branches.append(piece + emit(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # greedy optional: the longer keyword wins when both fit
+            body = (body if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")") + "?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Single-pass matcher over named keyword groups.
+
+    `counts(texts)` returns an N × len(groups) array with the number of
+    distinct keywords of each group found in each text (columns follow
+    `order`, or the mapping's order).
+    """
+
+    def __init__(self, groups: Mapping[str, Sequence[str]], order: Optional[Sequence[str]] = None):
+        self.groups: List[str] = list(order if order is not None else groups.keys())
+        self.keywords: List[str] = sorted({k.lower() for kws in groups.values() for k in kws})
+        index = {k: i for i, k in enumerate(self.keywords)}
+
+        # keyword id -> group positions; the numpy incidence matrix is built on
+        # first use so pure lookups (find/matches) never import numpy
+        self._keyword_groups: List[List[int]] = [[] for _ in self.keywords]
+        for g, name in enumerate(self.groups):
+            for k in groups.get(name, []):
+                if g not in self._keyword_groups[index[k.lower()]]:
+                    self._keyword_groups[index[k.lower()]].append(g)
+        self._incidence = None
+
+        long_kws = [k for k in self.keywords if len(k) > SHORT_LEN]
+        short_kws = [k for k in self.keywords if len(k) <= SHORT_LEN]
+        parts = []
+        if long_kws:
+            parts.append("(" + _trie_regex(long_kws) + ")")
+        if short_kws:
+            parts.append("(" + _trie_regex(short_kws) + r")(?:(?<=\w{3})s)?\b")
+        self.pattern = re.compile(r"\b(?:" + "|".join(parts) + ")") if parts else None
+        self._long_group = 1 if long_kws else None
+        self._short_group = (2 if long_kws else 1) if short_kws else None
+
+        # A word starting with "healthcare" also starts with "health": credit both.
+        self._implied: Dict[str, List[int]] = {
+            k: [index[k]] + [index[p] for p in long_kws if p != k and k.startswith(p)]
+            for k in long_kws
+        }
+        self._index = index
+
+    @property
+    def incidence(self):
+        """len(keywords) × len(groups) 0/1 matrix."""
+        if self._incidence is None:
+            import numpy as np
+            inc = np.zeros((len(self.keywords), len(self.groups)), dtype=float)
+            for i, gs in enumerate(self._keyword_groups):
+                inc[i, gs] = 1.0
+            self._incidence = inc
+        return self._incidence
+
+    def _scan(self, text: str) -> List[int]:
+        """Keyword ids in order of first appearance."""
+        found: Dict[int, None] = {}
+        if self.pattern is None or not text:
+            return []
+        for m in self.pattern.finditer(text.lower()):
+            if self._long_group and m.group(self._long_group):
+                k = " ".join(m.group(self._long_group).replace("-", " ").split())
+                for i in self._implied.get(k, ()):
+                    found.setdefault(i)
+            else:
+                found.setdefault(self._index[m.group(self._short_group)])
+        return list(found)
+
+    def _ids(self, text: str) -> set:
+        return set(self._scan(text))
+
+    def find(self, text: str) -> List[str]:
+        """Distinct keywords found in `text`, in order of appearance."""
+        return [self.keywords[i] for i in self._scan(text or "")]
+
+    def matches(self, text: str) -> List[str]:
+        """Distinct keywords found in `text`, sorted."""
+        return sorted(self.keywords[i] for i in self._ids(text or ""))
+
+    def find_groups(self, text: str):
+        """(keywords in order of appearance, set of group names hit), from one scan."""
+        ids = self._scan(text or "")
+        groups = {self.groups[g] for i in ids for g in self._keyword_groups[i]}
+        return [self.keywords[i] for i in ids], groups
+
+    def group_hits(self, text: str) -> Dict[str, int]:
+        """Group name -> distinct keyword hits, for groups with at least one hit."""
+        out: Dict[str, int] = {}
+        for i in self._scan(text or ""):
+            for g in self._keyword_groups[i]:
+                name = self.groups[g]
+                out[name] = out.get(name, 0) + 1
+        return out
+
+    def hit_matrix(self, texts: Sequence[str]):
+        """N × len(keywords) 0/1 matrix of which keywords occur in each text."""
+        import numpy as np
+        hits = np.zeros((len(texts), len(self.keywords)), dtype=float)
+        for row, text in enumerate(texts):
+            ids = self._ids(text or "")
+            if ids:
+                hits[row, list(ids)] = 1.0
+        return hits
+
+    def counts(self, texts: Sequence[str]):
+        """N × len(groups) distinct-keyword hit counts."""
+        return self.hit_matrix(texts) @ self.incidence
@@ -1,19 +1,21 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Sequence
 import numpy as np
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from joblib import dump, load
+
+from .engine import LinearModel, export_npz
+from .keywords import KeywordMatcher
+from .registry import ModelRegistry, file_digest
+from .. import metrics
 
 # -------------------------
 # Paths / Artifacts
 # -------------------------
 BASE_DIR = Path(__file__).resolve().parent
 ART_DIR = BASE_DIR / "artifacts"
-ART_DIR.mkdir(parents=True, exist_ok=True)
 MODEL_PATH = ART_DIR / "model.joblib"
+NPZ_PATH = ART_DIR / "model.npz"  # NumPy-only export of MODEL_PATH, used for serving
+MMAP_PATH = ART_DIR / "model.mmap.json"  # same arrays as raw .npy files, memory-mapped and shared by workers
 
 # -------------------------
 # Labels / Interests
@@ -29,11 +31,17 @@ CAREERS: List[str] = [
     "Content Creator / Media",
 ]
 
+# Score features, in model column order (the 9th column is a fixed baseline)
+FEATURES: List[str] = [
+    "math", "science", "english", "arts",
+    "coding", "design", "leadership", "communication",
+]
+
 # Per-career keywords (used for post-probability boost)
 INTEREST_KEYWORDS: Dict[str, List[str]] = {
     "Software Engineer": ["code","coding","software","apps","web","robot","program","ml","ai","backend","frontend"],
     "Data Scientist": ["data","stats","statistics","analytics","machine learning","ml","ai","research","pandas","kaggle"],
-    "Doctor / Healthcare": ["bio","biology","medicine","health","care","doctor","hospital","clinic"],
+    "Doctor / Healthcare": ["bio","biology","medicine","health","healthcare","doctor","hospital","clinic"],
     "Lawyer / Legal": ["law","legal","justice","rights","policy","court","litigation","contract"],
     "Designer / UI-UX": ["design","ui","ux","graphic","art","creative","illustration","figma","wireframe"],
     "Entrepreneur / Manager": ["startup","business","entrepreneur","management","team","lead","pitch","mvp","marketing"],
@@ -41,177 +49,135 @@ INTEREST_KEYWORDS: Dict[str, List[str]] = {
     "Content Creator / Media": ["content","writer","blog","video","media","social","story","editor","script"],
 }
 
-# -------------------------
-# Training data synthesis
-# -------------------------
-def _rng():
-    return np.random.default_rng(7)
-
-def _make_samples_for(career: str, n: int = 140):
-    """Make synthetic training samples around a hand-crafted mean profile."""
-    bases = {
-        "Software Engineer":      [85, 75, 60, 40, 90, 45, 55, 60, 15],
-        "Data Scientist":         [88, 80, 65, 45, 75, 45, 55, 65, 15],
-        "Doctor / Healthcare":    [60, 92, 75, 45, 20, 40, 65, 70, 15],
-        "Lawyer / Legal":         [55, 55, 90, 55, 25, 45, 75, 85, 15],
-        "Designer / UI-UX":       [45, 45, 70, 90, 35, 92, 55, 70, 15],
-        "Entrepreneur / Manager": [65, 55, 75, 60, 45, 55, 92, 85, 15],
-        "Teacher / Academic":     [60, 60, 92, 55, 35, 45, 75, 85, 15],
-        "Content Creator / Media":[45, 45, 85, 75, 35, 70, 65, 92, 15],
-    }
-    mean = bases[career]
-    cov = np.diag([80, 80, 80, 80, 90, 90, 80, 80, 30])  # noise per feature
-    X = _rng().multivariate_normal(mean, cov, size=n).clip(0, 100)
-    y = np.full((n,), CAREERS.index(career), dtype=int)
-    return X, y
-
-def train_if_missing() -> None:
-    if MODEL_PATH.exists():
-        return
-    Xs, ys = [], []
-    for c in CAREERS:
-        Xc, yc = _make_samples_for(c, 140)
-        Xs.append(Xc)
-        ys.append(yc)
-    X = np.vstack(Xs)
-    y = np.concatenate(ys)
-
-    model = Pipeline([
-        ("scaler", StandardScaler()),
-        ("clf", LogisticRegression(max_iter=250, multi_class="multinomial"))
-    ])
-    model.fit(X, y)
-    dump(model, MODEL_PATH)
-
-def load_model() -> Pipeline:
-    train_if_missing()
-    return load(MODEL_PATH)
+# Training lives in training.py (`manage.py train_model`) and exporting in
+# export_model() (`manage.py train_model` / `manage.py export_model`); serving
+# only reads the exported artifact and never trains, exports or imports sklearn.
+
+def export_model() -> LinearModel:
+    """Write NPZ_PATH and MMAP_PATH from MODEL_PATH, checking parity with sklearn's predict_proba."""
+    from joblib import load
+    engine = export_npz(load(MODEL_PATH), NPZ_PATH, source=file_digest(MODEL_PATH))
+    engine.save_mmap(MMAP_PATH)
+    return engine
+
+def _checked(loader):
+    """Wrap an artifact loader so an export older than MODEL_PATH is refused."""
+    def load(path: Path) -> LinearModel:
+        engine = loader(path)
+        if MODEL_PATH.exists() and engine.source != file_digest(MODEL_PATH):
+            raise ValueError(f"{path} was not exported from the current {MODEL_PATH.name}; "
+                             "run `manage.py export_model`")
+        return engine
+    return load
+
+# One NumPy model per process; swapped when the exported artifact changes.
+MODEL_REGISTRY = ModelRegistry(NPZ_PATH, loader=_checked(LinearModel.load))
+
+def use_mmap(enabled: bool = True) -> None:
+    """
+    Serve from the memory-mapped MMAP_PATH instead of NPZ_PATH (set from
+    settings.MENTOR_MODEL_MMAP in MentorConfig.ready). Mapped arrays are
+    shared page cache, so N workers hold one copy of the weights instead of N.
+    """
+    if enabled:
+        MODEL_REGISTRY.retarget(MMAP_PATH, _checked(LinearModel.load_mmap))
+    else:
+        MODEL_REGISTRY.retarget(NPZ_PATH, _checked(LinearModel.load))
+
+def load_model() -> LinearModel:
+    if not MODEL_REGISTRY.is_ready() and not MODEL_REGISTRY.path.exists():
+        raise FileNotFoundError(f"{MODEL_REGISTRY.path} not found; run `manage.py train_model` "
+                                "(or `manage.py export_model` if model.joblib exists)")
+    return MODEL_REGISTRY.get()
 
 # -------------------------
 # Interest → per-career boost
 # -------------------------
+# One compiled pass over the text finds every keyword; per-career counts for a
+# whole batch are then a single matmul against the keyword × career incidence.
+INTEREST_MATCHER = KeywordMatcher(INTEREST_KEYWORDS, order=CAREERS)
+
+# scale: 0 hits -> 0.0, 1 hit -> 0.3, 2 -> 0.6, 3+ -> 1.0
+_HIT_SCORES = np.array([0.0, 0.3, 0.6, 1.0], dtype=float)
+
+INTEREST_ALPHA = 0.20  # up to +20% multiplicative boost for strong interest alignment
+BASELINE_FEATURE = 15.0  # keep the 9th feature at the training baseline (stable)
+
+def interest_score_matrix(interests_list: Sequence[str]) -> np.ndarray:
+    """N × len(CAREERS) interest scores in [0, 1], columns in CAREERS order."""
+    counts = INTEREST_MATCHER.counts(interests_list)
+    return _HIT_SCORES[np.minimum(counts, 3).astype(int)]
+
 def interest_scores_by_career(interests: str) -> Dict[str, float]:
     """
     Compute a lightweight per-career score in [0, 1] by counting keyword hits.
     """
-    text = (interests or "").lower()
-    scores: Dict[str, float] = {}
-    for career, kws in INTEREST_KEYWORDS.items():
-        hits = sum(1 for k in kws if k in text)
-        # scale: 0 hits -> 0.0, 1 hit -> 0.3, 2 -> 0.6, 3+ -> 1.0
-        if hits <= 0:
-            s = 0.0
-        elif hits == 1:
-            s = 0.3
-        elif hits == 2:
-            s = 0.6
-        else:
-            s = 1.0
-        scores[career] = s
-    return scores
-
-def _clip01(x: float) -> float:
-    return float(min(100.0, max(0.0, x)))
+    row = interest_score_matrix([interests])[0]
+    return {c: float(row[i]) for i, c in enumerate(CAREERS)}
 
 # -------------------------
 # Public API
 # -------------------------
-def predict_top3(
-    math, science, english, arts, coding, design, leadership, communication, interests
-) -> List[Tuple[str, float]]:
+def predict_topk_batch(
+    X, interests_list: Sequence[str], k: int = 3
+) -> List[List[Tuple[str, float]]]:
     """
-    Returns top-3 (career, probability) with interest-aware boosting.
-    Probabilities are re-normalized to sum to 1 after boosting.
+    Score N profiles at once.
+
+    `X` is N × 8 (columns in FEATURES order), `interests_list` holds the N
+    free-text interests. Returns, per row, the top-k (career, probability)
+    pairs after interest boosting, best first; each row's boosted
+    probabilities are re-normalized to sum to 1.
     """
+    X = np.asarray(X, dtype=float).reshape(-1, len(FEATURES))
+    if len(interests_list) != X.shape[0]:
+        raise ValueError(f"got {X.shape[0]} profiles but {len(interests_list)} interest strings")
+    n = X.shape[0]
+    if n == 0:
+        return []
+    k = max(1, min(int(k), len(CAREERS)))
+
     model = load_model()
 
-    # Defensive clipping to 0–100
-    vec = np.array([
-        _clip01(float(math)),
-        _clip01(float(science)),
-        _clip01(float(english)),
-        _clip01(float(arts)),
-        _clip01(float(coding)),
-        _clip01(float(design)),
-        _clip01(float(leadership)),
-        _clip01(float(communication)),
-        15.0,  # keep the 9th feature at the training baseline (stable)
-    ], dtype=float).reshape(1, -1)
-
-    probs = model.predict_proba(vec)[0]  # base probs from model
+    # Defensive clipping to 0–100, plus the fixed 9th feature
+    feats = np.empty((n, len(FEATURES) + 1), dtype=float)
+    np.clip(X, 0.0, 100.0, out=feats[:, :-1])
+    feats[:, -1] = BASELINE_FEATURE
+
+    with metrics.span("model_inference"):
+        probs = model.predict_proba(feats)  # base probs from model
 
     # Per-career interest boost (post-proc), then renormalize
-    scores = interest_scores_by_career(interests)
-    alpha = 0.20  # up to +20% multiplicative boost for strong interest alignment
-    boosts = np.array([1.0 + alpha * scores[c] for c in CAREERS], dtype=float)
-    boosted = probs * boosts
-    if boosted.sum() > 0:
-        boosted = boosted / boosted.sum()
+    with metrics.span("interest_scoring"):
+        interest = interest_score_matrix(interests_list)
+    boosted = probs * (1.0 + INTEREST_ALPHA * interest)
+    totals = boosted.sum(axis=1, keepdims=True)
+    np.divide(boosted, totals, out=boosted, where=totals > 0)
+
+    if k < len(CAREERS):
+        idx = np.argpartition(-boosted, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.tile(np.arange(len(CAREERS)), (n, 1))
+    top = np.take_along_axis(boosted, idx, axis=1)
+    order = np.argsort(-top, axis=1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    return [
+        [(CAREERS[j], float(p)) for j, p in zip(idx_row, top_row)]
+        for idx_row, top_row in zip(idx.tolist(), top.tolist())
+    ]
 
-    idx = np.argsort(boosted)[::-1][:3]
-    return [(CAREERS[i], float(boosted[i])) for i in idx]
+def predict_top3(
+    math, science, english, arts, coding, design, leadership, communication, interests
+) -> List[Tuple[str, float]]:
+    """
+    Returns top-3 (career, probability) with interest-aware boosting.
+    Probabilities are re-normalized to sum to 1 after boosting.
+    """
+    row = [float(v) for v in (math, science, english, arts, coding, design, leadership, communication)]
+    return predict_topk_batch([row], [interests], 3)[0]
 
 def tiny_roadmap(career: str) -> List[str]:
-    maps: Dict[str, List[str]] = {
-        "Software Engineer": [
-            "📘 Master DSA, OOP, and problem-solving (LeetCode/HackerRank)",
-            "💻 Build 3–5 projects (web/mobile/systems) with clean code",
-            "🛠 Git/GitHub, SQL/NoSQL, REST; one cloud (AWS/GCP/Azure)",
-            "⚙️ Basics of CI/CD, Docker; dip toes into Kubernetes",
-            "🚀 Internships, open-source; refine resume & LinkedIn"
-        ],
-        "Data Scientist": [
-            "📘 Stats/probability/linear-algebra + Python/R",
-            "📊 EDA & feature engineering (pandas/matplotlib)",
-            "🤖 ML (scikit-learn/XGBoost) → DL (PyTorch/TensorFlow)",
-            "🧠 2–3 domain projects (NLP/CV/time-series) with clear impact",
-            "📂 Kaggle/portfolio; communicate results & trade-offs"
-        ],
-        "Doctor / Healthcare": [
-            "📘 Bio/Chem foundations; entrance prep",
-            "🧪 Shadow/volunteer in clinics; basic patient comms",
-            "💡 Explore telemedicine & AI-assisted diagnostics",
-            "📚 Shortlist specializations; plan study timeline",
-            "🚀 Contribute to case studies or public health projects"
-        ],
-        "Lawyer / Legal": [
-            "📘 Legal writing & case-briefing drills",
-            "🗣 Debates/MUN; articulation & reasoning",
-            "🖥 Intro to cyber/IP law and tech contracts",
-            "📂 1–2 internships; pro bono or clinic work",
-            "🚀 Build a writing portfolio (notes/blogs)"
-        ],
-        "Designer / UI-UX": [
-            "🎨 Typography/color/design systems fundamentals",
-            "🛠 Figma (auto-layout, components, prototypes)",
-            "📱 Redesign 3–4 apps/sites; write case studies",
-            "♿ Accessibility & usability testing basics",
-            "📂 Portfolio site + Behance/Dribbble presence"
-        ],
-        "Entrepreneur / Manager": [
-            "💡 Validate 1–2 ideas with 10–20 real users",
-            "📊 Learn finance/marketing/product strategy basics",
-            "🛠 Build an MVP (no-code OK); measure usage",
-            "🤝 Join incubator/mentors; iterate pitch",
-            "🌍 Plan hiring/ops; document processes early"
-        ],
-        "Teacher / Academic": [
-            "📘 Subject depth + pedagogy basics",
-            "🧪 Design 5 lesson plans with outcomes",
-            "🎥 Record micro-lessons; collect feedback",
-            "🧑‍🏫 Tutor/TA experience; assessment design",
-            "📂 Share notes/videos; build a teacher brand"
-        ],
-        "Content Creator / Media": [
-            "🎯 Pick a niche; publish 2×/week",
-            "🎬 Storytelling/editing; hook-based scripting",
-            "🧰 Learn analytics & thumbnail/caption craft",
-            "🤝 Collaborate with 3 creators; cross-promote",
-            "💰 Map monetization (sponsorships/affiliates)"
-        ],
-    }
-    return maps.get(career, [
-        "📘 Strengthen fundamentals",
-        "💡 Build small projects and ship",
-        "🤝 Network & seek mentors"
-    ])
+    """Roadmap steps for a career; the text lives in careers.json / the content pack."""
+    from ..career_data import get_roadmap
+    return get_roadmap(career)
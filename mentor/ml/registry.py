@@ -0,0 +1,133 @@
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Used by registries created without an explicit interval; set from
+# settings.MENTOR_MODEL_CHECK_INTERVAL in MentorConfig.ready.
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 16) -> str:
+    """sha256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Holds one deserialized model per process.
+
+    The artifact is loaded on first use (or by `preload()` at app start) and
+    re-checked at most every `check_interval` seconds. A new mtime triggers a
+    hash of the file; only a changed hash triggers a reload, and the new model
+    replaces the old one in a single reference swap so concurrent readers
+    always see a complete model.
+    """
+
+    def __init__(self, path: Path, loader: Callable[[Path], Any], check_interval: Optional[float] = None):
+        self.path = Path(path)
+        self.loader = loader
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._model: Optional[Any] = None
+        self._mtime: Optional[int] = None
+        self._digest: Optional[str] = None
+        self._checked_at = 0.0
+        self._loaded_at: Optional[float] = None
+        self._loads = 0
+
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is None:
+            return DEFAULT_CHECK_INTERVAL
+        return self._check_interval
+
+    @check_interval.setter
+    def check_interval(self, value: Optional[float]) -> None:
+        self._check_interval = value
+
+    # -------------------------
+    # Read path
+    # -------------------------
+    def get(self) -> Any:
+        model = self._model
+        if model is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return model
+        return self._refresh(force=False)
+
+    def preload(self) -> Any:
+        return self._refresh(force=True)
+
+    def retarget(self, path: Path, loader: Callable[[Path], Any]) -> None:
+        """Serve a different artifact from now on; the current model is kept until it loads."""
+        with self._lock:
+            self.path = Path(path)
+            self.loader = loader
+            self._mtime = None
+            self._digest = None
+            self._checked_at = 0.0
+
+    def is_ready(self) -> bool:
+        return self._model is not None
+
+    @property
+    def version(self) -> Optional[str]:
+        """Hash of the artifact currently being served (None until loaded)."""
+        return self._digest
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "path": str(self.path),
+            "version": self._digest,
+            "loaded_at": self._loaded_at,
+            "loads": self._loads,
+        }
+
+    # -------------------------
+    # Reload
+    # -------------------------
+    def _refresh(self, force: bool) -> Any:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._model is not None and now - self._checked_at < self.check_interval:
+                return self._model  # another thread refreshed while we waited
+            self._checked_at = now
+
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                if self._model is not None:
+                    logger.warning("Model artifact %s disappeared; serving the loaded model", self.path)
+                    return self._model
+                raise
+
+            if mtime == self._mtime and self._model is not None:
+                return self._model
+
+            digest = file_digest(self.path)
+            if digest != self._digest or self._model is None:
+                try:
+                    model = self.loader(self.path)
+                except Exception:
+                    if self._model is None:
+                        raise
+                    logger.exception("Reloading %s failed; keeping the previous model", self.path)
+                    return self._model
+                self._model = model
+                self._digest = digest
+                self._loaded_at = time.time()
+                self._loads += 1
+                logger.info("Loaded model %s (sha256 %s)", self.path.name, digest[:12])
+            self._mtime = mtime
+            return self._model
@@ -0,0 +1,247 @@
+from __future__ import annotations
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .model import BASELINE_FEATURE, CAREERS, FEATURES, MODEL_PATH
+from .registry import file_digest
+
+# -------------------------
+# Synthetic profiles
+# -------------------------
+# Hand-crafted mean profile per career: the 8 scores in FEATURES order plus
+# the fixed 9th baseline column.
+CAREER_MEANS: Dict[str, List[float]] = {
+    "Software Engineer":      [85, 75, 60, 40, 90, 45, 55, 60, 15],
+    "Data Scientist":         [88, 80, 65, 45, 75, 45, 55, 65, 15],
+    "Doctor / Healthcare":    [60, 92, 75, 45, 20, 40, 65, 70, 15],
+    "Lawyer / Legal":         [55, 55, 90, 55, 25, 45, 75, 85, 15],
+    "Designer / UI-UX":       [45, 45, 70, 90, 35, 92, 55, 70, 15],
+    "Entrepreneur / Manager": [65, 55, 75, 60, 45, 55, 92, 85, 15],
+    "Teacher / Academic":     [60, 60, 92, 55, 35, 45, 75, 85, 15],
+    "Content Creator / Media":[45, 45, 85, 75, 35, 70, 65, 92, 15],
+}
+NOISE_VAR = [80, 80, 80, 80, 90, 90, 80, 80, 30]  # diagonal covariance, per feature
+
+SOLVERS = ("lbfgs", "newton-cg", "sag", "saga", "sgd")
+META_PATH = MODEL_PATH.with_suffix(".meta.json")
+# incremental runs save progress here; MODEL_PATH is only replaced when the run is exported
+CHECKPOINT_PATH = MODEL_PATH.with_name("model.checkpoint.joblib")
+CHECKPOINT_META_PATH = CHECKPOINT_PATH.with_suffix(".meta.json")
+
+
+def iter_samples(
+    n_per_class: int, seed: int = 7, chunk_size: int = 200_000
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (X, y) chunks of a class-balanced synthetic set of
+    n_per_class × len(CAREERS) rows.
+
+    Each chunk is one vectorized draw for all classes (means[y] + noise) from
+    a single generator, so every class gets its own noise and memory is
+    bounded by `chunk_size` however many samples are requested. The same
+    seed always yields the same stream.
+    """
+    means = np.asarray([CAREER_MEANS[c] for c in CAREERS], dtype=float)
+    std = np.sqrt(np.asarray(NOISE_VAR, dtype=float))
+    rng = np.random.default_rng(seed)
+    k = len(CAREERS)
+    total = n_per_class * k
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        y = np.arange(start, stop) % k
+        rng.shuffle(y)
+        X = means[y] + rng.standard_normal((stop - start, means.shape[1])) * std
+        np.clip(X, 0, 100, out=X)
+        yield X, y
+
+
+def make_samples(n_per_class: int, seed: int = 7, chunk_size: int = 200_000) -> Tuple[np.ndarray, np.ndarray]:
+    chunks = list(iter_samples(n_per_class, seed, chunk_size))
+    return np.vstack([X for X, _y in chunks]), np.concatenate([y for _X, y in chunks])
+
+
+# -------------------------
+# Training
+# -------------------------
+def train(
+    n_per_class: int = 140,
+    seed: int = 7,
+    solver: str = "lbfgs",
+    n_jobs: Optional[int] = None,
+    chunk_size: int = 200_000,
+    max_iter: int = 250,
+    epochs: int = 5,
+):
+    """
+    Fit Pipeline([("scaler", StandardScaler), ("clf", ...)]) on synthetic data.
+
+    "lbfgs", "newton-cg", "sag" and "saga" fit a multinomial
+    LogisticRegression on the materialized set; "sgd" streams the chunks
+    through StandardScaler.partial_fit and then `epochs` passes of
+    SGDClassifier(loss="log_loss").partial_fit, so memory stays at one chunk.
+    Returns (pipeline, info).
+    """
+    # scikit-learn is only needed to train, never to serve
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r}; choose from {', '.join(SOLVERS)}")
+    info = {"seed": seed, "n_per_class": n_per_class, "n_samples": n_per_class * len(CAREERS),
+            "solver": solver, "n_jobs": n_jobs, "chunk_size": chunk_size}
+    started = time.perf_counter()
+
+    if solver == "sgd":
+        scaler = StandardScaler()
+        for X, _y in iter_samples(n_per_class, seed, chunk_size):
+            scaler.partial_fit(X)
+        clf = SGDClassifier(loss="log_loss", n_jobs=n_jobs, random_state=seed)
+        classes = np.arange(len(CAREERS))
+        for _ in range(epochs):
+            for X, y in iter_samples(n_per_class, seed, chunk_size):
+                clf.partial_fit(scaler.transform(X), y, classes=classes)
+        model = Pipeline([("scaler", scaler), ("clf", clf)])
+        info["epochs"] = epochs
+        info["fit_s"] = round(time.perf_counter() - started, 3)
+    else:
+        X, y = make_samples(n_per_class, seed, chunk_size)
+        info["generate_s"] = round(time.perf_counter() - started, 3)
+        fit_started = time.perf_counter()
+        model = Pipeline([
+            ("scaler", StandardScaler()),
+            ("clf", LogisticRegression(max_iter=max_iter, multi_class="multinomial", solver=solver, n_jobs=n_jobs)),
+        ])
+        model.fit(X, y)
+        info["max_iter"] = max_iter
+        info["fit_s"] = round(time.perf_counter() - fit_started, 3)
+
+    info["total_s"] = round(time.perf_counter() - started, 3)
+    return model, info
+
+
+def holdout_accuracy(model, n_per_class: int = 1000, seed: int = 7) -> float:
+    """Accuracy on a fresh draw (a different seed than training)."""
+    X, y = make_samples(n_per_class, seed=seed + 1)
+    return float((model.predict(X) == y).mean())
+
+
+def save_artifact(model, info: dict, path: Path = MODEL_PATH, meta_path: Path = META_PATH) -> dict:
+    """
+    Dump the pipeline and its metadata JSON next to it. Both are written to
+    tmp files first and only then renamed into place, so a failed dump
+    leaves the previous pair untouched.
+    """
+    from joblib import dump
+    import sklearn
+
+    path, meta_path = Path(path), Path(meta_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    meta_tmp = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+    try:
+        dump(model, tmp)
+        meta = dict(info, sha256=file_digest(tmp), sklearn=sklearn.__version__, numpy=np.__version__,
+                    created=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        meta_tmp.write_text(json.dumps(meta, indent=2) + "\n")
+        os.replace(tmp, path)
+        os.replace(meta_tmp, meta_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+        meta_tmp.unlink(missing_ok=True)
+    return meta
+
+
+def load_meta(meta_path: Path = META_PATH) -> dict:
+    try:
+        return json.loads(Path(meta_path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+# -------------------------
+# Incremental updates from stored assessments
+# -------------------------
+def iter_assessment_chunks(
+    after_pk: int = 0, until_pk: Optional[int] = None, chunk_size: int = 5_000
+) -> Iterator[Tuple[np.ndarray, np.ndarray, int]]:
+    """
+    Yield (X, y, last_pk) for Assessment rows with after_pk < pk <= until_pk,
+    in pk order, chunk_size rows at a time.
+
+    Rows are read with values_list(...).iterator(chunk_size), so neither
+    model instances nor the whole table are ever held in memory. X has the
+    model's 9 columns (scores plus BASELINE_FEATURE); y is the index in
+    CAREERS of the stored top_career. Rows with no or an unknown top career
+    are skipped.
+    """
+    from mentor.models import Assessment  # only this mode needs Django
+
+    label_of = {c: i for i, c in enumerate(CAREERS)}
+    qs = Assessment.objects.filter(pk__gt=after_pk).exclude(top_career="")
+    if until_pk is not None:
+        qs = qs.filter(pk__lte=until_pk)
+    rows = qs.order_by("pk").values_list("pk", "top_career", *FEATURES).iterator(chunk_size=chunk_size)
+
+    X = np.empty((chunk_size, len(FEATURES) + 1), dtype=float)
+    X[:, -1] = BASELINE_FEATURE
+    y = np.empty(chunk_size, dtype=int)
+    n = 0
+    last_pk = emitted_pk = after_pk
+    for pk, career, *scores in rows:
+        last_pk = pk
+        label = label_of.get(career)
+        if label is None:
+            continue
+        X[n, :-1] = scores
+        y[n] = label
+        n += 1
+        if n == chunk_size:
+            yield np.clip(X, 0, 100), y.copy(), last_pk
+            n, emitted_pk = 0, last_pk
+    if last_pk != emitted_pk:
+        yield np.clip(X[:n], 0, 100), y[:n].copy(), last_pk
+
+
+def update_from_assessments(
+    model, after_pk: int = 0, chunk_size: int = 5_000, on_checkpoint=None, checkpoint_every: int = 20
+):
+    """
+    Continue training an SGD pipeline (see train(solver="sgd")) on stored
+    assessments newer than `after_pk`, one partial_fit per chunk.
+
+    The scaler is kept as fitted so the existing weights stay meaningful. The
+    labels are the top careers the app showed, interest boost included, so
+    this pulls the score-only model towards what users were actually told.
+    Rows written while the update runs are left for the next run.
+    `on_checkpoint(model, info)` is called every `checkpoint_every` chunks and
+    at the end (unless there was nothing new). Returns info with last_pk and
+    the row count.
+    """
+    from mentor.models import Assessment
+
+    clf = model.named_steps["clf"]
+    if not hasattr(clf, "partial_fit"):
+        raise ValueError(f"{type(clf).__name__} can't be updated incrementally; train with solver='sgd' first")
+    scaler = model.named_steps["scaler"]
+    classes = np.arange(len(CAREERS))
+    until_pk = Assessment.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+    started = time.perf_counter()
+    info = {"after_pk": after_pk, "last_pk": after_pk, "rows": 0}
+    for i, (X, y, last_pk) in enumerate(iter_assessment_chunks(after_pk, until_pk, chunk_size), 1):
+        if len(y):
+            clf.partial_fit(scaler.transform(X), y, classes=classes)
+        info["last_pk"] = last_pk
+        info["rows"] += len(y)
+        if on_checkpoint is not None and i % checkpoint_every == 0:
+            on_checkpoint(model, dict(info, update_s=round(time.perf_counter() - started, 3)))
+    info["update_s"] = round(time.perf_counter() - started, 3)
+    if on_checkpoint is not None and info["last_pk"] != after_pk:
+        on_checkpoint(model, info)
+    return info
@@ -1,7 +1,24 @@
 from django.db import models
+from django.db.models import Count
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+
+class AssessmentQuerySet(models.QuerySet):
+    def top_career_counts(self, since=None, until=None):
+        """
+        {career: number of assessments where it was the top match}, counted in
+        SQL over the (top_career, created_at) index.
+        """
+        qs = self.exclude(top_career="")
+        if since is not None:
+            qs = qs.filter(created_at__gte=since)
+        if until is not None:
+            qs = qs.filter(created_at__lt=until)
+        rows = qs.order_by().values("top_career").annotate(n=Count("id")).order_by("-n", "top_career")
+        return {r["top_career"]: r["n"] for r in rows}
+
+
 class Assessment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="assessments")
     # Inputs
@@ -15,18 +32,64 @@ class Assessment(models.Model):
     communication = models.FloatField()
     interests = models.TextField(blank=True)
 
-    # Store JSON as TEXT (since SQLite JSONField isn’t available)
-    top3 = models.TextField()  # JSON string: e.g. '[{"career":"...", "prob":0.83}, ...]'
+    # Best first, probs 0..1: [{"career": "...", "prob": 0.83}, ...]
+    top3 = models.JSONField(default=list)
+    # top3[0]["career"], kept as a column so per-career counts are indexed SQL
+    top_career = models.CharField(max_length=100, blank=True, default="")
 
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = AssessmentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # history pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC, seeking by (created_at, id);
+            # top_career is the only other column a page shows, so the scan never touches the table
+            models.Index(fields=["user", "-created_at", "-id", "top_career"], name="assessment_user_created_idx"),
+            # "how many got X as top match this month": WHERE top_career = ? AND created_at >= ?
+            models.Index(fields=["top_career", "created_at"], name="assessment_top_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} · {self.created_at:%Y-%m-%d %H:%M}"
-# in Assessment model
-import json
-@property
-def top3_list(self):
+
+    def save(self, *args, **kwargs):
+        self.top_career = top_career_of(self.top3)
+        super().save(*args, **kwargs)
+
+
+def top_career_of(top3):
+    """Career name of the best entry in a top3 list, or ""."""
     try:
-        return json.loads(self.top3) if self.top3 else []
-    except Exception:
-        return []
+        return str(top3[0]["career"])[:100]
+    except (IndexError, KeyError, TypeError):
+        return ""
+
+
+class CohortDailyStats(models.Model):
+    """
+    Running totals over Assessment per local day and top career, kept current
+    by mentor.cohorts on every save and delete, so the cohort dashboard reads
+    at most days × careers rows however many assessments exist. Recompute
+    with `manage.py rebuild_cohorts`.
+    """
+    day = models.DateField()
+    career = models.CharField(max_length=100, blank=True)  # Assessment.top_career
+    count = models.BigIntegerField(default=0)
+    # Sums of the input scores, for per-career means
+    sum_math = models.FloatField(default=0.0)
+    sum_science = models.FloatField(default=0.0)
+    sum_english = models.FloatField(default=0.0)
+    sum_arts = models.FloatField(default=0.0)
+    sum_coding = models.FloatField(default=0.0)
+    sum_design = models.FloatField(default=0.0)
+    sum_leadership = models.FloatField(default=0.0)
+    sum_communication = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "career"], name="cohort_daily_day_career_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} · {self.career or '—'} · {self.count}"
@@ -0,0 +1,24 @@
+"""
+HTML -> PDF conversion, run inside the report process pool.
+
+Kept free of Django imports so pool workers start quickly and never touch the
+settings or the database; the request process renders the HTML beforehand.
+"""
+import os
+
+
+def render_pdf(html, path):
+    """Write `html` as a PDF to `path` atomically and return `path`."""
+    from xhtml2pdf import pisa
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            result = pisa.CreatePDF(html, dest=f)
+        if result.err:
+            raise RuntimeError(f"xhtml2pdf reported {result.err} error(s)")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
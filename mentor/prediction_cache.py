@@ -0,0 +1,134 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .lazy import LazyModule
+
+ml = LazyModule("mentor.ml.model")
+
+DEFAULTS = {
+    "ENABLED": True,
+    "STEP": 0.0,       # > 0 rounds scores to a multiple of this before keying (opt-in)
+    "MAXSIZE": 4096,   # per-process LRU entries
+    "BACKEND": None,   # alias in settings.CACHES to share entries across workers
+    "TIMEOUT": 3600,   # seconds, for the shared backend
+}
+
+
+class PredictionCache:
+    """
+    Memoizes predict_top3 on (scores, matched interest keywords, model version).
+
+    The 8 scores are clipped to 0–100 (which the model does anyway) and the
+    interests text is reduced to the sorted keywords it matched, which is all
+    the model sees of it, so with the default step of 0 a cached value is
+    exactly what the model would return. Misses are always computed from the
+    raw inputs. A step > 0 is an opt-in approximation: scores are rounded to
+    that multiple before keying, so near-identical profiles share the first
+    prediction made for their bucket. The model's artifact hash is part of
+    the key, so a model swap invalidates everything; the local LRU is also
+    dropped when the version changes.
+
+    Lookups go local LRU → shared Django cache (if configured) → model.
+    """
+
+    def __init__(self, step=0.0, maxsize=4096, backend=None, timeout=3600, enabled=True):
+        self.step = float(step)
+        self.maxsize = int(maxsize)
+        self.backend = backend
+        self.timeout = timeout
+        self.enabled = enabled
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls):
+        conf = dict(DEFAULTS, **getattr(settings, "MENTOR_PREDICTION_CACHE", {}))
+        return cls(step=conf["STEP"], maxsize=conf["MAXSIZE"], backend=conf["BACKEND"],
+                   timeout=conf["TIMEOUT"], enabled=conf["ENABLED"])
+
+    def _quantize(self, x):
+        x = min(100.0, max(0.0, float(x)))
+        if self.step <= 0:
+            return x
+        return round(round(x / self.step) * self.step, 6)
+
+    def key_parts(self, scores, interests):
+        """(keyed scores, canonical interests) for a raw profile."""
+        q = tuple(self._quantize(s) for s in scores)
+        return q, " ".join(ml.INTEREST_MATCHER.matches(interests or ""))
+
+    def _key(self, version, q, canon):
+        raw = f"{version}|{self.step}|{','.join(map(repr, q))}|{canon}"
+        return "mentor:pred:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def predict_top3(self, math, science, english, arts, coding, design, leadership, communication, interests):
+        scores = (math, science, english, arts, coding, design, leadership, communication)
+        if not self.enabled:
+            return ml.predict_top3(*scores, interests)
+
+        ml.load_model()  # make sure the registry knows the current version
+        version = ml.MODEL_REGISTRY.version
+        q, canon = self.key_parts(scores, interests)
+        key = self._key(version, q, canon)
+
+        with self._lock:
+            if version != self._version:
+                self._lru.clear()
+                self._version = version
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                metrics.cache_hit("prediction")
+                return list(value)
+
+        shared = caches[self.backend] if self.backend else None
+        value = shared.get(key) if shared is not None else None
+        if value is not None:
+            self.shared_hits += 1
+            metrics.cache_hit("prediction_shared")
+        else:
+            self.misses += 1
+            metrics.cache_miss("prediction")
+            value = ml.predict_top3(*scores, interests)
+            if shared is not None:
+                shared.set(key, value, self.timeout)
+
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+        return list(value)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "step": self.step,
+            "size": len(self._lru),
+            "maxsize": self.maxsize,
+            "backend": self.backend,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+        }
+
+
+PREDICTION_CACHE = PredictionCache.from_settings()
+metrics.register_gauge("mentor_prediction_cache_entries", "Entries in the local prediction LRU.",
+                       lambda: len(PREDICTION_CACHE._lru))
@@ -0,0 +1,124 @@
+"""
+Per-request sampling profiler.
+
+While a profiled request runs, a helper thread reads the request thread's
+stack from sys._current_frames() every INTERVAL seconds and counts each
+stack. The result is stored in the collapsed format used by flamegraph.pl
+and speedscope ("root;caller;callee count" per line) in a bounded
+directory: once MAX_FILES profiles exist the oldest is deleted. The sampler
+needs the GIL to take a sample, so the effective resolution is no finer than
+sys.getswitchinterval() (5 ms by default); it is meant for slow requests.
+
+Nothing here runs unless ProfilingMiddleware decides to profile a request
+(staff opt-in via ?__profile=1 or an X-Mentor-Profile: 1 header, or the
+random SAMPLE_PERCENT).
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULTS = {
+    "DIR": None,            # defaults to BASE_DIR / "var" / "profiles"
+    "MAX_FILES": 50,        # ring buffer size
+    "INTERVAL": 0.005,      # seconds between samples
+    "SAMPLE_PERCENT": 0.0,  # profile this share of all requests automatically
+}
+
+PROFILE_NAME = re.compile(r"\d+-[A-Z]+-\d{3}-\d+ms-[\w.-]*\.collapsed")
+_SLUG = re.compile(r"[^A-Za-z0-9]+")
+
+
+def conf():
+    c = dict(DEFAULTS, **getattr(settings, "MENTOR_PROFILER", {}))
+    c["DIR"] = Path(c["DIR"] or Path(settings.BASE_DIR) / "var" / "profiles")
+    return c
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse(frame):
+    """'root;...;leaf' for a frame and its callers."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples one thread's stack from a helper thread until stop()."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mentor-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[collapse(frame)] += 1
+
+
+def save(counts, method, path, status, elapsed_ms):
+    """Write a collapsed-stack profile into the ring buffer; returns the file name."""
+    c = conf()
+    directory = c["DIR"]
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = _SLUG.sub("-", path).strip("-")[:80] or "root"
+    name = f"{time.time_ns()}-{method}-{status:03d}-{int(elapsed_ms)}ms-{slug}.collapsed"
+    body = "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+    tmp = directory / (name + ".tmp")
+    tmp.write_text(body)
+    os.replace(tmp, directory / name)
+
+    profiles = sorted(directory.glob("*.collapsed"))
+    for old in profiles[:max(0, len(profiles) - int(c["MAX_FILES"]))]:
+        old.unlink(missing_ok=True)
+    return name
+
+
+def list_profiles():
+    """Newest first: dicts with name, created, method, status, ms, label, size."""
+    directory = conf()["DIR"]
+    out = []
+    for f in sorted(directory.glob("*.collapsed"), reverse=True) if directory.exists() else []:
+        ts, method, status, ms, slug = f.stem.split("-", 4)
+        out.append({
+            "name": f.name,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(int(ts) / 1e9)),
+            "method": method,
+            "status": int(status),
+            "ms": int(ms[:-2]),
+            "label": slug,
+            "size": f.stat().st_size,
+        })
+    return out
+
+
+def profile_path(name):
+    """Path of a stored profile, or None for names that aren't ours."""
+    if not PROFILE_NAME.fullmatch(name):
+        return None
+    path = conf()["DIR"] / name
+    return path if path.exists() else None
@@ -0,0 +1,251 @@
+"""
+PDF reports rendered off the request path.
+
+The request renders the report HTML (cheap, needs Django) and hands it to a
+process pool that runs xhtml2pdf (CPU-heavy, needs nothing else), so a burst
+of downloads queues behind a fixed number of processes instead of holding web
+workers. Finished files live in MENTOR_REPORTS["DIR"] as
+`<assessment pk>-<version>.pdf`; the version hashes the report template and
+the career data version (content pack or careers.json), so each report is
+rendered once and then served from disk until either changes. Files are removed when the assessment is
+deleted (see mentor.signals).
+"""
+import hashlib
+import importlib.util
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+
+from . import metrics
+from .career_data import CATALOG, get_career_info
+from .pdf_worker import render_pdf
+
+DEFAULTS = {
+    "DIR": None,         # defaults to BASE_DIR / "var" / "reports"
+    "WORKERS": 2,        # renderer processes
+    "TEMPLATE": "mentor/report_pdf.html",
+    "RETRY_AFTER": 300,  # seconds a failed render is reported as failed before a submit retries it
+}
+
+
+def engine_available():
+    """True if xhtml2pdf is installed, without importing it in this process."""
+    return importlib.util.find_spec("xhtml2pdf") is not None
+
+
+class ReportJobs:
+    """
+    Render-once cache of assessment reports backed by a process pool.
+
+    `submit(assessment)` returns a concurrent.futures.Future resolving to the
+    PDF path. Reports already on disk resolve immediately, and a report that is
+    being rendered returns the running job. A failed job is returned as is for
+    `retry_after` seconds, then the next submit renders it again; a new report
+    version (template or career data) gets a fresh job straight away.
+    `state(assessment)` reports progress without queueing anything.
+    """
+
+    def __init__(self, directory, workers=2, template="mentor/report_pdf.html", retry_after=300):
+        self.dir = Path(directory)
+        self.workers = int(workers)
+        self.template_name = template
+        self.retry_after = float(retry_after)
+        self._template_digest = None
+        self._pool = None
+        self._jobs = {}  # path -> Future, while pending or after a failure
+        self._lock = threading.RLock()  # done-callbacks may run in the submitting thread
+
+    @classmethod
+    def from_settings(cls):
+        conf = dict(DEFAULTS, **getattr(settings, "MENTOR_REPORTS", {}))
+        directory = conf["DIR"] or Path(settings.BASE_DIR) / "var" / "reports"
+        return cls(directory, workers=conf["WORKERS"], template=conf["TEMPLATE"], retry_after=conf["RETRY_AFTER"])
+
+    def version(self):
+        if self._template_digest is None:
+            origin = get_template(self.template_name).origin.name
+            self._template_digest = hashlib.sha256(Path(origin).read_bytes()).hexdigest()
+        raw = f"{self._template_digest}|{CATALOG.version or ''}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+    def path_for(self, assessment):
+        return self.dir / f"{assessment.pk}-{self.version()}.pdf"
+
+    def context(self, assessment):
+        top3 = [{"career": item["career"], "prob": float(item["prob"]) * 100.0} for item in assessment.top3 or []]
+        return {
+            "assessment": assessment,
+            "top3": top3,
+            "career_info": get_career_info([t["career"] for t in top3]),
+        }
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn: forking a threaded web worker is unsafe, and the workers need no Django state
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _current(self, path):
+        """The job for `path`: running, or failed less than retry_after seconds ago."""
+        job = self._jobs.get(path)
+        if job is None or not job.done() or job.exception() is None:
+            return job
+        failed_at = getattr(job, "failed_at", None)  # unset until the done-callback has run
+        if failed_at is not None and time.monotonic() - failed_at >= self.retry_after:
+            return None
+        return job
+
+    def submit(self, assessment):
+        path = self.path_for(assessment)
+        if path.exists():
+            metrics.cache_hit("report")
+            done = Future()
+            done.set_result(str(path))
+            return done
+        with self._lock:
+            job = self._current(path)
+        if job is not None:
+            return job
+
+        metrics.cache_miss("report")
+        with metrics.span("report_html"):
+            html = get_template(self.template_name).render(self.context(assessment))
+        with self._lock:
+            job = self._current(path)
+            if job is None:
+                self.dir.mkdir(parents=True, exist_ok=True)
+                self.discard(assessment.pk, keep=path)  # reports for older versions
+                try:
+                    job = self._executor().submit(render_pdf, html, str(path))
+                except BrokenProcessPool:
+                    # a renderer died (e.g. OOM-killed): start a fresh pool once
+                    self._pool.shutdown(wait=False)
+                    self._pool = None
+                    job = self._executor().submit(render_pdf, html, str(path))
+                self._jobs[path] = job
+                queued = time.perf_counter()
+                job.add_done_callback(lambda f, path=path, queued=queued: self._finished(path, f, queued))
+            return job
+
+    def _finished(self, path, job, queued):
+        # queue wait + pool render; recorded in the pool's result thread
+        metrics.observe("mentor_span_seconds", time.perf_counter() - queued, span="pdf_render")
+        if job.exception() is not None:
+            job.failed_at = time.monotonic()
+            return
+        with self._lock:
+            if self._jobs.get(path) is job:
+                del self._jobs[path]
+
+    def state(self, assessment):
+        """
+        ("ready" | "pending" | "failed" | "missing", error or None) for this
+        worker's view of the report; never queues a render. "missing" means
+        nothing is on disk and this worker has no job for it.
+        """
+        path = self.path_for(assessment)
+        if path.exists():
+            return "ready", None
+        with self._lock:
+            job = self._jobs.get(path)
+        if job is None:
+            return "missing", None
+        if not job.done():
+            return "pending", None
+        exc = job.exception()
+        return ("failed", str(exc)) if exc is not None else ("ready", None)
+
+    def discard(self, pk, keep=None):
+        """Delete cached reports for assessment `pk` (except `keep`)."""
+        with self._lock:
+            for path in [p for p in self._jobs if p.name.startswith(f"{pk}-") and p != keep]:
+                if self._jobs[path].done():
+                    del self._jobs[path]
+        for path in self.dir.glob(f"{pk}-*.pdf"):
+            if path != keep:
+                path.unlink(missing_ok=True)
+
+    def as_completed(self, assessments, window=None):
+        """
+        Yield (assessment, job) as each report finishes. At most `window`
+        (default 2 × workers) renders are in flight, so memory stays flat
+        however many assessments are passed.
+        """
+        window = window or self.workers * 2
+        pending = {}
+        todo = iter(assessments)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                assessment = next(todo, None)
+                if assessment is None:
+                    exhausted = True
+                else:
+                    pending[self.submit(assessment)] = assessment
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for job in done:
+                yield pending.pop(job), job
+
+    def zip_stream(self, assessments, filename_for):
+        """
+        Yield a ZIP archive of the reports in chunks, adding each PDF as soon
+        as it is ready. Reports that fail are listed in errors.txt instead.
+        """
+        sink = _ZipSink()
+        failed = []
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:  # PDFs are compressed already
+            for assessment, job in self.as_completed(assessments):
+                name = filename_for(assessment)
+                try:
+                    with open(job.result(), "rb") as src:
+                        info = zipfile.ZipInfo(name, date_time=assessment.created_at.timetuple()[:6])
+                        with zf.open(info, "w") as dst:
+                            while chunk := src.read(64 * 1024):
+                                dst.write(chunk)
+                                yield sink.drain()
+                except Exception as exc:  # render failure, or the file vanished under us
+                    failed.append(f"{name}: {exc}")
+                yield sink.drain()
+            if failed:
+                zf.writestr("errors.txt", "\n".join(failed) + "\n")
+        yield sink.drain()
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job.done())
+            failed = len(self._jobs) - pending
+        return {"workers": self.workers, "pending": pending, "failed": failed, "dir": str(self.dir)}
+
+
+class _ZipSink:
+    """Write-only, unseekable file for ZipFile; drain() hands out what was written."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+REPORTS = ReportJobs.from_settings()
+metrics.register_gauge("mentor_report_jobs_pending", "PDF reports queued or rendering in the pool.",
+                       lambda: REPORTS.stats()["pending"])
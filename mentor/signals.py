@@ -0,0 +1,58 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cohorts
+from .chat_context import invalidate as invalidate_chat_context
+from .models import Assessment
+from .reports import REPORTS
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Assessment, dispatch_uid="mentor.chat_context.save")
+@receiver(post_delete, sender=Assessment, dispatch_uid="mentor.chat_context.delete")
+def _drop_chat_context(sender, instance, **kwargs):
+    # after commit: dropped any earlier, a concurrent chat could re-cache the old row
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_chat_context(user_id))
+
+
+def assessments_created(instances):
+    """What the post_save receivers do, for rows written with bulk_create (no signals)."""
+    for user_id in {a.user_id for a in instances}:
+        transaction.on_commit(lambda user_id=user_id: invalidate_chat_context(user_id))
+    try:
+        cohorts.apply(added=[cohorts.row_of(a) for a in instances])
+    except Exception:
+        # the rows are already committed; `manage.py rebuild_cohorts` repairs the summary
+        logger.exception("Cohort summary update for %d assessments failed", len(instances))
+
+
+@receiver(post_delete, sender=Assessment, dispatch_uid="mentor.reports.delete")
+def _drop_reports(sender, instance, **kwargs):
+    REPORTS.discard(instance.pk)
+
+
+# -------------------------
+# Cohort summary (mentor.cohorts)
+# -------------------------
+@receiver(pre_save, sender=Assessment, dispatch_uid="mentor.cohorts.pre_save")
+def _remember_cohort_row(sender, instance, raw=False, **kwargs):
+    # updates are rare; only they pay a query for the values being replaced
+    instance._cohort_old = None if (raw or instance._state.adding) else cohorts.stored_row(instance.pk)
+
+
+@receiver(post_save, sender=Assessment, dispatch_uid="mentor.cohorts.save")
+def _count_cohort_row(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # fixtures: run rebuild_cohorts after loading
+    old = instance.__dict__.pop("_cohort_old", None)
+    cohorts.apply(added=[cohorts.row_of(instance)], removed=[old] if old else ())
+
+
+@receiver(post_delete, sender=Assessment, dispatch_uid="mentor.cohorts.delete")
+def _uncount_cohort_row(sender, instance, **kwargs):
+    cohorts.apply(removed=[cohorts.row_of(instance)])
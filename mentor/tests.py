@@ -1,3 +1,1431 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import AsyncClient, Client, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import chat_context, cohorts, metrics, profiling, reports, signals, views
+from .career_data import DEFAULT_ROADMAP, CareerCatalog
+from .chatbot import ROUTER
+from .content_pack import build_pack
+from .ml import model as ml_model, training
+from .ml.engine import LinearModel
+from .ml.registry import ModelRegistry, file_digest
+from .models import Assessment, CohortDailyStats
+from .prediction_cache import PredictionCache
+from .write_behind import AssessmentWriter, _assessments_written
+
+
+class ChatConcurrencyTests(TransactionTestCase):
+    """Async chat endpoint vs. the sync one under the same burst of messages."""
+
+    MESSAGES = [
+        "salary for data scientist",
+        "roadmap for ui/ux designer",
+        "courses for machine learning",
+        "compare data scientist vs software engineer",
+        "jobs for strong math",
+        "government jobs",
+    ]
+    CONCURRENCY = 48
+
+    def setUp(self):
+        _private_shared_cache(self)
+        self.user = User.objects.create_user("chatter", password="pw")
+        Assessment.objects.create(
+            user=self.user, math=90, science=80, english=60, arts=40, coding=85,
+            design=30, leadership=50, communication=60, interests="data, ai",
+            top3=[{"career": "Data Scientist", "prob": 0.8}],
+        )
+
+    def _burst(self):
+        return [self.MESSAGES[i % len(self.MESSAGES)] for i in range(self.CONCURRENCY)]
+
+    def _run_sync(self, messages):
+        client = Client()
+        client.force_login(self.user)
+        url = reverse("mentor:chat_api")
+
+        def send(msg):
+            try:
+                return client.post(url, {"message": msg})
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(send, messages))
+        return responses, time.perf_counter() - started
+
+    def _run_async(self, messages):
+        client = AsyncClient()
+        client.force_login(self.user)
+        url = reverse("mentor:chat_api_async")
+
+        async def burst():
+            return await asyncio.gather(*(client.post(url, {"message": m}) for m in messages))
+
+        started = time.perf_counter()
+        responses = asyncio.run(burst())
+        return responses, time.perf_counter() - started
+
+    def test_async_replies_match_sync(self):
+        messages = self._burst()
+        sync_responses, sync_s = self._run_sync(messages)
+        async_responses, async_s = self._run_async(messages)
+
+        self.assertTrue(all(r.status_code == 200 for r in sync_responses))
+        self.assertTrue(all(r.status_code == 200 for r in async_responses))
+        self.assertEqual(
+            [r.json()["reply"] for r in sync_responses],
+            [r.json()["reply"] for r in async_responses],
+        )
+        sys.stderr.write(
+            f"\nchat throughput, {len(messages)} messages: "
+            f"sync (8 threads) {len(messages) / sync_s:.0f} msg/s, "
+            f"async (1 event loop) {len(messages) / async_s:.0f} msg/s\n"
+        )
+
+    def test_async_requires_login_and_post(self):
+        client = AsyncClient()
+        url = reverse("mentor:chat_api_async")
+        response = asyncio.run(client.post(url, {"message": "hi"}))
+        self.assertEqual(response.status_code, 302)
+        client.force_login(self.user)
+        response = asyncio.run(client.get(url))
+        self.assertEqual(response.status_code, 405)
+
+
+def _private_shared_cache(test):
+    """Point the "shared" cache alias at a temporary directory for this test."""
+    location = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, location, True)
+    test.enterContext(override_settings(CACHES=dict(settings.CACHES, shared=dict(
+        settings.CACHES["shared"], LOCATION=location))))
+    return location
+
+
+class ChatContextInvalidationTests(TransactionTestCase):
+    SCORES = dict(math=90, science=80, english=60, arts=40, coding=85, design=30, leadership=50, communication=60)
+
+    def setUp(self):
+        self.location = _private_shared_cache(self)
+        self.user = User.objects.create_user("chatter", password="pw")
+        self.client.force_login(self.user)
+
+    def _assess(self, **scores):
+        return Assessment.objects.create(user=self.user, interests="data", top3=[],
+                                         **dict(self.SCORES, **scores))
+
+    def _chat_context(self):
+        """The context the next chat reply is built from."""
+        with mock.patch.object(views, "chat_reply", wraps=views.chat_reply) as reply:
+            self.client.post(reverse("mentor:chat_api"), {"message": "salary for data scientist"})
+        return reply.call_args.args[1]
+
+    def test_new_assessment_changes_next_reply_context(self):
+        self.assertIsNone(self._chat_context())
+        self._assess()
+        self.assertEqual(self._chat_context().math, 90)
+        self._assess(math=20)
+        self.assertEqual(self._chat_context().math, 20)
+
+    def test_dropped_only_after_commit(self):
+        self._assess()
+        self._chat_context()
+        key = chat_context._key(self.user.pk)
+        with transaction.atomic():
+            self._assess(math=20)
+            self.assertIsNotNone(chat_context._cache().get(key))
+        self.assertIsNone(chat_context._cache().get(key))
+        self.assertEqual(self._chat_context().math, 20)
+
+    def test_other_workers_see_the_drop(self):
+        self._assess()
+        self._chat_context()
+        other_worker = FileBasedCache(self.location, {})  # a separate process's handle on the cache
+        key = chat_context._key(self.user.pk)
+        self.assertEqual(other_worker.get(key)["scores"]["math"], 90)
+        self._assess(math=20)
+        self.assertIsNone(other_worker.get(key))
+
+
+class ModelArtifactTests(SimpleTestCase):
+    """Serving only loads an exported artifact; it never exports or imports sklearn."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.joblib = self.tmp / "model.joblib"
+        self.joblib.write_bytes(b"pretend pipeline")
+        self.engine = LinearModel(np.zeros(9), np.ones(9), np.zeros((8, 9)), np.zeros(8), np.arange(8))
+
+    def test_missing_artifact_fails_fast(self):
+        registry = ModelRegistry(self.tmp / "model.npz", loader=LinearModel.load)
+        with mock.patch.object(ml_model, "MODEL_REGISTRY", registry):
+            with self.assertRaises(FileNotFoundError):
+                ml_model.load_model()
+        self.assertFalse((self.tmp / "model.npz").exists())
+
+    def test_stale_export_is_refused(self):
+        npz = self.tmp / "model.npz"
+        self.engine.source = "not-the-current-joblib"
+        self.engine.save(npz)
+        with mock.patch.object(ml_model, "MODEL_PATH", self.joblib):
+            with self.assertRaises(ValueError):
+                ml_model._checked(LinearModel.load)(npz)
+            self.engine.source = file_digest(self.joblib)
+            self.engine.save(npz)
+            self.assertEqual(ml_model._checked(LinearModel.load)(npz).source, self.engine.source)
+
+    def test_serving_does_not_import_sklearn(self):
+        code = (
+            "import sys, django; django.setup(); "
+            "from mentor.ml.model import predict_top3; predict_top3(80, 70, 60, 40, 90, 45, 55, 60, 'code'); "
+            "print('sklearn' in sys.modules, 'joblib' in sys.modules)"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="careermentor.settings")
+        out = subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.split()[-2:], ["False", "False"])
+
+
+class TrainingDataTests(SimpleTestCase):
+    def test_same_seed_same_stream(self):
+        X1, y1 = training.make_samples(50, seed=3, chunk_size=150)
+        X2, y2 = training.make_samples(50, seed=3, chunk_size=150)
+        np.testing.assert_array_equal(X1, X2)
+        np.testing.assert_array_equal(y1, y2)
+        X3, _y3 = training.make_samples(50, seed=4, chunk_size=150)
+        self.assertFalse(np.array_equal(X1, X3))
+
+    def test_chunks_are_bounded_and_balanced(self):
+        k = len(ml_model.CAREERS)
+        chunks = list(training.iter_samples(50, seed=3, chunk_size=150))
+        self.assertEqual([len(y) for _X, y in chunks], [150, 150, 100])
+        self.assertTrue(all(X.shape == (len(y), 9) for X, y in chunks))
+        y = np.concatenate([y for _X, y in chunks])
+        self.assertEqual(np.bincount(y, minlength=k).tolist(), [50] * k)
+
+    def test_samples_follow_the_career_means(self):
+        X, y = training.make_samples(2000, seed=11)
+        self.assertEqual(X.shape, (2000 * len(ml_model.CAREERS), 9))
+        self.assertTrue(((X >= 0) & (X <= 100)).all())
+        for label, career in enumerate(ml_model.CAREERS):
+            rows = X[y == label]
+            np.testing.assert_allclose(rows.mean(axis=0), training.CAREER_MEANS[career], atol=1.5)
+            # each class draws its own noise (the baseline column is far from the clip bounds)
+            np.testing.assert_allclose(rows[:, 8].std(), np.sqrt(training.NOISE_VAR[8]), rtol=0.05)
+
+
+class SaveArtifactTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = self.tmp / "model.joblib"
+        self.meta_path = self.tmp / "model.meta.json"
+        self.model, self.info = training.train(n_per_class=20, solver="sgd", epochs=1)
+
+    def test_model_and_meta_are_written_together(self):
+        meta = training.save_artifact(self.model, self.info, self.path, self.meta_path)
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ["model.joblib", "model.meta.json"])
+        self.assertEqual(meta["sha256"], file_digest(self.path))
+        self.assertEqual(training.load_meta(self.meta_path), meta)
+        self.assertEqual(meta["solver"], "sgd")
+
+    def test_failed_dump_keeps_previous_pair(self):
+        training.save_artifact(self.model, self.info, self.path, self.meta_path)
+        before = self.path.read_bytes(), self.meta_path.read_text()
+
+        def broken_dump(model, filename):
+            Path(filename).write_bytes(b"half a pickle")
+            raise OSError("disk full")
+
+        with mock.patch("joblib.dump", broken_dump), self.assertRaises(OSError):
+            training.save_artifact(self.model, dict(self.info, seed=99), self.path, self.meta_path)
+        self.assertEqual((self.path.read_bytes(), self.meta_path.read_text()), before)
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ["model.joblib", "model.meta.json"])
+
+
+class IncrementalTrainingTests(TransactionTestCase):
+    SCORES = dict(math=90, science=80, english=60, arts=40, coding=85, design=30, leadership=50, communication=60)
+
+    class Interrupted(Exception):
+        pass
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.cmd = importlib.import_module("mentor.management.commands.train_model")
+        paths = {
+            "MODEL_PATH": self.tmp / "model.joblib", "META_PATH": self.tmp / "model.meta.json",
+            "CHECKPOINT_PATH": self.tmp / "model.checkpoint.joblib",
+            "CHECKPOINT_META_PATH": self.tmp / "model.checkpoint.meta.json", "NPZ_PATH": self.tmp / "model.npz",
+        }
+        for name, path in paths.items():
+            self._patch(self.cmd, name, path)
+            setattr(self, name.lower(), path)
+        for name in ("MODEL_PATH", "NPZ_PATH"):
+            self._patch(ml_model, name, paths[name])
+        self._patch(ml_model, "MMAP_PATH", self.tmp / "model.mmap.json")
+
+        model, info = training.train(n_per_class=20, solver="sgd", epochs=1)
+        training.save_artifact(model, info, self.model_path, self.meta_path)
+        ml_model.export_model()
+        self.user = User.objects.create_user("trainer", password="pw")
+
+    def _patch(self, target, name, value):
+        patcher = mock.patch.object(target, name, value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _assess(self, n, career="Software Engineer", **scores):
+        rows = [Assessment(user=self.user, top3=[], top_career=career, **dict(self.SCORES, **scores))
+                for _ in range(n)]
+        Assessment.objects.bulk_create(rows)
+        return list(Assessment.objects.order_by("pk").values_list("pk", flat=True))
+
+    def _serves(self):
+        """What a freshly started worker would do: load the export and check it against model.joblib."""
+        engine = ml_model._checked(LinearModel.load)(self.npz_path)
+        self.assertEqual(engine.predict_proba(np.full((1, 9), 50.0)).shape, (1, 8))
+        return engine
+
+    def _update(self, **options):
+        out = io.StringIO()
+        call_command("train_model", incremental=True, chunk_size=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_chunks_cover_the_range_and_skip_unlabelled_rows(self):
+        self._assess(3)
+        self._assess(1, career="")
+        self._assess(1, career="Astronaut")
+        pks = self._assess(1, career="Data Scientist", math=120)
+
+        chunks = list(training.iter_assessment_chunks(after_pk=pks[0], until_pk=pks[-2], chunk_size=1))
+        self.assertEqual([last for _X, _y, last in chunks], [pks[1], pks[2], pks[4]])
+        self.assertEqual(chunks[-1][1].tolist(), [])  # only the unknown career was left
+
+        chunks = list(training.iter_assessment_chunks(after_pk=pks[0], chunk_size=2))
+        self.assertEqual([len(y) for _X, y, _last in chunks], [2, 1])
+        self.assertEqual(chunks[-1][2], pks[-1])
+        X = np.vstack([X for X, _y, _last in chunks])
+        y = np.concatenate([y for _X, y, _last in chunks])
+        self.assertEqual([ml_model.CAREERS[i] for i in y], ["Software Engineer"] * 2 + ["Data Scientist"])
+        self.assertEqual(X[-1, 0], 100.0)  # clipped
+        self.assertTrue((X[:, -1] == ml_model.BASELINE_FEATURE).all())
+        self.assertEqual(list(training.iter_assessment_chunks(after_pk=pks[-1])), [])
+
+    def test_checkpoints_do_not_touch_the_served_model(self):
+        pks = self._assess(45)
+        base = file_digest(self.model_path)
+        save_artifact = self.cmd.save_artifact
+        saved = []
+
+        def spy(model, meta, path, meta_path):
+            result = save_artifact(model, meta, path, meta_path)
+            saved.append(path)
+            if path == self.checkpoint_path:
+                self.assertEqual(file_digest(self.model_path), base)
+                self._serves()
+            return result
+
+        with mock.patch.object(self.cmd, "save_artifact", spy):
+            self._update()
+        self.assertEqual(saved, [self.checkpoint_path] * 3 + [self.model_path])
+        self.assertNotEqual(file_digest(self.model_path), base)
+        self.assertEqual(self._serves().source, file_digest(self.model_path))
+        self.assertFalse(self.checkpoint_path.exists() or self.checkpoint_meta_path.exists())
+        meta = training.load_meta(self.meta_path)
+        self.assertEqual(meta["incremental"], {"last_pk": pks[-1], "rows": 45, "runs": 1})
+        self.assertNotIn("base_sha256", meta)
+
+    def test_interrupted_run_resumes_from_its_checkpoint(self):
+        pks = self._assess(25)
+        save_artifact = self.cmd.save_artifact
+
+        def crash_after_first_checkpoint(*args):
+            save_artifact(*args)
+            raise self.Interrupted
+
+        base = file_digest(self.model_path)
+        with mock.patch.object(self.cmd, "save_artifact", crash_after_first_checkpoint):
+            with self.assertRaises(self.Interrupted):
+                self._update()
+        self.assertEqual(file_digest(self.model_path), base)
+        self._serves()
+
+        update = training.update_from_assessments
+        with mock.patch.object(self.cmd, "update_from_assessments", wraps=update) as spy:
+            self._update()
+        self.assertEqual(spy.call_args.args[1], pks[19])
+        self.assertEqual(training.load_meta(self.meta_path)["incremental"],
+                         {"last_pk": pks[-1], "rows": 25, "runs": 1})
+        self._serves()
+
+    def test_no_export_keeps_the_update_in_the_checkpoint(self):
+        pks = self._assess(5)
+        base = file_digest(self.model_path)
+        out = self._update(no_export=True)
+        self.assertIn("model.checkpoint.joblib", out)
+        self.assertEqual(file_digest(self.model_path), base)
+        self._serves()
+
+        # the next run has nothing new to read but still publishes the checkpoint
+        self._update()
+        self.assertNotEqual(file_digest(self.model_path), base)
+        self.assertEqual(training.load_meta(self.meta_path)["incremental"]["last_pk"], pks[-1])
+        self._serves()
+        self.assertIn("model unchanged", self._update())
+
+    def test_checkpoint_of_another_model_is_ignored(self):
+        self._assess(5)
+        self._update(no_export=True)
+        model, info = training.train(n_per_class=20, seed=8, solver="sgd", epochs=1)
+        training.save_artifact(model, info, self.model_path, self.meta_path)
+
+        update = training.update_from_assessments
+        with mock.patch.object(self.cmd, "update_from_assessments", wraps=update) as spy:
+            self._update()
+        self.assertEqual(spy.call_args.args[1], 0)
+        self.assertEqual(training.load_meta(self.meta_path)["incremental"]["rows"], 5)
+
+
+class MmapExportTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.manifest = self.tmp / "model.mmap.json"
+        self.arrays = self.tmp / "model.mmap"
+
+    def _engine(self, seed, kind="multinomial"):
+        rng = np.random.default_rng(seed)
+        return LinearModel(rng.uniform(20, 80, 9), rng.uniform(5, 20, 9), rng.normal(size=(8, 9)),
+                           rng.normal(size=8), np.arange(8), kind=kind, source=f"sha-{seed}")
+
+    def test_mapped_model_predicts_like_the_npz(self):
+        X = np.random.default_rng(0).uniform(0, 100, size=(64, 9))
+        for kind in ("multinomial", "ovr"):
+            engine = self._engine(1, kind)
+            engine.save(self.tmp / "model.npz")
+            engine.save_mmap(self.manifest)
+            npz = LinearModel.load(self.tmp / "model.npz")
+            mapped = LinearModel.load_mmap(self.manifest)
+            self.assertEqual((mapped.kind, mapped.source), (kind, "sha-1"))
+            self.assertEqual(mapped.classes_.tolist(), list(range(8)))
+            self.assertFalse(mapped.coef.flags.writeable)  # a read-only view of the mapped file, not a copy
+            np.testing.assert_array_equal(mapped.predict_proba(X), npz.predict_proba(X))
+
+    def test_stale_manifest_is_refused(self):
+        joblib = self.tmp / "model.joblib"
+        joblib.write_bytes(b"pretend pipeline")
+        engine = self._engine(1)
+        with mock.patch.object(ml_model, "MODEL_PATH", joblib):
+            engine.save_mmap(self.manifest)
+            with self.assertRaises(ValueError):
+                ml_model._checked(LinearModel.load_mmap)(self.manifest)
+            engine.source = file_digest(joblib)
+            engine.save_mmap(self.manifest)
+            self.assertEqual(ml_model._checked(LinearModel.load_mmap)(self.manifest).source, engine.source)
+
+    def test_superseded_arrays_are_removed(self):
+        def files_of(manifest):
+            return set(json.loads(manifest.read_text())["arrays"].values())
+
+        self._engine(1).save_mmap(self.manifest)
+        first = files_of(self.manifest)
+        self._engine(2).save_mmap(self.manifest)
+        second = files_of(self.manifest)
+        # the previous export may still be mapped by workers that haven't reloaded yet
+        self.assertEqual({f.name for f in self.arrays.iterdir()}, first | second)
+
+        self._engine(3).save_mmap(self.manifest)
+        third = files_of(self.manifest)
+        self.assertEqual({f.name for f in self.arrays.iterdir()}, second | third)
+        self.assertEqual(len(third), 4)
+        self.assertEqual(LinearModel.load_mmap(self.manifest).source, "sha-3")
+
+        # re-exporting the same arrays reuses the files and keeps only them
+        self._engine(3).save_mmap(self.manifest)
+        self.assertEqual({f.name for f in self.arrays.iterdir()}, third)
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.npz = self.tmp / "model.npz"
+        self.registry = ModelRegistry(self.npz, loader=LinearModel.load, check_interval=0)
+
+    def _export(self, bias, mtime):
+        LinearModel(np.zeros(9), np.ones(9), np.zeros((8, 9)), np.full(8, float(bias)), np.arange(8)).save(self.npz)
+        os.utime(self.npz, ns=(mtime, mtime))
+
+    def test_new_artifact_is_hot_swapped(self):
+        self._export(1, 10**18)
+        first = self.registry.get()
+        version = self.registry.version
+        self.assertIs(self.registry.get(), first)  # same mtime: no reload
+
+        self._export(2, 10**18 + 1)
+        second = self.registry.get()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.intercept[0], 2.0)
+        self.assertNotEqual(self.registry.version, version)
+        self.assertEqual(self.registry.status()["loads"], 2)
+
+    def test_touched_artifact_with_same_hash_is_not_reloaded(self):
+        self._export(1, 10**18)
+        first = self.registry.get()
+        os.utime(self.npz, ns=(10**18 + 5, 10**18 + 5))
+        self.assertIs(self.registry.get(), first)
+        self.assertEqual(self.registry.status()["loads"], 1)
+
+    def test_corrupt_replacement_keeps_previous_model(self):
+        self._export(1, 10**18)
+        first = self.registry.get()
+        self.npz.write_bytes(b"half-written")
+        os.utime(self.npz, ns=(10**18 + 1, 10**18 + 1))
+        with self.assertLogs("mentor.ml.registry", "ERROR"):
+            self.assertIs(self.registry.get(), first)
+
+        self._export(3, 10**18 + 2)
+        self.assertEqual(self.registry.get().intercept[0], 3.0)
+
+    def test_readiness_before_and_after_load(self):
+        self._export(1, 10**18)
+        url = reverse("mentor:readiness")
+        with mock.patch.object(ml_model, "MODEL_REGISTRY", self.registry):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 503)
+            self.assertFalse(response.json()["ready"])
+            self.registry.preload()
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["version"], file_digest(self.npz))
+
+
+def _substring_matches(keywords, text):
+    """The matching rule before the compiled matcher: plain `kw in text`."""
+    return sorted(k for k in keywords if k in text.lower())
+
+
+class InterestKeywordMatchingTests(SimpleTestCase):
+    """Pins how the compiled matcher differs from the old substring rule."""
+
+    # (text, old substring matches, matcher matches)
+    CASES = [
+        # short keywords are whole words now
+        ("I said hello by email", ["ai"], []),
+        ("AI and ML", ["ai", "ml"], ["ai", "ml"]),
+        ("build", ["ui"], []),
+        ("lawyer", ["law"], []),
+        # ... and not stems: listed longer forms count, other words don't
+        ("biology", ["bio", "biology"], ["biology"]),
+        ("artist", ["art"], []),
+        ("artificial intelligence, articles", ["art"], []),
+        # 3-letter keywords take a plural "s", 2-letter ones don't
+        ("laws and contracts", ["contract", "law"], ["contract", "law"]),
+        ("arts, design", ["art", "design"], ["art", "design"]),
+        ("uis", ["ui"], []),
+        # longer keywords match at the start of a word only
+        ("reteach", ["teach"], []),
+        ("teaching kids", ["teach"], ["teach"]),
+        ("storytelling", ["story"], ["story"]),
+        ("I care about health", ["health"], ["health"]),
+        # a word credits every keyword it starts with
+        ("healthcare", ["health", "healthcare"], ["health", "healthcare"]),
+        # multi-word phrases: matches don't overlap, and spaces match hyphens too
+        ("machine learning", ["learn", "machine learning"], ["machine learning"]),
+        ("machine-learning  research", ["learn", "research"], ["machine learning", "research"]),
+        ("social media", ["media", "social"], ["media", "social"]),
+    ]
+
+    def test_old_vs_new_matches(self):
+        matcher = ml_model.INTEREST_MATCHER
+        for text, old, new in self.CASES:
+            with self.subTest(text=text):
+                self.assertEqual(_substring_matches(matcher.keywords, text), old)
+                self.assertEqual(matcher.matches(text), new)
+
+    def test_scores_follow_matches(self):
+        scores = ml_model.interest_scores_by_career("machine learning")
+        self.assertEqual(scores["Data Scientist"], 0.3)
+        self.assertEqual(scores["Teacher / Academic"], 0.0)  # "learn" no longer credited
+        self.assertEqual(ml_model.interest_scores_by_career("healthcare")["Doctor / Healthcare"], 0.6)
+        self.assertEqual(ml_model.interest_scores_by_career("biology")["Doctor / Healthcare"], 0.3)
+        self.assertEqual(ml_model.interest_scores_by_career("artist")["Designer / UI-UX"], 0.0)
+
+
+def _old_intent(msg):
+    """The substring if/elif chain the intent table replaced, in its original order."""
+    msg = msg.lower()
+    has = lambda *phrases: any(p in msg for p in phrases)  # noqa: E731
+    for name, hit in [
+        ("roadmap", has("roadmap", "how to become", "steps for", "path to", "career path for", "plan for")),
+        ("salary", has("salary", "pay", "package")),
+        ("trending", has("trending", "high demand", "popular", "in demand")),
+        ("courses", has("course", "learn", "study", "syllabus")),
+        ("greeting", has("hi", "hai", "hello")),
+        ("government", has("government", "civil services", "upsc", "psc")),
+        ("short_courses", has("short course", "quick course", "certificate")),
+        ("future_ai", has("future of ai", "ai jobs", "scope of ai")),
+        ("compare", has("compare") or (has("vs") and has("data scientist", "software engineer", "ui/ux", "lawyer",
+                                                          "doctor", "cloud", "cybersecurity"))),
+        ("skill_math", re.search(r"(job|career).*(math|statistics)", msg)),
+        ("skill_design", re.search(r"(job|career).*(design|ui|ux|creative)", msg)),
+        ("skill_coding", re.search(r"(job|career).*(coding|programming|software|developer)", msg)),
+        ("skill_communication", re.search(r"(job|career).*(communication|english|writing|public speaking)", msg)),
+        ("skill_leadership", re.search(r"(job|career).*(leadership|management)", msg)),
+    ]:
+        if hit:
+            return name
+    return None
+
+
+class IntentRouterTests(SimpleTestCase):
+    """Pins intent selection of the compiled router against the old if/elif chain."""
+
+    # (message, old intent, new intent, careers found)
+    CASES = [
+        ("what is the salary of a doctor", "salary", "salary", ["Doctor / Healthcare"]),
+        ("cloud engineer salary", "salary", "salary", ["Cloud Engineer"]),
+        ("roadmap for ui/ux designer", "roadmap", "roadmap", ["Designer / UI-UX"]),
+        ("how to become a developer", "roadmap", "roadmap", ["Software Engineer"]),
+        ("compare data scientist vs software engineer", "compare", "compare", ["Data Scientist", "Software Engineer"]),
+        ("data scientist vs lawyer", "compare", "compare", ["Data Scientist", "Lawyer / Legal"]),
+        ("jobs for strong math", "skill_math", "skill_math", []),
+        ("government jobs", "government", "government", []),
+        ("hello", "greeting", "greeting", []),
+        # whole words: "hi" inside "this", "which" or "everything" no longer fires
+        ("this is his idea", "greeting", None, []),
+        ("which job", "greeting", None, []),
+        ("nice haircut", "greeting", None, []),  # 3-letter keywords are not stems either
+        ("career in design", "skill_design", "skill_design", []),
+        # priority fixes: the specific intent now wins over the generic one it contains
+        ("short course", "courses", "short_courses", []),
+        ("certificate in cloud", "short_courses", "short_courses", []),
+        ("ai jobs", "future_ai", "future_ai", []),
+        ("I want to learn ux", "courses", "courses", []),
+        ("courses for machine learning", "courses", "courses", []),
+        ("everything", "greeting", None, []),
+    ]
+
+    def test_intent_selection(self):
+        for msg, old, new, careers in self.CASES:
+            with self.subTest(msg=msg):
+                self.assertEqual(_old_intent(msg), old)
+                intent, found, _topic = ROUTER.analyze(msg)
+                self.assertEqual(intent, new)
+                self.assertEqual(found, careers)
+
+    def test_course_topics(self):
+        self.assertEqual(ROUTER.analyze("courses for machine learning")[2], ["Data Scientist"])
+        self.assertEqual(ROUTER.analyze("I want to learn ux")[2], ["Designer / UI-UX"])
+        self.assertIsNone(ROUTER.analyze("courses please")[2])
+
+
+class CareerCatalogReloadTests(SimpleTestCase):
+    RECORDS = [{"name": "Data Scientist", "aliases": ["ds"], "salary": "10 LPA", "demand": "High", "courses": []}]
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.json = self.tmp / "careers.json"
+        self.pack = self.tmp / "content.pack"
+
+    def _write_json(self, records, mtime=None):
+        self.json.write_text(json.dumps(records))
+        if mtime is not None:
+            os.utime(self.json, (mtime, mtime))
+
+    def test_broken_json_keeps_previous_snapshot(self):
+        self._write_json(self.RECORDS)
+        catalog = CareerCatalog(self.json, self.pack, check_interval=0)
+        self.assertEqual(catalog.get("ds")["salary"], "10 LPA")
+
+        self.json.write_text('[{"name": "Data Sci')  # caught half-written
+        with self.assertLogs("mentor.career_data", "ERROR"):
+            self.assertEqual(catalog.get("ds")["salary"], "10 LPA")
+
+        self._write_json([dict(self.RECORDS[0], salary="12 LPA")])
+        self.assertEqual(catalog.get("ds")["salary"], "12 LPA")
+
+    def test_broken_first_load_serves_placeholders(self):
+        self.json.write_text("{not json")
+        catalog = CareerCatalog(self.json, self.pack, check_interval=0)
+        with self.assertLogs("mentor.career_data", "ERROR"):
+            self.assertEqual(catalog.lookup(["Data Scientist"])[0]["salary"], "—")
+            self.assertEqual(catalog.roadmap("Data Scientist"), DEFAULT_ROADMAP)
+
+    def test_newer_json_wins_over_pack(self):
+        now = time.time()
+        self._write_json(self.RECORDS, mtime=now - 60)
+        pack_version = build_pack(self.RECORDS, self.pack)
+        catalog = CareerCatalog(self.json, self.pack, check_interval=0)
+        self.assertEqual(catalog.version, pack_version)  # pack is newer: served from the pack
+
+        self._write_json([dict(self.RECORDS[0], salary="15 LPA")], mtime=now + 60)
+        with self.assertLogs("mentor.career_data", "WARNING"):
+            self.assertEqual(catalog.get("Data Scientist")["salary"], "15 LPA")
+        self.assertTrue(catalog.version.startswith("json-"))
+
+    def test_pack_build_uses_its_own_tmp_file(self):
+        other = self.tmp / "content.pack.12345.tmp"  # another process mid-build
+        other.write_bytes(b"partial")
+        with mock.patch("mentor.content_pack.os.replace", wraps=os.replace) as replace:
+            build_pack(self.RECORDS, self.pack)
+        self.assertEqual(replace.call_args.args[0].name, f"content.pack.{os.getpid()}.tmp")
+        self.assertEqual(other.read_bytes(), b"partial")
+        self.assertEqual(CareerCatalog(self.json, self.pack).get("Data Scientist")["salary"], "10 LPA")
+
+    def test_json_edits_change_version(self):
+        self._write_json(self.RECORDS)
+        catalog = CareerCatalog(self.json, None, check_interval=0)
+        before = catalog.version
+        self._write_json([dict(self.RECORDS[0], salary="12 LPA")], mtime=time.time() + 60)
+        self.assertNotEqual(catalog.version, before)
+        self._write_json(self.RECORDS, mtime=time.time() + 120)
+        self.assertEqual(catalog.version, before)  # same content, same version
+
+    def test_report_version_follows_json(self):
+        self._write_json(self.RECORDS)
+        catalog = CareerCatalog(self.json, None, check_interval=0)
+        jobs = reports.ReportJobs(self.tmp / "reports")
+        with mock.patch.object(reports, "CATALOG", catalog):
+            before = jobs.version()
+            self._write_json([dict(self.RECORDS[0], salary="12 LPA")], mtime=time.time() + 60)
+            self.assertNotEqual(jobs.version(), before)
+
+
+class PredictionCacheTests(SimpleTestCase):
+    PROFILE = (80.4, 72.0, 65.5, 40.0, 91.2, 55.0, 60.0, 70.0)
+    INTERESTS = "I like machine learning and building apps"
+
+    def test_hit_returns_the_stored_prediction(self):
+        cache = PredictionCache()
+        first = cache.predict_top3(*self.PROFILE, self.INTERESTS)
+        second = cache.predict_top3(*self.PROFILE, self.INTERESTS)
+        self.assertEqual(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_miss_is_computed_from_raw_inputs(self):
+        for step in (0, 5.0):
+            cache = PredictionCache(step=step)
+            self.assertEqual(cache.predict_top3(*self.PROFILE, self.INTERESTS),
+                             ml_model.predict_top3(*self.PROFILE, self.INTERESTS))
+
+    def test_default_step_keys_exact_scores(self):
+        cache = PredictionCache()
+        cache.predict_top3(*self.PROFILE, self.INTERESTS)
+        cache.predict_top3(80.6, *self.PROFILE[1:], self.INTERESTS)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+        rounded = PredictionCache(step=1.0)
+        rounded.predict_top3(*self.PROFILE, self.INTERESTS)
+        rounded.predict_top3(80.3, *self.PROFILE[1:], self.INTERESTS)
+        self.assertEqual((rounded.hits, rounded.misses), (1, 1))
+
+    def test_model_version_change_invalidates(self):
+        cache = PredictionCache()
+        version = mock.PropertyMock(return_value="v1")
+        with mock.patch.object(type(ml_model.MODEL_REGISTRY), "version", version):
+            cache.predict_top3(*self.PROFILE, self.INTERESTS)
+            version.return_value = "v2"
+            cache.predict_top3(*self.PROFILE, self.INTERESTS)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertEqual(cache.stats()["size"], 1)  # the v1 entry was dropped
+
+
+@override_settings(MENTOR_HISTORY_PAGE_SIZE=2)
+class HistoryPaginationTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("historian", password="pw")
+        self.client.force_login(self.user)
+        t = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+        # newest first: two rows on their own, then three saved in the same microsecond
+        times = [t + timedelta(hours=2), t + timedelta(hours=1), t, t, t]
+        self.rows = {}
+        for n, created_at in enumerate(reversed(times)):
+            a = Assessment.objects.create(
+                user=self.user, math=50, science=50, english=50, arts=50, coding=50, design=50,
+                leadership=50, communication=50, top3=[{"career": f"C{n}", "prob": 0.5}], created_at=created_at,
+            )
+            self.rows[a.pk] = a
+        self.expected = sorted(self.rows.values(), key=lambda a: (a.created_at, a.pk), reverse=True)
+
+    def _page(self, after=None):
+        response = self.client.get(reverse("mentor:history"), {"after": after} if after is not None else {})
+        self.assertEqual(response.status_code, 200)
+        return [a.pk for a in response.context["items"]], response.context["next_cursor"]
+
+    def test_first_page(self):
+        pks, cursor = self._page()
+        self.assertEqual(pks, [a.pk for a in self.expected[:2]])
+        self.assertIsNotNone(cursor)
+
+    def test_cursor_walks_every_row_once(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            pks, cursor = self._page(cursor)
+            seen += pks
+            pages += 1
+            if cursor is None:
+                break
+        self.assertEqual(seen, [a.pk for a in self.expected])
+        self.assertEqual(pages, 3)
+
+    def test_tie_on_created_at_breaks_by_id(self):
+        tied = [a for a in self.expected if a.created_at == self.expected[-1].created_at]
+        self.assertEqual(len(tied), 3)
+        pks, _cursor = self._page(views._encode_cursor(tied[0]))
+        self.assertEqual(pks, [a.pk for a in tied[1:]])
+
+    def test_malformed_cursor_shows_first_page(self):
+        first, _cursor = self._page()
+        for raw in ("", "garbage", "12.x", "1.2.3", "9" * 400 + ".1"):
+            with self.subTest(after=raw):
+                pks, _cursor = self._page(raw)
+                self.assertEqual(pks, first)
+
+
+class Top3BackfillMigrationTests(TransactionTestCase):
+    BEFORE = [("mentor", "0002_assessment_user_created_index")]
+    AFTER = [("mentor", "0003_assessment_top3_json")]
+    LEGACY = [  # top3 text as written before 0003 -> (top3, top_career) after it
+        ('[{"career": "Data Scientist", "prob": 0.8}, {"career": "Analyst", "prob": 0.1}]',
+         [{"career": "Data Scientist", "prob": 0.8}, {"career": "Analyst", "prob": 0.1}], "Data Scientist"),
+        ('[{"career": "' + "X" * 150 + '", "prob": 1.0}]', [{"career": "X" * 150, "prob": 1.0}], "X" * 100),
+        ("", [], ""),
+        ("[]", [], ""),
+        ("not json at all", [], ""),
+        ('{"career": "Data Scientist"}', [], ""),
+        ('[{"prob": 0.5}]', [{"prob": 0.5}], ""),
+        ('["Designer"]', ["Designer"], ""),
+    ]
+
+    def setUp(self):
+        self.addCleanup(self._migrate, MigrationExecutor(connection).loader.graph.leaf_nodes())
+        self.user = User.objects.create_user("legacy", password="pw")
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_backfill_converts_legacy_rows(self):
+        old = self._migrate(self.BEFORE).get_model("mentor", "Assessment")
+        pks = [
+            old.objects.create(user_id=self.user.pk, math=1, science=1, english=1, arts=1, coding=1, design=1,
+                               leadership=1, communication=1, top3=text).pk
+            for text, _top3, _career in self.LEGACY
+        ]
+        migration = importlib.import_module("mentor.migrations.0003_assessment_top3_json")
+        with mock.patch.object(migration, "BATCH_SIZE", 3):  # several batches
+            new = self._migrate(self.AFTER).get_model("mentor", "Assessment")
+
+        rows = {a.pk: a for a in new.objects.all()}
+        for pk, (text, top3, career) in zip(pks, self.LEGACY):
+            with self.subTest(legacy=text[:40]):
+                self.assertEqual(rows[pk].top3, top3)
+                self.assertEqual(rows[pk].top_career, career)
+
+
+def _cohort_table():
+    """CohortDailyStats as {(day, career): (count, score sums)}, leaving out rows emptied back to zero."""
+    table = {}
+    for r in CohortDailyStats.objects.all():
+        row = (r.count,) + tuple(round(getattr(r, f), 6) for f in cohorts.SUM_FIELDS)
+        if any(row):
+            table[(r.day, r.career)] = row
+    return table
+
+
+class WriteBehindTests(TransactionTestCase):
+    DATA = dict(math=70, science=60, english=50, arts=40, coding=90, design=30, leadership=20, communication=80,
+                interests="apps")
+    CARDS = [{"career": "Software Engineer", "prob": 70.0}, {"career": "Data Scientist", "prob": 20.0}]
+
+    def setUp(self):
+        _private_shared_cache(self)
+        self.user = User.objects.create_user("queued", password="pw")
+        self.client.force_login(self.user)
+        self.writer = AssessmentWriter(Assessment, enabled=True, on_flush=_assessments_written)
+        self.writer._start = lambda: None  # flushed by the tests, not the background thread
+        patcher = mock.patch.object(views, "ASSESSMENT_WRITER", self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _queue(self, n=1):
+        return [views._save_assessment(self.user, self.DATA, self.CARDS) for _ in range(n)]
+
+    def test_history_flushes_queued_rows(self):
+        self._queue(2)
+        self.assertEqual(Assessment.objects.count(), 0)
+        response = self.client.get(reverse("mentor:history"))
+        self.assertEqual(len(response.context["items"]), 2)
+        self.assertFalse(self.writer.pending(self.user.pk))
+
+    def test_pdf_export_flushes_queued_rows(self):
+        self._queue(2)
+        exported = []
+
+        def zip_stream(rows, name):
+            exported.extend(rows)
+            return iter([b""])
+
+        with mock.patch.object(reports, "engine_available", return_value=True), \
+                mock.patch.object(views.REPORTS, "zip_stream", side_effect=zip_stream):
+            response = self.client.get(reverse("mentor:export_all_pdf"))
+            b"".join(response.streaming_content)
+        self.assertEqual(len(exported), 2)
+        self.assertTrue(all(a.pk for a in exported))
+
+    def test_failed_bulk_create_is_retried(self):
+        self._queue(2)
+        with mock.patch.object(Assessment.objects, "bulk_create", side_effect=OperationalError("locked")), \
+                self.assertLogs("mentor.write_behind", "ERROR"):
+            self.assertEqual(self.writer.flush(), 0)
+        self.assertEqual((self.writer.depth, self.writer.failures), (2, 1))
+        self.assertTrue(self.writer.pending(self.user.pk))
+
+        self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(Assessment.objects.count(), 2)
+        self.assertEqual(self.writer.depth, 0)
+        self.assertFalse(self.writer.pending(self.user.pk))
+
+    def test_unwritable_row_is_dropped_not_retried(self):
+        good = self._queue()[0]
+        poison = self.writer.add(Assessment(user=self.user, top3=[], **dict(self.DATA, math=None)))
+        self._queue()
+        with self.assertLogs("mentor.write_behind", "ERROR") as logs:
+            self.assertEqual(self.writer.flush(), 2)
+        self.assertTrue(any("'math': None" in line for line in logs.output))  # dead-lettered to the log
+        self.assertIsNone(poison.pk)
+        self.assertIsNotNone(good.pk)
+        self.assertEqual(Assessment.objects.count(), 2)
+        self.assertEqual((self.writer.depth, self.writer.failures, self.writer.dropped), (0, 1, 1))
+        self.assertFalse(self.writer.pending(self.user.pk))
+        self.assertEqual(self.writer.flush(), 0)
+
+    def test_flush_runs_post_save_hooks(self):
+        Assessment.objects.create(user=self.user, top3=[], **self.DATA)
+        self.assertEqual(chat_context.get_context(self.user).math, 70)  # now cached
+        self._queue(2)[-1].math = 10  # the newest row
+        self.writer.flush()
+
+        self.assertEqual(chat_context.get_context(self.user).math, 10)
+        incremental = _cohort_table()
+        cohorts.rebuild()
+        self.assertEqual(incremental, _cohort_table())
+        self.assertEqual(sum(n for n, *_sums in incremental.values()), 3)
+
+
+class MetricsShardTests(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def _record(self):
+        metrics.inc("mentor_cache_requests_total", cache="test", result="hit")
+        metrics.observe("mentor_span_seconds", 0.002, span="test")
+
+    def test_exited_threads_are_folded_not_kept(self):
+        key = ("mentor_cache_requests_total", (("cache", "test"), ("result", "hit")))
+        for _ in range(5):
+            threads = [threading.Thread(target=self._record) for _ in range(20)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            metrics.snapshot()
+            self.assertLess(len(metrics._shards), 20)
+
+        counters, hists = metrics.snapshot()
+        self.assertEqual(counters[key], 100)
+        h = hists[("mentor_span_seconds", (("span", "test"),))]
+        self.assertEqual(sum(h[:-1]), 100)
+        self.assertAlmostEqual(h[-1], 0.2)
+
+    def test_live_threads_are_summed(self):
+        barrier = threading.Barrier(5)
+
+        def record():
+            self._record()
+            barrier.wait()  # every thread has recorded ...
+            barrier.wait()  # ... and stays alive until the snapshot is taken
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        counters, _hists = metrics.snapshot()
+        barrier.wait()
+        for t in threads:
+            t.join()
+        self.assertEqual(counters[("mentor_cache_requests_total", (("cache", "test"), ("result", "hit")))], 4)
+
+    def test_render_counters_and_histograms(self):
+        metrics.inc("mentor_cache_requests_total", cache='say "hi"', result="hit")
+        metrics.inc("mentor_cache_requests_total", 2, cache='say "hi"', result="hit")
+        for n in (0, 3, 3, 500):
+            metrics.observe("mentor_request_db_queries", n, view="v")
+        text = metrics.render()
+        self.assertIn("# TYPE mentor_cache_requests_total counter\n", text)
+        self.assertIn('mentor_cache_requests_total{cache="say \\"hi\\"",result="hit"} 3\n', text)
+        self.assertIn("# TYPE mentor_request_db_queries histogram\n", text)
+        buckets = re.findall(r'mentor_request_db_queries_bucket\{view="v",le="([^"]+)"\} (\d+)', text)
+        self.assertEqual(buckets, [("0", "1"), ("1", "1"), ("2", "1"), ("5", "3"), ("10", "3"), ("20", "3"),
+                                   ("50", "3"), ("100", "3"), ("+Inf", "4")])
+        self.assertIn('mentor_request_db_queries_sum{view="v"} 506\n', text)
+        self.assertIn('mentor_request_db_queries_count{view="v"} 4\n', text)
+
+    def test_live_thread_keeps_its_shard(self):
+        self._record()
+        metrics.snapshot()
+        self.assertIn(metrics._shard(), metrics._shards)
+
+
+class CohortSummaryTests(TransactionTestCase):
+    """The incrementally maintained CohortDailyStats must equal rebuild() after every kind of write."""
+
+    DAY = datetime(2026, 5, 4, 10, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.user = User.objects.create_user("cohort", password="pw")
+
+    def _assess(self, career="Data Scientist", created_at=None, **scores):
+        values = dict(math=70, science=60, english=50, arts=40, coding=90, design=30, leadership=20,
+                      communication=80)
+        values.update(scores)
+        return Assessment.objects.create(user=self.user, top3=[{"career": career, "prob": 0.6}],
+                                         created_at=created_at or self.DAY, **values)
+
+    def assertMatchesRebuild(self):
+        incremental = _cohort_table()
+        cohorts.rebuild(chunk_size=2)
+        self.assertEqual(incremental, _cohort_table())
+        return incremental
+
+    def test_save(self):
+        self._assess()
+        self._assess(math=10)
+        self._assess("Designer", created_at=self.DAY + timedelta(days=1))
+        table = self.assertMatchesRebuild()
+        self.assertEqual(table[(self.DAY.date(), "Data Scientist")][:2], (2, 80.0))
+
+    def test_update_top_career(self):
+        a = self._assess()
+        self._assess()
+        a.top3 = [{"career": "Designer", "prob": 0.7}]
+        a.save()
+        table = self.assertMatchesRebuild()
+        self.assertEqual(table[(self.DAY.date(), "Designer")][0], 1)
+
+    def test_update_day_and_scores(self):
+        a = self._assess()
+        a.created_at = self.DAY + timedelta(days=3)
+        a.math = 5
+        a.save()
+        table = self.assertMatchesRebuild()
+        self.assertNotIn((self.DAY.date(), "Data Scientist"), table)
+
+    def test_update_without_changes(self):
+        a = self._assess()
+        a.save()
+        self.assertEqual(self.assertMatchesRebuild()[(self.DAY.date(), "Data Scientist")][0], 1)
+
+    def test_delete(self):
+        a = self._assess()
+        self._assess("Designer")
+        self._assess("Designer", created_at=self.DAY + timedelta(days=1))
+        a.delete()
+        Assessment.objects.filter(top_career="Designer").delete()  # queryset delete still sends post_delete
+        self.assertEqual(self.assertMatchesRebuild(), {})
+
+    def test_write_behind_batch(self):
+        self._assess()
+        writer = AssessmentWriter(Assessment, enabled=True, on_flush=_assessments_written)
+        writer._start = lambda: None
+        for career, day in (("Data Scientist", 0), ("Designer", 0), ("Designer", 2)):
+            writer.add(Assessment(user=self.user, math=1, science=2, english=3, arts=4, coding=5, design=6,
+                                  leadership=7, communication=8, top3=[{"career": career, "prob": 0.5}],
+                                  created_at=self.DAY + timedelta(days=day)))
+        self.assertEqual(writer.flush(), 3)
+        table = self.assertMatchesRebuild()
+        self.assertEqual(sum(n for n, *_sums in table.values()), 4)
+
+
+@override_settings(MENTOR_BATCH_MAX_PROFILES=5)
+class PredictBatchApiTests(TransactionTestCase):
+    PROFILES = [
+        dict(math=90, science=85, english=60, arts=20, coding=95, design=30, leadership=40, communication=50,
+             interests="coding apps and ml"),
+        dict(math=40, science=90, english=70, arts=30, coding=20, design=20, leadership=50, communication=70,
+             interests="biology, hospital"),
+        dict(math=30, science=30, english=80, arts=90, coding=40, design=95, leadership=40, communication=60),
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user("teacher", password="pw")
+        self.client.force_login(self.user)
+        self.url = reverse("mentor:predict_batch_api")
+
+    def _post(self, body, k=None, client=None, **extra):
+        url = self.url if k is None else f"{self.url}?k={k}"
+        data = body if isinstance(body, (str, bytes)) else json.dumps(body)
+        return (client or self.client).post(url, data, content_type="application/json", **extra)
+
+    def test_batch_matches_predict_top3(self):
+        rows = [[p[f] for f in ml_model.FEATURES] for p in self.PROFILES]
+        interests = [p.get("interests", "") for p in self.PROFILES]
+        batch = ml_model.predict_topk_batch(rows, interests, 3)
+        for row, text, got in zip(rows, interests, batch):
+            single = ml_model.predict_top3(*row, text)
+            self.assertEqual([c for c, _p in got], [c for c, _p in single])
+            for (_c, a), (_c2, b) in zip(got, single):
+                self.assertAlmostEqual(a, b, places=12)
+
+        response = self._post(self.PROFILES)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([[r["career"] for r in top] for top in response.json()["results"]],
+                         [[c for c, _p in top] for top in batch])
+
+    def test_k_is_clamped(self):
+        for k, expected in (("0", 1), ("-4", 1), ("2", 2), ("99", len(ml_model.CAREERS))):
+            with self.subTest(k=k):
+                results = self._post(self.PROFILES, k=k).json()["results"]
+                self.assertEqual([len(top) for top in results], [expected] * len(self.PROFILES))
+        self.assertEqual(self._post(self.PROFILES, k="three").status_code, 400)
+
+    def test_malformed_payloads(self):
+        for body in ("not json", "null", "{}", "[]", '{"math": 1}'):
+            with self.subTest(body=body):
+                self.assertEqual(self._post(body).status_code, 400)
+        bad = [self.PROFILES[0], dict(self.PROFILES[1], math=150), "nope"]
+        response = self._post(bad)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json()["errors"]), ["1", "2"])
+
+    def test_oversized_payload(self):
+        response = self._post(self.PROFILES * 2)
+        self.assertEqual(response.status_code, 413)
+
+    def test_requires_login_post_and_csrf(self):
+        anonymous = Client()
+        response = self._post(self.PROFILES, client=anonymous)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("mentor:login"), response["Location"])
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+        strict = Client(enforce_csrf_checks=True)
+        strict.force_login(self.user)
+        self.assertEqual(self._post(self.PROFILES, client=strict).status_code, 403)
+        strict.get(reverse("mentor:career_form"))  # sets the csrftoken cookie
+        token = strict.cookies["csrftoken"].value
+        self.assertEqual(self._post(self.PROFILES, client=strict, HTTP_X_CSRFTOKEN=token).status_code, 200)
+
+
+class ReportJobsTests(TransactionTestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.jobs = reports.ReportJobs(self.tmp / "reports", workers=1)
+        self.jobs._pool = ThreadPoolExecutor(max_workers=1)  # in-process stand-in for the spawn pool
+        self.addCleanup(self.jobs._pool.shutdown)
+        self.renders = []
+        for target in (
+            mock.patch.object(reports, "render_pdf", self._render),
+            mock.patch.object(reports, "engine_available", return_value=True),
+            mock.patch.object(views, "REPORTS", self.jobs),
+            mock.patch.object(signals, "REPORTS", self.jobs),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+        self.fail_with = None
+        self.user = User.objects.create_user("reader", password="pw")
+        self.client.force_login(self.user)
+        self.assessment = Assessment.objects.create(
+            user=self.user, math=80, science=70, english=60, arts=40, coding=90, design=30, leadership=50,
+            communication=60, top3=[{"career": "Data Scientist", "prob": 0.7}],
+        )
+
+    def _render(self, html, path):
+        self.renders.append(path)
+        if self.fail_with is not None:
+            raise self.fail_with
+        Path(path).write_bytes(b"%PDF-1.4 " + Path(path).name.encode())
+        return path
+
+    def _settled(self, job):
+        """Wait for the job and for its done-callback, which runs just after the result is set."""
+        if job.exception(timeout=5) is not None:
+            deadline = time.monotonic() + 5
+            while not hasattr(job, "failed_at") and time.monotonic() < deadline:
+                time.sleep(0.001)
+        return job
+
+    def _status(self):
+        return self.client.get(reverse("mentor:report_status", args=[self.assessment.pk])).json()
+
+    def test_submit_renders_once_then_serves_from_disk(self):
+        self.assertEqual(self._status()["state"], "missing")
+        path = self._settled(self.jobs.submit(self.assessment)).result()
+        self.assertEqual(Path(path), self.jobs.path_for(self.assessment))
+        self.assertEqual(self._status()["state"], "ready")
+        self.assertEqual(self.jobs.submit(self.assessment).result(), path)
+        response = self.client.get(reverse("mentor:export_pdf", args=[self.assessment.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+        self.assertEqual(len(self.renders), 1)
+
+    def test_failure_is_reported_not_rerendered(self):
+        self.fail_with = RuntimeError("boom")
+        self._settled(self.jobs.submit(self.assessment))
+        for _ in range(6):
+            self.assertEqual(self._status(), {"state": "failed", "error": "boom",
+                                              "url": reverse("mentor:export_pdf", args=[self.assessment.pk])})
+        response = self.client.get(reverse("mentor:export_pdf", args=[self.assessment.pk]))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(self.renders), 1)
+
+        self.fail_with = None
+        self.jobs.retry_after = 0  # backoff over: the next submit renders again
+        self._settled(self.jobs.submit(self.assessment)).result()
+        self.assertEqual(self._status()["state"], "ready")
+        self.assertEqual(len(self.renders), 2)
+
+    def test_new_version_is_rendered_despite_failure(self):
+        self.fail_with = RuntimeError("boom")
+        self._settled(self.jobs.submit(self.assessment))
+        self.fail_with = None
+        with mock.patch.object(self.jobs, "version", return_value="v2"):
+            self._settled(self.jobs.submit(self.assessment)).result()
+        self.assertEqual(len(self.renders), 2)
+
+    def test_zip_export_streams_every_report(self):
+        t = datetime(2026, 4, 1, 9, 30, tzinfo=dt_timezone.utc)
+        more = [Assessment.objects.create(
+            user=self.user, math=50, science=50, english=50, arts=50, coding=50, design=50, leadership=50,
+            communication=50, top3=[{"career": "Designer / UI-UX", "prob": 0.5}], created_at=t + timedelta(days=i),
+        ) for i in range(2)]
+        response = self.client.get(reverse("mentor:export_all_pdf"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+
+        expected = {f"career_report_{a.created_at:%Y-%m-%d}_{a.pk}.pdf": a for a in [self.assessment, *more]}
+        self.assertEqual(sorted(archive.namelist()), sorted(expected))
+        for name, a in expected.items():
+            self.assertEqual(archive.read(name), b"%PDF-1.4 " + self.jobs.path_for(a).name.encode())
+            *ymdhm, sec = a.created_at.timetuple()[:6]
+            self.assertEqual(archive.getinfo(name).date_time, (*ymdhm, sec - sec % 2))  # ZIP keeps 2 s steps
+
+    def test_zip_export_lists_failed_reports(self):
+        self.fail_with = RuntimeError("boom")
+        response = self.client.get(reverse("mentor:export_all_pdf"))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        name = f"career_report_{self.assessment.created_at:%Y-%m-%d}_{self.assessment.pk}.pdf"
+        self.assertEqual(archive.namelist(), ["errors.txt"])
+        self.assertEqual(archive.read("errors.txt").decode(), f"{name}: boom\n")
+
+    def test_delete_discards_reports(self):
+        path = Path(self._settled(self.jobs.submit(self.assessment)).result())
+        stale = path.with_name(f"{self.assessment.pk}-oldversion.pdf")
+        stale.write_bytes(b"%PDF old")
+        other = path.with_name(f"{self.assessment.pk + 1}-{self.jobs.version()}.pdf")
+        other.write_bytes(b"%PDF other")
+
+        self.assessment.delete()
+        self.assertFalse(path.exists())
+        self.assertFalse(stale.exists())
+        self.assertTrue(other.exists())
+
+
+class PredictModeTests(TransactionTestCase):
+    FORM = dict(math=88, science=75, english=60, arts=35, coding=92, design=40, leadership=55, communication=65,
+                interests="coding and ml")
+
+    def setUp(self):
+        self.user = User.objects.create_user("student", password="pw")
+
+    def _submit(self, mode):
+        with override_settings(MENTOR_PREDICT_MODE=mode):
+            self.client.force_login(self.user)
+            return self.client.post(reverse("mentor:career_form"), self.FORM)
+
+    def _assert_result_page(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "mentor/result.html")
+
+    def test_redirect_mode(self):
+        for engine in ("django.contrib.sessions.backends.db", "django.contrib.sessions.backends.signed_cookies"):
+            with self.subTest(session_engine=engine), override_settings(SESSION_ENGINE=engine):
+                Assessment.objects.all().delete()
+                self.client = Client()
+                response = self._submit("redirect")
+                self.assertEqual(response.status_code, 302)
+                self.assertEqual(response["Location"], reverse("mentor:predict"))
+                self.assertEqual(Assessment.objects.count(), 0)  # saved by the GET
+                self._assert_result_page(self.client.get(response["Location"]))
+                self.assertEqual(Assessment.objects.count(), 1)
+
+    def test_prg_mode(self):
+        response = self._submit("prg")
+        a = Assessment.objects.get()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], reverse("mentor:result", args=[a.pk]))
+        self._assert_result_page(self.client.get(response["Location"]))
+        self._assert_result_page(self.client.get(response["Location"]))  # reloading saves nothing
+        self.assertEqual(Assessment.objects.count(), 1)
+
+    def test_direct_mode(self):
+        response = self._submit("direct")
+        self._assert_result_page(response)
+        self.assertNotIn("Location", response)
+        self.assertEqual(Assessment.objects.count(), 1)
+        self.assertNotIn("form_data", self.client.session)
+
+
+class MetricsMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = User.objects.create_user("viewer", password="pw")
+        self.client.force_login(self.user)
+
+    def _counter(self, text, **labels):
+        series = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+        m = re.search(r"^mentor_requests_total\{" + re.escape(series) + r"\} (\S+)$", text, re.M)
+        return float(m.group(1)) if m else 0
+
+    def test_requests_latency_and_queries_are_recorded(self):
+        for _ in range(2):
+            self.client.get(reverse("mentor:history"))
+        self.client.get("/no-such-page/")
+        text = metrics.render()
+        self.assertEqual(self._counter(text, view="mentor:history", method="GET", status="2xx"), 2)
+        self.assertEqual(self._counter(text, view="<unresolved>", method="GET", status="4xx"), 1)
+        self.assertIn('mentor_request_seconds_count{view="mentor:history"} 2\n', text)
+        queries = re.search(r'^mentor_request_db_queries_sum\{view="mentor:history"\} (\S+)$', text, re.M)
+        self.assertGreater(float(queries.group(1)), 0)
+        self.assertIn('mentor_db_query_seconds_total{view="mentor:history"}', text)
+
+    def test_async_requests_are_counted(self):
+        client = AsyncClient()
+        client.force_login(self.user)
+        asyncio.run(client.post(reverse("mentor:chat_api_async"), {"message": "hello"}))
+        text = metrics.render()
+        self.assertEqual(self._counter(text, view="mentor:chat_api_async", method="POST", status="2xx"), 1)
+        self.assertNotIn('mentor_request_db_queries_count{view="mentor:chat_api_async"}', text)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        url = reverse("mentor:metrics")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        self.assertIn("# TYPE mentor_requests_total counter", response.content.decode())
+
+    def test_disabled_records_nothing(self):
+        with mock.patch.object(metrics, "enabled", False):
+            self.client.get(reverse("mentor:history"))
+        self.assertEqual(metrics.snapshot(), ({}, {}))
+
+
+class ProfilingTests(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        self.dir = Path(tmp)
+        override = override_settings(MENTOR_PROFILER={"DIR": self.dir, "MAX_FILES": 3, "INTERVAL": 0.001})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user("profiled", password="pw")
+        self.client.force_login(self.user)
+
+    def test_sampler_collects_the_target_thread(self):
+        sampler = profiling.StackSampler(threading.get_ident(), 0.001).start()
+        deadline = time.monotonic() + 0.1
+        while time.monotonic() < deadline:
+            pass
+        counts = sampler.stop()
+        self.assertGreater(sum(counts.values()), 0)
+        self.assertTrue(all("test_sampler_collects_the_target_thread" in stack for stack in counts))
+
+    def test_ring_buffer_keeps_newest(self):
+        names = [profiling.save(Counter({"a;b": i + 1}), "GET", f"/p{i}/", 200, 5) for i in range(5)]
+        self.assertEqual(sorted(f.name for f in self.dir.iterdir()), names[-3:])
+        listed = profiling.list_profiles()
+        self.assertEqual([p["name"] for p in listed], names[:-4:-1])
+        self.assertEqual(listed[0]["label"], "p4")
+        self.assertEqual((self.dir / names[-1]).read_text(), "a;b 5\n")
+
+    def test_only_staff_can_ask_for_a_profile(self):
+        url = reverse("mentor:history")
+        for kwargs in ({"path": url + "?__profile=1"}, {"path": url, "HTTP_X_MENTOR_PROFILE": "1"}):
+            self.user.is_staff = False
+            self.user.save()
+            response = self.client.get(**kwargs)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Mentor-Profile", response)
+
+            self.user.is_staff = True
+            self.user.save()
+            response = self.client.get(**kwargs)
+            name = response["X-Mentor-Profile"]
+            self.assertEqual(profiling.profile_path(name), self.dir / name)
+        self.assertEqual(len(profiling.list_profiles()), 2)
+
+    def test_profile_path_rejects_foreign_names(self):
+        name = profiling.save(Counter({"a": 1}), "GET", "/x/", 200, 1)
+        (self.dir.parent / "1-GET-200-1ms-x.collapsed").write_text("outside")
+        self.addCleanup((self.dir.parent / "1-GET-200-1ms-x.collapsed").unlink, missing_ok=True)
+        self.assertEqual(profiling.profile_path(name), self.dir / name)
+        for bad in ("../1-GET-200-1ms-x.collapsed", "..%2F1-GET-200-1ms-x.collapsed",
+                    str(self.dir / name), name + "\n", name + ".tmp", "settings.py", "", ".."):
+            self.assertIsNone(profiling.profile_path(bad), bad)
+        self.assertIsNone(profiling.profile_path("1-GET-200-1ms-missing.collapsed"))
+
+    def test_download_is_staff_only_and_404s_unknown_names(self):
+        name = profiling.save(Counter({"a;b": 2}), "GET", "/x/", 200, 1)
+        url = reverse("mentor:profile_download", args=[name])
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"a;b 2\n")
+        for bad in ("..%2F..%2Fmanage.py", "nope.collapsed", "1-GET-200-1ms-missing.collapsed"):
+            self.assertEqual(self.client.get(reverse("mentor:profiles") + bad).status_code, 404, bad)
+        self.assertContains(self.client.get(reverse("mentor:profiles")), name)
@@ -7,6 +7,15 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('form/', views.career_form, name='career_form'),
     path('predict/', views.predict, name='predict'),
+    path('result/<int:pk>/', views.result_view, name='result'),
+    path('api/predict/batch/', views.predict_batch_api, name='predict_batch_api'),
+    path('healthz/ready/', views.readiness, name='readiness'),
+    path('stats/prediction-cache/', views.prediction_cache_stats, name='prediction_cache_stats'),
+    path('stats/write-behind/', views.write_behind_stats, name='write_behind_stats'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path('stats/profiles/', views.profiles_view, name='profiles'),
+    path('stats/profiles/<str:name>', views.profile_download, name='profile_download'),
+    path('stats/cohorts/', views.cohorts_view, name='cohorts'),
 
     path('signup/', views.signup_view, name='signup'),
     path('login/', views.login_view, name='login'),
@@ -16,10 +25,13 @@ urlpatterns = [
     path("history/delete/<int:pk>/", views.delete_history, name="delete_history"),
     path("history/delete_all/", views.delete_history, name="delete_all_history"),
     path("chat/api/", views.chat_api, name="chat_api"),  
+    path("chat/api/async/", views.chat_api_async, name="chat_api_async"),
     path("chat/", views.chat_page, name="chat_page"), 
 
     # PDF
     path('pdf/<int:pk>/', views.export_pdf, name='export_pdf'),
+    path('pdf/<int:pk>/status/', views.report_status, name='report_status'),
+    path('pdf/all/', views.export_all_pdf, name='export_all_pdf'),
         path('password-reset/', 
          auth_views.PasswordResetView.as_view(template_name='password_reset.html'), 
          name='password_reset'),
@@ -1,20 +1,35 @@
 import json
+from datetime import datetime, timedelta, timezone as dt_timezone
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
-from django.contrib.auth import authenticate, login, logout
-from django.http import HttpResponse
-from django.template.loader import get_template
-from django.views.decorators.csrf import csrf_exempt
+from django.contrib.auth import authenticate, get_user, login, logout
+from django.contrib.auth.views import redirect_to_login
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.http import JsonResponse
-from django.shortcuts import render
-import re
 from .forms import CareerInputForm, SignupForm
-from .ml.model import predict_top3, tiny_roadmap
 from .models import Assessment
-from .career_data import get_career_info
+from .career_data import CATALOG, get_career_info, get_roadmap
+from .chat_context import aget_context as aget_chat_context, get_context as get_chat_context
+from .chat_context import invalidate as invalidate_chat_context
+from .chatbot import chat_reply
+from . import cohorts, metrics, profiling
+from .lazy import LazyModule
+from .prediction_cache import PREDICTION_CACHE
+from .write_behind import ASSESSMENT_WRITER
+from . import reports
+from .reports import REPORTS
+
+# numpy + the model load on first use, not when the URLconf is imported
+ml = LazyModule("mentor.ml.model")
 
 
 # -------------------------
@@ -24,10 +39,72 @@ def home(request):
     return render(request, "mentor/home.html")
 
 
+def readiness(request):
+    """Readiness probe: 200 once the model is warm in this worker, 503 before."""
+    status = ml.MODEL_REGISTRY.status()
+    return JsonResponse(status, status=200 if status["ready"] else 503)
+
+
+@staff_member_required
+def prediction_cache_stats(request):
+    """Hit/miss counters of this worker's prediction cache (for tuning STEP)."""
+    return JsonResponse(PREDICTION_CACHE.stats())
+
+
+@staff_member_required
+def metrics_view(request):
+    """This worker's metrics in Prometheus text format."""
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@staff_member_required
+def profiles_view(request):
+    """Stored request profiles, newest first."""
+    return render(request, "mentor/profiles.html", {
+        "profiles": profiling.list_profiles(),
+        "max_files": profiling.conf()["MAX_FILES"],
+    })
+
+
+@staff_member_required
+def profile_download(request, name):
+    path = profiling.profile_path(name)
+    if path is None:
+        raise Http404("No such profile")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type="text/plain")
+
+
+@staff_member_required
+def cohorts_view(request):
+    """Top-career distribution, mean scores and daily volume from the cohort summary."""
+    try:
+        days = min(max(int(request.GET.get("days", 30)), 1), 365)
+    except ValueError:
+        days = 30
+    return render(request, "mentor/cohorts.html", cohorts.dashboard(days))
+
+
+@staff_member_required
+def write_behind_stats(request):
+    """Queue depth and flush counters of this worker's assessment write-behind queue."""
+    return JsonResponse(ASSESSMENT_WRITER.stats())
+
+
 @login_required
 def career_form(request):
     form = CareerInputForm(request.POST or None)
     if request.method == "POST" and form.is_valid():
+        mode = getattr(settings, "MENTOR_PREDICT_MODE", "redirect")
+        if mode == "direct":
+            # predict, save and render in this response: no session write, no second request
+            cards = _predict_cards(form.cleaned_data)
+            _save_assessment(request.user, form.cleaned_data, cards)
+            return _render_result(request, cards)
+        if mode == "prg":
+            # Post/Redirect/Get on the saved assessment, so a reload never re-submits
+            cards = _predict_cards(form.cleaned_data)
+            assessment = _save_assessment(request.user, form.cleaned_data, cards, deferred=False)  # needs its pk
+            return redirect("mentor:result", pk=assessment.pk)
         request.session["form_data"] = form.cleaned_data  # stash for predict
         return redirect("mentor:predict")
     return render(request, "mentor/form.html", {"form": form})
@@ -36,29 +113,17 @@ def career_form(request):
 # -------------------------
 # Prediction + save history
 # -------------------------
-
-@login_required
-def predict(request):
-    data = request.session.get("form_data")
-    if not data:
-        messages.warning(request, "Please fill the form first.")
-        return redirect("mentor:career_form")
-
-    # 1) Predict (each prob is 0..1 float)
-    top3_raw = predict_top3(
-        data["math"], data["science"], data["english"], data["arts"],
-        data["coding"], data["design"], data["leadership"], data["communication"],
-        data.get("interests", "")
-    )
-
-    # 2) Enrich for UI: convert prob to %, attach roadmap
-    enriched = [(career, p * 100.0, tiny_roadmap(career)) for (career, p) in top3_raw]
-
-    # 3) Career insights (salary/demand/courses) mapped by career name
-    info_list = get_career_info([c for (c, _p, _rm) in enriched])
+def _result_cards(top3):
+    """Result-page cards, best first, from [(career, prob 0..1), ...]."""
+    with metrics.span("catalog_lookup"):
+        # Enrich for UI: convert prob to %, attach roadmap
+        enriched = [(career, p * 100.0, get_roadmap(career)) for (career, p) in top3]
+
+        # Career insights (salary/demand/courses) mapped by career name
+        info_list = get_career_info([c for (c, _p, _rm) in enriched])
     info_map = {ci["name"]: ci for ci in info_list}
 
-    # 4) Merge into card objects and sort by confidence desc
+    # Merge into card objects and sort by confidence desc
     cards = []
     for (career, prob_pct, roadmap) in enriched:
         cards.append({
@@ -68,26 +133,116 @@ def predict(request):
             "info": info_map.get(career, {"name": career, "salary": "—", "demand": "—", "courses": []}),
         })
     cards.sort(key=lambda x: x["prob"], reverse=True)
+    return cards
 
-    top_card = cards[0]
-    other_cards = cards[1:]
 
-    # 5) Save to DB: store probs as 0..1 JSON string
+def _predict_cards(data):
+    # each prob is 0..1 float
+    top3_raw = PREDICTION_CACHE.predict_top3(
+        data["math"], data["science"], data["english"], data["arts"],
+        data["coding"], data["design"], data["leadership"], data["communication"],
+        data.get("interests", "")
+    )
+    return _result_cards(top3_raw)
+
+
+def _save_assessment(user, data, cards, deferred=True):
+    # probs as 0..1
     top3_db = [{"career": c["career"], "prob": round(c["prob"] / 100.0, 6)} for c in cards]
-    Assessment.objects.create(
-        user=request.user,
+    assessment = Assessment(
+        user=user,
         math=data["math"], science=data["science"], english=data["english"], arts=data["arts"],
         coding=data["coding"], design=data["design"], leadership=data["leadership"], communication=data["communication"],
         interests=data.get("interests", ""),
-        top3=json.dumps(top3_db),
+        top3=top3_db,
     )
+    if deferred and ASSESSMENT_WRITER.enabled:
+        return ASSESSMENT_WRITER.add(assessment)  # written by the next batch, pk unset until then
+    with transaction.atomic():  # one commit for the row and its cohort summary update
+        assessment.save()
+    return assessment
+
 
-    # 6) Render with top match separated
+def _render_result(request, cards):
+    # Render with top match separated
     return render(
         request,
         "mentor/result.html",
-        {"top_card": top_card, "other_cards": other_cards}
+        {"top_card": cards[0], "other_cards": cards[1:]}
     )
+
+
+@login_required
+def predict(request):
+    data = request.session.get("form_data")
+    if not data:
+        messages.warning(request, "Please fill the form first.")
+        return redirect("mentor:career_form")
+
+    cards = _predict_cards(data)
+    _save_assessment(request.user, data, cards)
+    return _render_result(request, cards)
+
+
+@login_required
+def result_view(request, pk: int):
+    """Result page of a saved assessment (the GET of MENTOR_PREDICT_MODE="prg")."""
+    assessment = get_object_or_404(Assessment.objects.only("id", "user_id", "top3"), pk=pk, user=request.user)
+    cards = _result_cards([(t["career"], float(t["prob"])) for t in assessment.top3 or []])
+    if not cards:
+        messages.warning(request, "No recommendations were stored for this assessment.")
+        return redirect("mentor:history")
+    return _render_result(request, cards)
+
+# -------------------------
+# Bulk scoring (JSON)
+# -------------------------
+@require_POST
+@login_required
+def predict_batch_api(request):
+    """
+    Score a whole class in one call.
+
+    Body: JSON array of profiles, each with the form fields (math … communication,
+    optional interests). Optional ?k= (default 3). Nothing is saved to history.
+    Uses the site's session login and CSRF protection, like the pages: scripts
+    log in at /login/ and send the csrftoken cookie back as X-CSRFToken.
+    """
+    try:
+        profiles = json.loads(request.body or b"null")
+    except ValueError:
+        return JsonResponse({"error": "Body must be a JSON array of profiles."}, status=400)
+    if not isinstance(profiles, list) or not profiles:
+        return JsonResponse({"error": "Body must be a non-empty JSON array of profiles."}, status=400)
+    limit = getattr(settings, "MENTOR_BATCH_MAX_PROFILES", 1000)
+    if len(profiles) > limit:
+        return JsonResponse({"error": f"At most {limit} profiles per request."}, status=413)
+    try:
+        k = int(request.GET.get("k", 3))
+    except ValueError:
+        return JsonResponse({"error": "k must be an integer."}, status=400)
+    k = max(1, min(k, len(ml.CAREERS)))
+
+    rows, interests, errors = [], [], {}
+    for i, profile in enumerate(profiles):
+        form = CareerInputForm(profile if isinstance(profile, dict) else {})
+        if not form.is_valid():
+            errors[str(i)] = form.errors.get_json_data()
+            continue
+        rows.append([form.cleaned_data[f] for f in ml.FEATURES])
+        interests.append(form.cleaned_data.get("interests", ""))
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    results = ml.predict_topk_batch(rows, interests, k)
+    return JsonResponse({
+        "results": [
+            [{"career": career, "prob": round(p, 6)} for career, p in top]
+            for top in results
+        ]
+    })
+
+
 # -------------------------
 # Auth
 # -------------------------
@@ -128,25 +283,62 @@ def logout_view(request):
 # -------------------------
 # History
 # -------------------------
-@login_required
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _encode_cursor(a):
+    delta = a.created_at - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f"{micros}.{a.pk}"
+
+
+def _decode_cursor(raw):
+    """(created_at, pk) from a cursor string, or None if it is malformed."""
+    try:
+        micros, pk = raw.split(".", 1)
+        return _EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
 
 @login_required
 def history_view(request):
-    assessments = Assessment.objects.filter(user=request.user).order_by("-created_at")
-    items = []
-    for a in assessments:
-        try:
-            top3 = json.loads(a.top3) if a.top3 else []
-        except Exception:
-            top3 = []
-        items.append({"obj": a, "top3": top3})
-    return render(request, "mentor/history.html", {"items": items})
+    """
+    Keyset-paginated history, newest first. `?after=<cursor>` continues after
+    the last row of the previous page, so each page is one range scan of the
+    covering index (user, created_at, id, top_career) however deep it is.
+    """
+    ASSESSMENT_WRITER.flush(request.user.pk)  # include predictions still in the write-behind queue
+    page_size = getattr(settings, "MENTOR_HISTORY_PAGE_SIZE", 25)
+    qs = (
+        Assessment.objects.filter(user=request.user)
+        .only("id", "created_at", "top_career")  # skip interests and the full top3
+        .order_by("-created_at", "-id")
+    )
+    cursor = _decode_cursor(request.GET.get("after"))
+    if cursor:
+        created_at, pk = cursor
+        # the plain bound lets SQLite seek on (user_id, created_at); the OR only breaks ties
+        qs = qs.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    page = list(qs[:page_size + 1])
+    has_next = len(page) > page_size
+    page = page[:page_size]
+
+    return render(request, "mentor/history.html", {
+        "items": page,
+        "is_first_page": cursor is None,
+        "next_cursor": _encode_cursor(page[-1]) if has_next else None,
+    })
 
 
 
 @login_required
 def delete_history(request, pk=None):
     """Delete one assessment or all if pk is None."""
+    ASSESSMENT_WRITER.flush(request.user.pk)  # or queued rows would reappear after "delete all"
     if pk:
         # delete a single assessment
         try:
@@ -157,6 +349,7 @@ def delete_history(request, pk=None):
     else:
         # delete all history for this user
         Assessment.objects.filter(user=request.user).delete()
+        invalidate_chat_context(request.user.pk)  # also covered per row by post_delete
     return redirect("mentor:history")
 
 
@@ -164,257 +357,117 @@ def delete_history(request, pk=None):
 # -------------------------
 # PDF Export (HTML -> PDF)
 # -------------------------
+def _report_file(assessment, job):
+    return FileResponse(open(job.result(), "rb"), as_attachment=True,
+                        filename=f"career_report_{assessment.pk}.pdf", content_type="application/pdf")
+
+
 @login_required
 def export_pdf(request, pk: int):
-    # Lazy import so migrations don't crash if the PDF lib is missing/pinned
-    try:
-        from xhtml2pdf import pisa
-    except Exception as e:
-        return HttpResponse(f"PDF engine not available: {e}", status=500)
+    """
+    Serve the report from the on-disk cache, or queue it on the report pool
+    and show a page that polls report_status until the file is ready.
+    """
+    if not reports.engine_available():
+        return HttpResponse("PDF engine not available: xhtml2pdf is not installed", status=500)
 
     assessment = get_object_or_404(Assessment, pk=pk, user=request.user)
+    job = REPORTS.submit(assessment)
+    if job.done():
+        if job.exception() is not None:
+            return HttpResponse(f"Could not render the report: {job.exception()}", status=500)
+        return _report_file(assessment, job)
+    return render(request, "mentor/report_pending.html", {
+        "assessment": assessment,
+        "status_url": reverse("mentor:report_status", args=[pk]),
+    }, status=202)
 
-    # Parse stored JSON string
-    try:
-        parsed = json.loads(assessment.top3) if assessment.top3 else []
-    except Exception:
-        parsed = []
-
-    # Build top3 with % for display
-    top3 = [{"career": item["career"], "prob": float(item["prob"]) * 100.0} for item in parsed]
 
-    # Career enrichment
-    careers = [t["career"] for t in top3]
-    career_info = get_career_info(careers)
+@login_required
+def export_all_pdf(request):
+    """All of the user's reports as one ZIP, streamed as each PDF is rendered."""
+    if not reports.engine_available():
+        return HttpResponse("PDF engine not available: xhtml2pdf is not installed", status=500)
+
+    ASSESSMENT_WRITER.flush(request.user.pk)
+    qs = Assessment.objects.filter(user=request.user).order_by("-created_at", "-id")
+    if not qs.exists():
+        messages.info(request, "No assessments to export yet.")
+        return redirect("mentor:history")
+
+    response = StreamingHttpResponse(
+        REPORTS.zip_stream(qs.iterator(chunk_size=100),
+                           lambda a: f"career_report_{a.created_at:%Y-%m-%d}_{a.pk}.pdf"),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = 'attachment; filename="career_reports.zip"'
+    return response
 
-    # Render HTML -> PDF
-    template = get_template("mentor/report_pdf.html")
-    html = template.render({"assessment": assessment, "top3": top3, "career_info": career_info})
 
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="career_report_{assessment.pk}.pdf"'
-    pisa.CreatePDF(html, dest=response)
-    return response
+@login_required
+def report_status(request, pk: int):
+    """
+    {"state": "pending" | "ready" | "failed" | "missing", "url": ...} for one
+    report. Polls never queue a render; on "missing" (queued by another worker,
+    or lost in a restart) the page goes back to export_pdf, which does.
+    """
+    assessment = get_object_or_404(Assessment, pk=pk, user=request.user)
+    state, error = REPORTS.state(assessment)
+    data = {"state": state, "url": reverse("mentor:export_pdf", args=[pk])}
+    if error is not None:
+        data["error"] = error
+    return JsonResponse(data)
 
 
 
 @login_required
 def chat_page(request):
     # Render the UI for the chatbot
-    return render(request, "mentor/chat.html")
+    api = "mentor:chat_api_async" if getattr(settings, "MENTOR_CHAT_ASYNC", False) else "mentor:chat_api"
+    return render(request, "mentor/chat.html", {"chat_api_url": reverse(api)})
 
 def _latest_assessment(user):
     try:
-        return Assessment.objects.filter(user=user).order_by("-created_at").first()
+        ASSESSMENT_WRITER.flush(user.pk)
+        return get_chat_context(user)
     except Exception:
         return None
 
-def _skill_hint(a):
-    if not a:
-        return ""
-    scores = {
-        "Math": a.math, "Science": a.science, "English": a.english, "Arts": a.arts,
-        "Coding": a.coding, "Design": a.design, "Leadership": a.leadership, "Communication": a.communication,
-    }
-    top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:2]
-    strong = ", ".join([f"{name} ({val:.0f})" for name, val in top])
-    return f""
-
-# map common user phrases → canonical career keys used by tiny_roadmap / careers.json
-ALIAS = {
-    "software engineer": "Software Engineer",
-    "developer": "Software Engineer",
-    "programmer": "Software Engineer",
-    "data scientist": "Data Scientist",
-    "ai engineer": "AI / ML Engineer",
-    "ml engineer": "AI / ML Engineer",
-    "machine learning engineer": "AI / ML Engineer",
-    "cybersecurity": "Cybersecurity Specialist",
-    "security engineer": "Cybersecurity Specialist",
-    "cloud engineer": "Cloud Engineer",
-    "devops": "Cloud Engineer",
-    "ui/ux": "Designer / UI-UX",
-    "ux designer": "Designer / UI-UX",
-    "ui designer": "Designer / UI-UX",
-    "designer": "Designer / UI-UX",
-    "doctor": "Doctor / Healthcare",
-    "healthcare": "Doctor / Healthcare",
-    "lawyer": "Lawyer / Legal",
-    "legal": "Lawyer / Legal",
-    "entrepreneur": "Entrepreneur / Manager",
-    "manager": "Entrepreneur / Manager",
-    "teacher": "Teacher / Academic",
-    "academic": "Teacher / Academic",
-    "content creator": "Content Creator / Media",
-    "media": "Content Creator / Media",
-}
-
-def _extract_careers(text):
-    """Return list of canonical career names found in text."""
-    text = text.lower()
-    hits = []
-    # check multi-word aliases first to avoid partial conflicts
-    for k in sorted(ALIAS.keys(), key=len, reverse=True):
-        if k in text:
-            canon = ALIAS[k]
-            if canon not in hits:
-                hits.append(canon)
-    return hits
-
-
-# --- chatbot API ----------------------------------------------------------
+EMPTY_MESSAGE_REPLY = "Please type a question about careers."
+
 
 @require_POST
 @login_required
 def chat_api(request):
     msg = (request.POST.get("message") or "").strip().lower()
     if not msg:
-        return JsonResponse({"reply": "Please type a question about careers."})
-
-    a = _latest_assessment(request.user)
-    reply = None
-
-    # 0) PROFESSIONAL ROADMAP INTENT  🔥
-    # Triggers: "roadmap for X", "how to become X", "steps for X", "path to X"
-    if (
-        "roadmap" in msg or "how to become" in msg or "steps for" in msg
-        or "path to" in msg or "career path for" in msg or "plan for" in msg
-    ):
-        targets = _extract_careers(msg)
-        if not targets:
-            reply = (
-                "Tell me which role you want a roadmap for (e.g., "
-                "'roadmap for data scientist' or 'steps for ui/ux designer')."
-            )
-        else:
-            # If multiple mentioned, show the first; list others as suggestions
-            primary = targets[0]
-            steps = tiny_roadmap(primary)
-            roadmap_txt = "\n".join([f"{i+1}. {s}" for i, s in enumerate(steps)])
-            extra = ""
-            if len(targets) > 1:
-                extra = "\n\nAlso detected: " + ", ".join(targets[1:]) + \
-                        ". Ask 'roadmap for <role>' to see those."
-            reply = f"📍 Roadmap for **{primary}**:\n{roadmap_txt}{extra}{_skill_hint(a)}"
-            return JsonResponse({"reply": reply})
-
-    # 1) Salary insights
-    if "salary" in msg or "pay" in msg or "package" in msg:
-        targets = _extract_careers(msg) or ["Software Engineer", "Data Scientist", "Doctor / Healthcare"]
-        info = get_career_info(targets)
-        lines = [f"{ci['name']}: {ci.get('salary','—')}" for ci in info]
-        reply = "Here are salary insights:\n" + "\n".join(lines) + _skill_hint(a) 
-        
-    elif "trending" in msg or "high demand" in msg or "popular" in msg or "in demand" in msg:
-        reply = (
-            "🚀 Careers in high demand right now:\n"
-            "• Data Scientist / AI Engineer\n"
-            "• Cybersecurity Specialist\n"
-            "• Cloud Engineer\n"
-            "• Doctor / Healthcare\n"
-            "• UI/UX Designer"
-            + _skill_hint(a)
-        )       
-
-    # 2) Course suggestions
-    elif "course" in msg or "learn" in msg or "study" in msg or "syllabus" in msg:
-        targets = _extract_careers(msg)
-        if not targets:
-            if "ui" in msg or "ux" in msg or "design" in msg:
-                targets = ["Designer / UI-UX"]
-            elif "data" in msg or "ml" in msg or "machine learning" in msg:
-                targets = ["Data Scientist"]
-            elif "software" in msg or "coding" in msg or "programming" in msg or "developer" in msg:
-                targets = ["Software Engineer"]
-            else:
-                targets = ["Software Engineer", "Designer / UI-UX"]
-        info = get_career_info(targets)
-        parts = []
-        for ci in info:
-            crs = ci.get("courses") or []
-            if crs:
-                titles = ", ".join([c.get("title","") for c in crs])
-                parts.append(f"{ci['name']}: {titles}")
-        reply = ("You can explore:\n" + ("\n".join(parts) if parts else "No courses found.")) + _skill_hint(a)
-
-    # 3) Trending / High demand
-
-    elif "hi" in msg or "hai" in msg or "hello" in msg:
-        reply =(
-            "🌿 Welcome — I’m here to support your journey\n"
-        )
-
-
-    # 4) Government / Civil services
-    elif "government" in msg or "civil services" in msg or "upsc" in msg or "psc" in msg:
-        reply = (
-            "🏛 Government job paths:\n"
-            "• Civil Services (IAS, IPS, IFS)\n"
-            "• PSU roles (engineers, management)\n"
-            "• Teaching (UGC NET, schools)\n"
-            "• Healthcare (doctors in govt hospitals)\n"
-            "📚 Path: competitive exams like UPSC, SSC, state PSC, etc."
-        )
-
-    # 5) Short / quick courses
-    elif "short course" in msg or "quick course" in msg or "certificate" in msg:
-        reply = (
-            "⏱ Short career-boosting courses:\n"
-            "• Google Data Analytics (Coursera, ~6 months)\n"
-            "• AWS Cloud Practitioner (Udemy, ~1 month)\n"
-            "• Google UX Design (Coursera, ~4–6 months)\n"
-            "• Digital Marketing Basics (edX, ~2 months)"
-            + _skill_hint(a)
-        )
-
-    # 6) Future of AI jobs
-    elif "future of ai" in msg or "ai jobs" in msg or "scope of ai" in msg:
-        reply = (
-            "🤖 Future AI career tracks:\n"
-            "• AI Researcher (labs, academia)\n"
-            "• ML Engineer (applied AI)\n"
-            "• Robotics Engineer\n"
-            "• AI Ethics & Policy roles\n"
-            "Outlook: Very High demand in the next 5–10 years."
-            + _skill_hint(a)
-        )
-
-    # 7) Comparisons
-    elif "compare" in msg or ("vs" in msg and any(k in msg for k in ["data scientist","software engineer","ui/ux","lawyer","doctor","cloud","cybersecurity"])):
-        reply = (
-            "📊 Data Scientist vs Software Engineer:\n\n"
-            "• Data Scientist → Focus on ML/AI, statistics, data storytelling.\n"
-            "  Typical salary: ₹8L–₹30L (India), $100k–$200k (US)\n"
-            "• Software Engineer → Build scalable apps, systems, tools.\n"
-            "  Typical salary: ₹6L–₹24L (India), $80k–$180k (US)\n\n"
-            "👉 Enjoy math/data/ML? Choose Data Scientist.\n"
-            "👉 Enjoy building products/systems? Choose Software Engineer."
-            + _skill_hint(a)
-        )
+        return JsonResponse({"reply": EMPTY_MESSAGE_REPLY})
+    return JsonResponse({"reply": chat_reply(msg, _latest_assessment(request.user))})
+
+
+async def chat_api_async(request):
+    """
+    Same contract as chat_api, for ASGI deployments: the context lookup
+    uses the async cache/ORM and the catalog is only touched once it is fresh in
+    memory, so an in-flight message holds no thread while it waits.
+    """
+    # Django 4.2's require_POST / login_required don't wrap coroutines.
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    user = await sync_to_async(get_user)(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
 
-    # 8) Careers by skills
-    elif re.search(r"(job|career).*(math|statistics)", msg):
-        reply = "Careers for strong math: Data Scientist, Quant Analyst, Engineer, Actuary." + _skill_hint(a)
-    elif re.search(r"(job|career).*(design|ui|ux|creative)", msg):
-        reply = "Design paths: UI/UX Designer, Product Designer, Motion Designer, Architect." + _skill_hint(a)
-    elif re.search(r"(job|career).*(coding|programming|software|developer)", msg):
-        reply = "Coding-heavy roles: Software Engineer, Backend/Frontend Dev, DevOps, Cloud Engineer." + _skill_hint(a)
-    elif re.search(r"(job|career).*(communication|english|writing|public speaking)", msg):
-        reply = "Strong communication fits: Product Manager, Marketing, PR, Teaching, Content Creator." + _skill_hint(a)
-    elif re.search(r"(job|career).*(leadership|management)", msg):
-        reply = "Leadership paths: Product Manager, Project Manager, Entrepreneur/Manager, Team Lead." + _skill_hint(a)
-
-    # Fallback
-    if not reply:
-        reply = (
-            "Asking about:\n"
-            "• Roadmap (e.g., 'roadmap for data scientist', 'how to become a cloud engineer')\n"
-            "• salary (e.g., 'Salary for Software Engineer')\n"
-            "• Courses (e.g., 'Courses for UI/UX')\n"
-            "• Trending careers (e.g., 'Which careers are in demand?')\n"
-            "• Compare roles (e.g., 'Compare Data Scientist vs Software Engineer')\n"
-            "• Careers for a skill (e.g., 'Jobs for strong math')."
-            + _skill_hint(a)
-        )
+    msg = (request.POST.get("message") or "").strip().lower()
+    if not msg:
+        return JsonResponse({"reply": EMPTY_MESSAGE_REPLY})
 
-    return JsonResponse({"reply": reply})
\ No newline at end of file
+    try:
+        if ASSESSMENT_WRITER.pending(user.pk):
+            await sync_to_async(ASSESSMENT_WRITER.flush)(user.pk)
+        a = await aget_chat_context(user)
+    except Exception:
+        a = None
+    if not CATALOG.is_fresh():
+        await sync_to_async(CATALOG.refresh, thread_sensitive=False)()
+    return JsonResponse({"reply": chat_reply(msg, a)})
@@ -0,0 +1,185 @@
+"""
+Optional write-behind persistence for new assessments.
+
+With MENTOR_WRITE_BEHIND["ENABLED"], predict hands the unsaved Assessment to
+ASSESSMENT_WRITER and renders straight away; a background thread writes the
+queue with one bulk_create whenever BATCH_SIZE rows are waiting or every
+INTERVAL seconds, so concurrent predictions share one SQLite write lock
+acquisition instead of queueing on it one by one. The queue is flushed at
+interpreter exit.
+
+Reads stay consistent per worker: views that list or delete a user's
+assessments call flush(user_id) first, which writes the queue if that user
+has rows in it. Another worker may see a new row up to INTERVAL seconds late.
+bulk_create sends no post_save, so mentor.signals.assessments_created is run
+for every flushed batch instead.
+
+A batch that fails with a transient database error (locked, connection lost)
+is kept for the next flush. Any other failure means some row can never be
+written (e.g. a constraint violation): the batch is then written row by row,
+and rows that still fail are logged with their values and dropped, so one bad
+row cannot wedge the queue.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections
+
+from . import metrics
+from .models import Assessment, top_career_of
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "BATCH_SIZE": 100,   # flush as soon as this many rows are queued
+    "INTERVAL": 0.5,     # seconds; upper bound on how long a row waits
+}
+
+
+class WriteBehindQueue:
+    def __init__(self, model, batch_size=100, interval=0.5, enabled=False, on_flush=None):
+        self.model = model
+        self.batch_size = int(batch_size)
+        self.interval = float(interval)
+        self.enabled = enabled
+        self.on_flush = on_flush
+        self._items = []
+        self._users = Counter()  # user_id -> queued or in-flight rows
+        self._lock = threading.Lock()        # guards _items / _users
+        self._flush_lock = threading.Lock()  # one bulk_create at a time
+        self._wake = threading.Event()
+        self._thread = None
+        self.flushed = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = None
+
+    @classmethod
+    def from_settings(cls, model, on_flush=None):
+        conf = dict(DEFAULTS, **getattr(settings, "MENTOR_WRITE_BEHIND", {}))
+        return cls(model, batch_size=conf["BATCH_SIZE"], interval=conf["INTERVAL"],
+                   enabled=conf["ENABLED"], on_flush=on_flush)
+
+    @property
+    def depth(self):
+        return len(self._items)
+
+    def pending(self, user_id):
+        return self._users.get(user_id, 0) > 0
+
+    def add(self, obj):
+        """Queue an unsaved instance; it gets its pk when the batch is written."""
+        with self._lock:
+            self._items.append(obj)
+            self._users[obj.user_id] += 1
+            depth = len(self._items)
+            if self._thread is None:
+                self._start()
+        if depth >= self.batch_size:
+            self._wake.set()
+        return obj
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="assessment-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def flush(self, user_id=None):
+        """
+        Write every queued row now. With `user_id`, only if that user has rows
+        queued or being written (then it also waits for an in-progress flush).
+        Returns the number of rows written; rows that hit a transient error are
+        kept for the next attempt.
+        """
+        if user_id is not None and not self.pending(user_id):
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                batch, self._items = self._items, []
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            retry = []
+            try:
+                self.model.objects.bulk_create(batch, batch_size=self.batch_size)
+                written = batch
+            except TRANSIENT_ERRORS:
+                logger.exception("Write-behind flush of %d rows failed; keeping them for retry", len(batch))
+                written, retry = [], batch
+                self.failures += 1
+            except Exception:
+                logger.exception("Write-behind flush of %d rows failed; writing them one by one", len(batch))
+                written, retry = self._write_each(batch)
+                self.failures += 1
+            with self._lock:
+                self._items[:0] = retry
+                done = batch[:len(batch) - len(retry)]  # retry is always a tail of the batch
+                self._users.subtract(obj.user_id for obj in done)
+                self._users = +self._users  # drop zero counts
+            self.flushed += len(written)
+            if written:
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000.0, 3)
+        if written and self.on_flush is not None:
+            self.on_flush(written)
+        return len(written)
+
+    def _write_each(self, batch):
+        """(rows written, tail to retry); rows that fail for good are dropped."""
+        written = []
+        for i, obj in enumerate(batch):
+            try:
+                self.model.objects.bulk_create([obj])
+            except TRANSIENT_ERRORS:
+                logger.exception("Write-behind retry interrupted; keeping %d rows", len(batch) - i)
+                return written, batch[i:]
+            except Exception:
+                self.dropped += 1
+                values = {f.attname: getattr(obj, f.attname) for f in obj._meta.concrete_fields}
+                logger.exception("Dropping %s that cannot be written: %r", type(obj).__name__, values)
+            else:
+                written.append(obj)
+        return written, []
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "depth": self.depth,
+            "batch_size": self.batch_size,
+            "interval": self.interval,
+            "flushed": self.flushed,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+def _assessments_written(batch):
+    from .signals import assessments_created
+    assessments_created(batch)
+
+
+class AssessmentWriter(WriteBehindQueue):
+    def add(self, assessment):
+        assessment.top_career = top_career_of(assessment.top3)  # save() is bypassed
+        return super().add(assessment)
+
+
+ASSESSMENT_WRITER = AssessmentWriter.from_settings(Assessment, on_flush=_assessments_written)
+metrics.register_gauge("mentor_write_behind_depth", "Assessments waiting in the write-behind queue.",
+                       lambda: ASSESSMENT_WRITER.depth)